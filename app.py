@@ -5,8 +5,10 @@ FastAPI uygulamasının Streamlit versiyonu
 import streamlit as st
 from excel_handler import (
     load_vehicles, load_fuel_levels, load_check_fields,
-    load_items, load_users, save_form_submission,
-    load_form_submissions, is_admin, update_excel_with_admin_column,
+    load_items, load_form_catalog, load_users, load_users_with_roles, save_form_submission,
+    query_submissions, list_submission_values, typed_submissions_frame, get_submission_schema_for,
+    query_submissions_snapshot,
+    export_submissions, SUBMISSION_EXPORT_FORMATS, get_submission_outbox_stats, is_admin, update_excel_with_admin_column,
     get_user_by_email, generate_reset_code, save_reset_code,
     send_reset_code_email, verify_reset_code, update_user_password,
     delete_reset_code, update_user_email,
@@ -14,7 +16,11 @@ from excel_handler import (
     add_vehicle, delete_vehicle, update_vehicle,
     add_fuel_level, delete_fuel_level, update_fuel_level,
     add_check_field, delete_check_field, update_check_field,
-    add_item, delete_item, update_item
+    add_item, delete_item, update_item,
+    add_vehicles, replace_vehicles, add_fuel_levels, replace_fuel_levels,
+    add_check_fields, replace_check_fields, add_items, replace_items, clean_reference_values,
+    USE_SQLITE, import_excel_to_sqlite, export_sqlite_to_excel,
+    sheets_priority, SHEETS_PRIORITY_ADMIN
 )
 
 # Uygulama başlangıcında Excel dosyasını güncelle (sadece Excel kullanılıyorsa)
@@ -362,16 +368,17 @@ def form_page():
         st.markdown("### 🚗 Vehicle Inspection Form")
         st.caption(f"👤 Driver: {st.session_state.full_name}")
     
-    # Excel'den verileri yükle
-    vehicles = load_vehicles()
-    fuel_levels = load_fuel_levels()
-    items = load_items()
+    # Referans verileri tek seferde yükle (Sheets'te tek istek)
+    catalog = load_form_catalog()
+    vehicles = catalog.vehicles
+    fuel_levels = catalog.fuel_levels
+    items = catalog.items
     
     # Kontrol kategorileri
-    exterior_fields = load_check_fields("ExteriorChecks")
-    engine_fields = load_check_fields("EngineChecks")
-    safety_fields = load_check_fields("SafetyEquipment")
-    interior_fields = load_check_fields("InteriorChecks")
+    exterior_fields = catalog.fields("ExteriorChecks")
+    engine_fields = catalog.fields("EngineChecks")
+    safety_fields = catalog.fields("SafetyEquipment")
+    interior_fields = catalog.fields("InteriorChecks")
     
     st.markdown("---")
     st.markdown("#### 📋 Basic Information")
@@ -626,7 +633,7 @@ def form_page():
             # Save to Excel
             try:
                 from datetime import datetime
-                save_form_submission(form_data)
+                save_form_submission(form_data, catalog=catalog)
                 
                 # Show thank you screen
                 st.session_state.form_submitted = True
@@ -655,6 +662,8 @@ def admin_panel():
             "✅ Check Fields Management": "check_fields_management",
             "📦 Items Management": "items_management"
         }
+        if USE_SQLITE:
+            menu_options["💾 Data Import/Export"] = "data_transfer"
         
         # Menu buttons
         for menu_text, section_key in menu_options.items():
@@ -687,20 +696,32 @@ def admin_panel():
         st.markdown("---")
     
     # Seçili bölüme göre içerik göster
-    if st.session_state.admin_section == "form_submissions":
-        admin_form_submissions()
-    elif st.session_state.admin_section == "user_management":
-        admin_user_management()
-    elif st.session_state.admin_section == "vehicle_management":
-        admin_vehicle_management()
-    elif st.session_state.admin_section == "fuel_level_management":
-        admin_fuel_level_management()
-    elif st.session_state.admin_section == "check_fields_management":
-        admin_check_fields_management()
-    elif st.session_state.admin_section == "items_management":
-        admin_items_management()
-    else:
-        admin_form_submissions()
+    # Admin ekranlarının Sheets istekleri kota dolduğunda sürücü gönderimlerinin arkasında bekler
+    with sheets_priority(SHEETS_PRIORITY_ADMIN):
+        if st.session_state.admin_section == "form_submissions":
+            admin_form_submissions()
+        elif st.session_state.admin_section == "user_management":
+            admin_user_management()
+        elif st.session_state.admin_section == "vehicle_management":
+            admin_vehicle_management()
+        elif st.session_state.admin_section == "fuel_level_management":
+            admin_fuel_level_management()
+        elif st.session_state.admin_section == "check_fields_management":
+            admin_check_fields_management()
+        elif st.session_state.admin_section == "items_management":
+            admin_items_management()
+        elif st.session_state.admin_section == "data_transfer" and USE_SQLITE:
+            admin_data_transfer()
+        else:
+            admin_form_submissions()
+
+# Kart görünümündeki kontrol bölümleri (başlık prefix'i, bölüm adı)
+CHECK_SECTION_TITLES = [
+    ("Exterior", "Exterior Checks"),
+    ("Engine", "Engine & Mechanical Checks"),
+    ("Safety", "Safety Equipment"),
+    ("Interior", "Interior Checks"),
+]
 
 def admin_form_submissions():
     """Form gönderimlerini görüntüleme"""
@@ -708,25 +729,31 @@ def admin_form_submissions():
     st.write("View and manage all form submissions.")
     
     try:
-        submissions = load_form_submissions()
+        # Toplam sayı için satır okunmaz (limit=0 sadece sayım yapar)
+        total_submissions = query_submissions(limit=0).total
+        
+        # Henüz iletilmemiş gönderimler (outbox)
+        outbox = get_submission_outbox_stats()
+        if outbox["depth"]:
+            st.caption(f"⏳ {outbox['depth']} submission(s) waiting for delivery (oldest {outbox['oldest_pending_age']:.0f}s ago)")
         
-        if not submissions:
+        if not total_submissions:
             st.info("📭 No form submissions found yet.")
             return
         
-        st.metric("Total Submissions", len(submissions))
+        st.metric("Total Submissions", total_submissions)
         
         # Filtering options
         col1, col2, col3 = st.columns(3)
         with col1:
             filter_driver = st.selectbox(
                 "Filter by Driver",
-                options=["All"] + list(set([s.get("Driver Name", "N/A") for s in submissions if s.get("Driver Name")]))
+                options=["All"] + list_submission_values("Driver Name")
             )
         with col2:
             filter_vehicle = st.selectbox(
                 "Filter by Vehicle",
-                options=["All"] + list(set([s.get("Vehicle", "N/A") for s in submissions if s.get("Vehicle")]))
+                options=["All"] + list_submission_values("Vehicle")
             )
         with col3:
             sort_by = st.selectbox(
@@ -734,45 +761,129 @@ def admin_form_submissions():
                 options=["Newest", "Oldest"]
             )
         
-        # Filtering
-        filtered_submissions = submissions
-        if filter_driver != "All":
-            filtered_submissions = [s for s in filtered_submissions if s.get("Driver Name") == filter_driver]
-        if filter_vehicle != "All":
-            filtered_submissions = [s for s in filtered_submissions if s.get("Vehicle") == filter_vehicle]
-        
-        # Sorting
-        if sort_by == "Newest":
-            filtered_submissions = sorted(filtered_submissions, key=lambda x: x.get("Timestamp", ""), reverse=True)
-        else:
-            filtered_submissions = sorted(filtered_submissions, key=lambda x: x.get("Timestamp", ""))
-        
-        st.write(f"**Showing:** {len(filtered_submissions)} / {len(submissions)}")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            date_from = st.date_input("From Date", value=None)
+        with col2:
+            date_to = st.date_input("To Date", value=None)
+        with col3:
+            page_size = st.selectbox("Per Page", options=[25, 50, 100])
+        
+        # Filtreleme ve sıralama backend'de yapılır; sadece görüntülenen sayfa okunur
+        filters = {
+            "driver": None if filter_driver == "All" else filter_driver,
+            "vehicle": None if filter_vehicle == "All" else filter_vehicle,
+            "date_from": date_from,
+            "date_to": date_to,
+            "order": "newest" if sort_by == "Newest" else "oldest",
+        }
+        page_number = st.session_state.get("submissions_page", 1)
+        page = query_submissions(**filters, limit=page_size, offset=(page_number - 1) * page_size)
+        total_pages = max(1, -(-page.total // page_size))
+        if page_number > total_pages:
+            # Filtre değişti ve sayfa artık yok: son sayfaya dön
+            page_number = total_pages
+            st.session_state.submissions_page = page_number
+            page = query_submissions(**filters, limit=page_size, offset=(page_number - 1) * page_size)
+        
+        st.write(f"**Showing:** {len(page.rows)} of {page.total} matching / {total_submissions}")
+        st.number_input("Page", min_value=1, max_value=total_pages, step=1, key="submissions_page")
         
         # View mode
         view_mode = st.radio(
             "View Mode",
-            options=["Table", "Card"],
+            options=["Table", "Card", "Summary"],
             horizontal=True
         )
         
         if view_mode == "Table":
             # Table view
             import pandas as pd
-            df = pd.DataFrame(filtered_submissions)
+            df = typed_submissions_frame(page.rows)
             st.dataframe(df, width='stretch', height=400)
             
-            # CSV download
-            csv = df.to_csv(index=False).encode('utf-8-sig')
-            st.download_button(
-                label="📥 Download as CSV",
-                data=csv,
-                file_name=f"form_submissions_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
+            # Export (satırlar backend'den geçici dosyaya akıtılır, DataFrame oluşturulmaz)
+            # Dosya sadece indirme butonuna tıklanınca oluşturulur; sayfa çalışırken bellekte tutulmaz
+            with st.expander("📥 Export Submissions"):
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    export_from = st.date_input("Export From", value=date_from, key="export_from")
+                with col2:
+                    export_to = st.date_input("Export To", value=date_to, key="export_to")
+                with col3:
+                    export_format = st.selectbox("Format", options=["CSV", "XLSX"], key="export_format")
+                st.caption("Driver and vehicle filters above are applied.")
+                
+                extension = export_format.lower()
+                export_filters = dict(driver=filters["driver"], vehicle=filters["vehicle"], date_from=export_from, date_to=export_to)
+                export_count = query_submissions(**export_filters, limit=0).total
+                
+                def build_export():
+                    # Tıklanınca Streamlit tarafından çağrılır (st.* komutları burada çalışmaz)
+                    import os
+                    import tempfile
+                    fd, export_path = tempfile.mkstemp(suffix=f".{extension}")
+                    os.close(fd)
+                    try:
+                        export_submissions(export_path, extension, **export_filters)
+                        with open(export_path, "rb") as f:
+                            return f.read()
+                    finally:
+                        os.remove(export_path)
+                
+                st.write(f"{export_count} submission(s) will be exported.")
+                st.download_button(
+                    label=f"📥 Download as {export_format}",
+                    data=build_export,
+                    file_name=f"form_submissions_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                    mime=SUBMISSION_EXPORT_FORMATS[extension],
+                    on_click="ignore",
+                    disabled=export_count == 0
+                )
+        elif view_mode == "Summary":
+            # Rapor tüm eşleşen gönderimler üzerinden tipli snapshot'tan hesaplanır
+            # (Parquet memory-map; her rerun'da xlsx yeniden okunmaz veya Sheet yeniden indirilmez)
+            report_df = query_submissions_snapshot(**filters)
+            if report_df.empty:
+                st.info("📭 No submissions match the filters.")
+            else:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Submissions", len(report_df))
+                with col2:
+                    st.metric("Drivers", report_df["Driver Name"].nunique() if "Driver Name" in report_df.columns else 0)
+                with col3:
+                    st.metric("Vehicles", report_df["Vehicle"].nunique() if "Vehicle" in report_df.columns else 0)
+                
+                if "Timestamp" in report_df.columns:
+                    st.write("**Submissions per Day**")
+                    st.bar_chart(report_df["Timestamp"].dt.date.value_counts().sort_index())
+                
+                if "Vehicle" in report_df.columns:
+                    st.write("**Submissions per Vehicle**")
+                    per_vehicle = report_df["Vehicle"].value_counts()
+                    # Kategorik kolonda filtre dışında kalan araçlar 0 olarak gelir
+                    st.dataframe(per_vehicle[per_vehicle > 0].rename("Submissions"), width='stretch')
+                
+                check_prefixes = tuple(f"{prefix}_" for prefix, _ in CHECK_SECTION_TITLES)
+                attention = {}
+                for col in report_df.columns:
+                    if str(col).startswith(check_prefixes):
+                        values = report_df[col].astype(object)
+                        count = int((values.notna() & (values != "OK")).sum())
+                        if count:
+                            attention[col.replace("_", " ")] = count
+                st.write("**Checks Needing Attention**")
+                if attention:
+                    import pandas as pd
+                    attention_df = pd.DataFrame({"Check": list(attention), "Submissions": list(attention.values())})
+                    st.dataframe(attention_df.sort_values("Submissions", ascending=False), width='stretch', hide_index=True)
+                else:
+                    st.success("✅ All checks OK.")
         else:
-            # Card view
-            for idx, submission in enumerate(filtered_submissions):
+            # Card view (sadece sayfadaki gönderimler; kontrol kolonları başlık düzeni başına bir kez gruplanır)
+            for idx, submission in enumerate(page.rows):
+                schema = get_submission_schema_for(submission)
                 with st.expander(
                     f"📋 {submission.get('Driver Name', 'N/A')} - {submission.get('Vehicle', 'N/A')} - {submission.get('Timestamp', 'N/A')}",
                     expanded=False
@@ -798,45 +909,15 @@ def admin_form_submissions():
                     # Checks details
                     st.write("**Checks**")
                     
-                    # Exterior Checks
-                    exterior_cols = [col for col in submission.keys() if col.startswith("Exterior_")]
-                    if exterior_cols:
-                        st.write("*Exterior Checks:*")
-                        for col in exterior_cols:
-                            field_name = col.replace("Exterior_", "").replace("_", " ").title()
-                            value = submission.get(col, "N/A")
-                            status_icon = "✅" if value == "OK" else "⚠️"
-                            st.write(f"  {status_icon} {field_name}: {value}")
-                    
-                    # Engine Checks
-                    engine_cols = [col for col in submission.keys() if col.startswith("Engine_")]
-                    if engine_cols:
-                        st.write("*Engine & Mechanical Checks:*")
-                        for col in engine_cols:
-                            field_name = col.replace("Engine_", "").replace("_", " ").title()
-                            value = submission.get(col, "N/A")
-                            status_icon = "✅" if value == "OK" else "⚠️"
-                            st.write(f"  {status_icon} {field_name}: {value}")
-                    
-                    # Safety Equipment
-                    safety_cols = [col for col in submission.keys() if col.startswith("Safety_")]
-                    if safety_cols:
-                        st.write("*Safety Equipment:*")
-                        for col in safety_cols:
-                            field_name = col.replace("Safety_", "").replace("_", " ").title()
-                            value = submission.get(col, "N/A")
-                            status_icon = "✅" if value == "OK" else "⚠️"
-                            st.write(f"  {status_icon} {field_name}: {value}")
-                    
-                    # Interior Checks
-                    interior_cols = [col for col in submission.keys() if col.startswith("Interior_")]
-                    if interior_cols:
-                        st.write("*Interior Checks:*")
-                        for col in interior_cols:
-                            field_name = col.replace("Interior_", "").replace("_", " ").title()
-                            value = submission.get(col, "N/A")
-                            status_icon = "✅" if value == "OK" else "⚠️"
-                            st.write(f"  {status_icon} {field_name}: {value}")
+                    for prefix, title in CHECK_SECTION_TITLES:
+                        check_cols = schema.category_headers.get(prefix, [])
+                        if check_cols:
+                            st.write(f"*{title}:*")
+                            for col in check_cols:
+                                field_name = col[len(prefix) + 1:].replace("_", " ").title()
+                                value = submission.get(col, "N/A")
+                                status_icon = "✅" if value == "OK" else "⚠️"
+                                st.write(f"  {status_icon} {field_name}: {value}")
                     
                     st.divider()
     
@@ -851,7 +932,8 @@ def admin_user_management():
     st.write("Manage users: add, edit, or delete users.")
     
     try:
-        users = load_users()
+        # Admin bayrağı aynı okumadan gelir (kullanıcı başına is_admin çağrısı yapılmaz)
+        users = load_users_with_roles()
         
         st.metric("Total Users", len(users) if users else 0)
         
@@ -875,7 +957,7 @@ def admin_user_management():
                         "Username": username,
                         "Full Name": user_data.get("full_name", ""),
                         "Email": user_data.get("email", "") or "❌ Not set",
-                        "Admin": "✅ Yes" if is_admin(username) else "❌ No"
+                        "Admin": "✅ Yes" if user_data.get("is_admin") else "❌ No"
                     })
                 
                 df = pd.DataFrame(user_list)
@@ -941,7 +1023,7 @@ def admin_user_management():
                         )
                         is_admin_user = st.checkbox(
                             "Admin User",
-                            value=is_admin(selected_username),
+                            value=user_data.get("is_admin", False),
                             key="edit_is_admin"
                         )
                         
@@ -994,6 +1076,62 @@ def admin_user_management():
     except Exception as e:
         st.error(f"❌ Error: {str(e)}")
 
+def _read_bulk_values(pasted_text, uploaded_file, header):
+    """Yapıştırılan metindeki (satır başına bir değer) ve CSV dosyasının ilk sütunundaki değerleri okur"""
+    import csv
+    import io
+    sources = [pasted_text.splitlines() if pasted_text else []]
+    if uploaded_file is not None:
+        rows = csv.reader(io.StringIO(uploaded_file.getvalue().decode("utf-8-sig")))
+        sources.append([row[0] for row in rows if row])
+    values = []
+    for column in sources:
+        # Başlık satırı varsa atla
+        if column and column[0].strip().lower() == header.lower():
+            column = column[1:]
+        values.extend(column)
+    return clean_reference_values(values)
+
+def admin_bulk_import(label, header, current_values, add_values, replace_values, key):
+    """Toplu yükleme - CSV dosyası veya yapıştırılan liste ile ekleme ya da listeyi değiştirme"""
+    st.subheader(f"📋 Bulk Import {label}")
+    st.caption(f"Paste one value per line or upload a CSV file (first column is used, a '{header}' header row is skipped).")
+    
+    pasted_text = st.text_area("Values", height=200, key=f"{key}_bulk_text")
+    uploaded_file = st.file_uploader("CSV File", type=["csv", "txt"], key=f"{key}_bulk_file")
+    mode = st.radio(
+        "Import Mode",
+        ["Add new values", "Replace entire list"],
+        horizontal=True,
+        key=f"{key}_bulk_mode"
+    )
+    
+    values = _read_bulk_values(pasted_text, uploaded_file, header)
+    if not values:
+        st.info("📭 No values to import yet.")
+        return
+    
+    current = set(current_values)
+    new_values = [value for value in values if value not in current]
+    if mode == "Add new values":
+        st.write(f"**{len(new_values)}** new, **{len(values) - len(new_values)}** already in the list.")
+    else:
+        kept = set(values)
+        removed_values = [value for value in current_values if value not in kept]
+        st.write(f"**{len(new_values)}** added, **{len(removed_values)}** removed, **{len(values)}** in the list after import.")
+        if removed_values:
+            st.warning("⚠️ These will be removed: " + ", ".join(removed_values))
+    
+    if st.button("📥 Import", type="primary", width='stretch', key=f"{key}_bulk_submit"):
+        if mode == "Add new values":
+            added = add_values(values)
+            st.session_state.admin_message = f"✅ {len(added)} value(s) added to {label.lower()}."
+        else:
+            changes = replace_values(values)
+            st.session_state.admin_message = f"✅ {label} replaced ({len(changes['added'])} added, {len(changes['removed'])} removed)."
+        st.session_state.admin_message_type = "success"
+        st.rerun()
+
 def admin_vehicle_management():
     """Vehicle management - Add, edit, delete"""
     st.subheader("🚗 Vehicle Management")
@@ -1006,7 +1144,7 @@ def admin_vehicle_management():
         
         action = st.radio(
             "Select Action",
-            ["View Vehicles", "Add Vehicle", "Edit Vehicle", "Delete Vehicle"],
+            ["View Vehicles", "Add Vehicle", "Edit Vehicle", "Delete Vehicle", "Bulk Import"],
             horizontal=True
         )
         
@@ -1076,6 +1214,9 @@ def admin_vehicle_management():
                                     st.session_state.admin_message_type = "error"
                                     st.rerun()
         
+        elif action == "Bulk Import":
+            admin_bulk_import("Vehicles", "Vehicle", vehicles, add_vehicles, replace_vehicles, "vehicles")
+        
         elif action == "Delete Vehicle":
             st.subheader("🗑️ Delete Vehicle")
             if not vehicles:
@@ -1115,7 +1256,7 @@ def admin_fuel_level_management():
         
         action = st.radio(
             "Select Action",
-            ["View Fuel Levels", "Add Fuel Level", "Edit Fuel Level", "Delete Fuel Level"],
+            ["View Fuel Levels", "Add Fuel Level", "Edit Fuel Level", "Delete Fuel Level", "Bulk Import"],
             horizontal=True
         )
         
@@ -1185,6 +1326,9 @@ def admin_fuel_level_management():
                                     st.session_state.admin_message_type = "error"
                                     st.rerun()
         
+        elif action == "Bulk Import":
+            admin_bulk_import("Fuel Levels", "Level", fuel_levels, add_fuel_levels, replace_fuel_levels, "fuel_levels")
+        
         elif action == "Delete Fuel Level":
             st.subheader("🗑️ Delete Fuel Level")
             if not fuel_levels:
@@ -1238,7 +1382,7 @@ def admin_check_fields_management():
         
         action = st.radio(
             "Select Action",
-            ["View Fields", "Add Field", "Edit Field", "Delete Field"],
+            ["View Fields", "Add Field", "Edit Field", "Delete Field", "Bulk Import"],
             horizontal=True
         )
         
@@ -1308,6 +1452,14 @@ def admin_check_fields_management():
                                     st.session_state.admin_message_type = "error"
                                     st.rerun()
         
+        elif action == "Bulk Import":
+            admin_bulk_import(
+                f"{selected_category_display} Fields", "Field", check_fields,
+                lambda values: add_check_fields(selected_category_sheet, values),
+                lambda values: replace_check_fields(selected_category_sheet, values),
+                f"check_fields_{selected_category_sheet}"
+            )
+        
         elif action == "Delete Field":
             st.subheader(f"🗑️ Delete {selected_category_display} Field")
             if not check_fields:
@@ -1347,7 +1499,7 @@ def admin_items_management():
         
         action = st.radio(
             "Select Action",
-            ["View Items", "Add Item", "Edit Item", "Delete Item"],
+            ["View Items", "Add Item", "Edit Item", "Delete Item", "Bulk Import"],
             horizontal=True
         )
         
@@ -1417,6 +1569,9 @@ def admin_items_management():
                                     st.session_state.admin_message_type = "error"
                                     st.rerun()
         
+        elif action == "Bulk Import":
+            admin_bulk_import("Items", "Item", items, add_items, replace_items, "items")
+        
         elif action == "Delete Item":
             st.subheader("🗑️ Delete Item")
             if not items:
@@ -1444,6 +1599,41 @@ def admin_items_management():
     except Exception as e:
         st.error(f"❌ Error: {str(e)}")
 
+def admin_data_transfer():
+    """SQLite veritabanı ile Excel arasında veri aktarımı"""
+    st.subheader("💾 Data Import/Export")
+    st.write("Move data between the SQLite database and the Excel workbook format.")
+    
+    try:
+        st.markdown("#### 📤 Export")
+        if st.button("Prepare Excel Export", width='stretch'):
+            import io
+            import pandas as pd
+            buffer = io.BytesIO()
+            export_sqlite_to_excel(buffer)
+            st.download_button(
+                label="📥 Download form_data.xlsx",
+                data=buffer.getvalue(),
+                file_name=f"form_data_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+        
+        st.divider()
+        
+        st.markdown("#### 📥 Import")
+        st.warning("⚠️ Importing replaces the users, lists and submissions stored in the database.")
+        uploaded_file = st.file_uploader("Excel file (leave empty to use form_data.xlsx)", type=["xlsx"])
+        
+        if st.button("📥 Import into Database", type="primary", width='stretch'):
+            counts = import_excel_to_sqlite(uploaded_file)
+            summary = ", ".join(f"{name}: {count}" for name, count in counts.items())
+            st.session_state.admin_message = f"✅ Import completed ({summary})"
+            st.session_state.admin_message_type = "success"
+            st.rerun()
+        
+    except Exception as e:
+        st.error(f"❌ Error: {str(e)}")
+
 def main():
     """Ana uygulama akışı"""
     # Mobil için üst menü (sidebar yerine)
@@ -6,6 +6,11 @@ Bulut ortamı için optimize edildi
 """
 import os
 import json
+import threading
+import functools
+import contextlib
+import time
+from dataclasses import dataclass, field as dataclass_field
 from openpyxl import Workbook, load_workbook
 from openpyxl.utils import get_column_letter
 
@@ -77,34 +82,301 @@ if USE_GOOGLE_SHEETS:
     except ImportError:
         USE_GOOGLE_SHEETS = False
 
+GOOGLE_SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+
+# Google Sheets client havuzu - süreç genelinde tek client, tüm Streamlit oturumları paylaşır
+# Her çağrıda credentials parse + gspread.authorize yapmak yerine client bir kez oluşturulur
+_gs_client_lock = threading.RLock()
+_gs_client = None
+_gs_credentials = None
+_gs_spreadsheets = {}
+_gs_worksheets = {}
+_gs_client_stats = {
+    "handshakes": 0,
+    "handshakes_avoided": 0,
+    "token_refreshes": 0,
+    "spreadsheet_opens": 0,
+    "spreadsheet_reuses": 0,
+    "worksheet_opens": 0,
+    "worksheet_reuses": 0,
+    "failures": 0,
+    "resets": 0,
+}
+
+def _parse_google_credentials():
+    """GOOGLE_CREDENTIALS_JSON değerini dict'e çevirir"""
+    if isinstance(GOOGLE_CREDENTIALS_JSON, str):
+        return json.loads(GOOGLE_CREDENTIALS_JSON)
+    return dict(GOOGLE_CREDENTIALS_JSON)
+
+def _refresh_google_credentials_if_needed():
+    """Süresi dolmuş access token'ı yeniler (lock altında çağrılmalı)"""
+    creds = _gs_credentials
+    # Token hiç alınmadıysa gspread ilk istekte kendisi alır
+    if creds is None or not creds.token or not creds.expired:
+        return
+    from google.auth.transport.requests import Request
+    creds.refresh(Request())
+    _gs_client_stats["token_refreshes"] += 1
+
 def get_google_sheets_client():
-    """Google Sheets client'ı oluşturur ve döndürür"""
+    """Paylaşılan Google Sheets client'ını döndürür, yoksa oluşturur"""
+    global _gs_client, _gs_credentials
     if not USE_GOOGLE_SHEETS:
         return None
+    if not GOOGLE_CREDENTIALS_JSON or not GOOGLE_SHEET_ID:
+        return None
     
-    try:
-        if not GOOGLE_CREDENTIALS_JSON or not GOOGLE_SHEET_ID:
-            return None
-        
-        # JSON string'ini parse et
-        import json as json_module
-        if isinstance(GOOGLE_CREDENTIALS_JSON, str):
-            creds_dict = json_module.loads(GOOGLE_CREDENTIALS_JSON)
-        else:
-            creds_dict = GOOGLE_CREDENTIALS_JSON
+    with _gs_client_lock:
+        if _gs_client is not None:
+            try:
+                _refresh_google_credentials_if_needed()
+                _gs_client_stats["handshakes_avoided"] += 1
+                return _gs_client
+            except Exception as e:
+                # Token yenilenemediyse client'ı at ve baştan yetkilendir
+                _log("E", "excel_handler.py:get_google_sheets_client", "Token refresh failed, re-authorizing", {"error": str(e)})
+                _reset_google_sheets_client_locked()
         
-        # Credentials oluştur
-        creds = Credentials.from_service_account_info(
-            creds_dict,
-            scopes=['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-        )
+        try:
+            creds = Credentials.from_service_account_info(_parse_google_credentials(), scopes=GOOGLE_SCOPES)
+            client = gspread.authorize(creds, http_client=_rate_limited_http_client_class())
+        except Exception as e:
+            _gs_client_stats["failures"] += 1
+            _log("ERROR", "excel_handler.py:get_google_sheets_client", "Failed to create Google Sheets client", {"error": str(e)})
+            return None
         
-        # Client oluştur
-        client = gspread.authorize(creds)
+        _gs_client = client
+        _gs_credentials = creds
+        _gs_client_stats["handshakes"] += 1
         return client
-    except Exception as e:
-        _log("ERROR", "excel_handler.py:get_google_sheets_client", "Failed to create Google Sheets client", {"error": str(e)})
+
+def get_google_spreadsheet(sheet_id=None):
+    """GOOGLE_SHEET_ID (veya verilen id) için önbellekteki Spreadsheet nesnesini döndürür"""
+    sheet_id = sheet_id or GOOGLE_SHEET_ID
+    client = get_google_sheets_client()
+    if not client:
+        return None
+    with _gs_client_lock:
+        spreadsheet = _gs_spreadsheets.get(sheet_id)
+        if spreadsheet is not None:
+            _gs_client_stats["spreadsheet_reuses"] += 1
+            return spreadsheet
+    # İstek lock dışında yapılır: kota beklemesi veya yeniden deneme diğer thread'leri (gönderimleri) bekletmesin
+    spreadsheet = client.open_by_key(sheet_id)
+    with _gs_client_lock:
+        # Aynı anda açan başka bir thread önce yazdıysa onun nesnesi kullanılır
+        spreadsheet = _gs_spreadsheets.setdefault(sheet_id, spreadsheet)
+        _gs_client_stats["spreadsheet_opens"] += 1
+        return spreadsheet
+
+def get_google_worksheet(title, sheet_id=None):
+    """Önbellekteki Worksheet nesnesini döndürür (her çağrıda metadata isteği yapılmaz)"""
+    sheet_id = sheet_id or GOOGLE_SHEET_ID
+    spreadsheet = get_google_spreadsheet(sheet_id)
+    if spreadsheet is None:
         return None
+    key = (sheet_id, title)
+    with _gs_client_lock:
+        worksheet = _gs_worksheets.get(key)
+        if worksheet is not None:
+            _gs_client_stats["worksheet_reuses"] += 1
+            return worksheet
+    # open_by_key ile aynı şekilde istek lock dışında yapılır
+    worksheet = spreadsheet.worksheet(title)
+    with _gs_client_lock:
+        worksheet = _gs_worksheets.setdefault(key, worksheet)
+        _gs_client_stats["worksheet_opens"] += 1
+        return worksheet
+
+def _reset_google_sheets_client_locked():
+    global _gs_client, _gs_credentials
+    _gs_client = None
+    _gs_credentials = None
+    _gs_spreadsheets.clear()
+    _gs_worksheets.clear()
+    _gs_client_stats["resets"] += 1
+
+def reset_google_sheets_client():
+    """Paylaşılan client'ı ve önbellekteki Spreadsheet/Worksheet nesnelerini sıfırlar"""
+    with _gs_client_lock:
+        _reset_google_sheets_client_locked()
+
+def _on_google_sheets_error(error):
+    """Sheets hatasından sonra önbellekteki nesneleri temizler
+    Yetki hatasında (401) client baştan oluşturulur, diğer hatalarda sadece handle'lar atılır
+    """
+    code = getattr(error, "code", None)
+    with _gs_client_lock:
+        if code == 401:
+            _reset_google_sheets_client_locked()
+        else:
+            _gs_spreadsheets.clear()
+            _gs_worksheets.clear()
+
+def get_google_sheets_client_stats():
+    """Client havuzu sayaçlarını döndürür (kaç yetkilendirmeden kaçınıldığı dahil)"""
+    with _gs_client_lock:
+        stats = dict(_gs_client_stats)
+        stats["client_active"] = _gs_client is not None
+        stats["cached_spreadsheets"] = len(_gs_spreadsheets)
+        stats["cached_worksheets"] = len(_gs_worksheets)
+    return stats
+
+# Sheets API kota limiti - client'ın yaptığı her istek okuma/yazma token bucket'ından geçer
+# Google'ın dakikalık kotası aşılmadan istekler sıraya girer; öncelikli istekler (gönderimler) önce çıkar.
+# 429 ve 5xx hatalarında istek üstel bekleme süresiyle (jitter ile) yeniden denenir
+try:
+    SHEETS_READ_REQUESTS_PER_MINUTE = max(1, int(get_secret("SHEETS_READ_REQUESTS_PER_MINUTE", "60")))
+    SHEETS_WRITE_REQUESTS_PER_MINUTE = max(1, int(get_secret("SHEETS_WRITE_REQUESTS_PER_MINUTE", "60")))
+    SHEETS_MAX_RETRIES = max(0, int(get_secret("SHEETS_MAX_RETRIES", "5")))
+    SHEETS_RETRY_BASE_DELAY = float(get_secret("SHEETS_RETRY_BASE_DELAY", "1"))
+    SHEETS_RETRY_MAX_DELAY = float(get_secret("SHEETS_RETRY_MAX_DELAY", "32"))
+except (TypeError, ValueError):
+    SHEETS_READ_REQUESTS_PER_MINUTE = 60
+    SHEETS_WRITE_REQUESTS_PER_MINUTE = 60
+    SHEETS_MAX_RETRIES = 5
+    SHEETS_RETRY_BASE_DELAY = 1.0
+    SHEETS_RETRY_MAX_DELAY = 32.0
+
+# İstek öncelikleri (küçük değer önce)
+SHEETS_PRIORITY_SUBMISSION = 0
+SHEETS_PRIORITY_INTERACTIVE = 1
+SHEETS_PRIORITY_ADMIN = 2
+
+class _TokenBucket:
+    """Dakikalık kota için token bucket; bekleyenler öncelik (sonra geliş) sırasıyla token alır"""
+
+    def __init__(self, requests_per_minute):
+        self.capacity = float(requests_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._condition = threading.Condition()
+        self._waiting = []  # heap: (öncelik, sıra)
+        self._sequence = 0
+        self.stats = {"acquired": 0, "waited": 0, "wait_seconds": 0.0, "throttled": 0}
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority):
+        """Token alınana kadar bekler, beklenen süreyi döndürür"""
+        import heapq
+        with self._condition:
+            self._sequence += 1
+            ticket = (priority, self._sequence)
+            heapq.heappush(self._waiting, ticket)
+            started = time.monotonic()
+            try:
+                while True:
+                    self._refill()
+                    if self._waiting[0] != ticket:
+                        self._condition.wait()
+                    elif self.tokens < 1:
+                        self._condition.wait((1 - self.tokens) / self.rate)
+                    else:
+                        break
+                self.tokens -= 1
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+            waited = time.monotonic() - started
+            self.stats["acquired"] += 1
+            if waited > 0.001:
+                self.stats["waited"] += 1
+                self.stats["wait_seconds"] += waited
+            return waited
+
+    def throttle(self):
+        """Kota aşıldı (429): birikmiş token'lar atılır, istekler yeniden dolum hızına iner"""
+        with self._condition:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+            self.stats["throttled"] += 1
+
+_sheets_buckets = {
+    "read": _TokenBucket(SHEETS_READ_REQUESTS_PER_MINUTE),
+    "write": _TokenBucket(SHEETS_WRITE_REQUESTS_PER_MINUTE),
+}
+_sheets_request_context = threading.local()
+_sheets_retry_stats = {"retries": 0, "gave_up": 0}
+
+@contextlib.contextmanager
+def sheets_priority(priority):
+    """Bu blok içinde (aynı thread'de) yapılan Sheets isteklerinin önceliğini belirler"""
+    previous = getattr(_sheets_request_context, "priority", SHEETS_PRIORITY_INTERACTIVE)
+    _sheets_request_context.priority = priority
+    try:
+        yield
+    finally:
+        _sheets_request_context.priority = previous
+
+def _is_retryable_sheets_error(method, code):
+    """429 her istekte yeniden denenir (istek işlenmemiştir); 5xx/408 sadece tekrarı güvenli
+    (GET/PUT) isteklerde, append ve batch_update (POST) iki kez uygulanmasın diye
+    """
+    if code == 429:
+        return True
+    if code == 408 or (isinstance(code, int) and code >= 500):
+        return method.upper() in ("GET", "PUT")
+    return False
+
+def _sheets_retry_delay(attempts):
+    """Üstel bekleme süresi (jitter ile), SHEETS_RETRY_MAX_DELAY ile sınırlı"""
+    import random
+    delay = min(SHEETS_RETRY_BASE_DELAY * (2 ** (attempts - 1)), SHEETS_RETRY_MAX_DELAY)
+    return delay * random.uniform(0.5, 1.0)
+
+def _call_sheets_api(method, send):
+    """Sheets isteğini kota limitinden geçirerek gönderir, geçici hatalarda yeniden dener"""
+    bucket = _sheets_buckets["read" if method.upper() == "GET" else "write"]
+    priority = getattr(_sheets_request_context, "priority", SHEETS_PRIORITY_INTERACTIVE)
+    attempts = 0
+    while True:
+        bucket.acquire(priority)
+        try:
+            return send()
+        except Exception as e:
+            code = getattr(e, "code", None)
+            if not _is_retryable_sheets_error(method, code):
+                raise
+            if code == 429:
+                bucket.throttle()
+            attempts += 1
+            if attempts > SHEETS_MAX_RETRIES:
+                with _gs_client_lock:
+                    _sheets_retry_stats["gave_up"] += 1
+                raise
+            delay = _sheets_retry_delay(attempts)
+            with _gs_client_lock:
+                _sheets_retry_stats["retries"] += 1
+            _log("E", "excel_handler.py:_call_sheets_api", "Sheets request failed, retrying", {"code": code, "attempts": attempts, "delay": delay})
+            time.sleep(delay)
+
+def _rate_limited_http_client_class():
+    """gspread'in HTTP client'ı; her istek _call_sheets_api üzerinden gönderilir"""
+    from gspread.http_client import HTTPClient
+
+    class RateLimitedHTTPClient(HTTPClient):
+        def request(self, method, endpoint, *args, **kwargs):
+            return _call_sheets_api(method, lambda: super(RateLimitedHTTPClient, self).request(method, endpoint, *args, **kwargs))
+
+    return RateLimitedHTTPClient
+
+def get_sheets_rate_limit_stats():
+    """Okuma/yazma bucket'larının durumunu ve yeniden deneme sayaçlarını döndürür"""
+    stats = {}
+    for kind, bucket in _sheets_buckets.items():
+        with bucket._condition:
+            bucket._refill()
+            stats[kind] = dict(bucket.stats, tokens=bucket.tokens, requests_per_minute=bucket.capacity, queued=len(bucket._waiting))
+    with _gs_client_lock:
+        stats.update(_sheets_retry_stats)
+    return stats
 
 # Logging - bulut ortamında devre dışı (opsiyonel olarak Streamlit logging kullanılabilir)
 def _log(hypothesis_id, location, message, data):
@@ -128,6 +400,33 @@ EXCEL_FILE_TEMP = os.path.join(TEMP_DIR, "form_data.xlsx")
 # Streamlit Cloud'da da bu dosya kalıcı olacak
 EXCEL_FILE = EXCEL_FILE_LOCAL
 
+# SQLite depolama (opsiyonel) - açıksa Google Sheets ve Excel yerine kullanılır
+# İlk açılışta veritabanı boşsa veriler form_data.xlsx'ten aktarılır (önce günlükte bekleyen gönderimler
+# Submissions sheet'ine yazılır)
+USE_SQLITE = str(get_secret("USE_SQLITE", "false")).lower() == "true"
+SQLITE_FILE = get_secret("SQLITE_FILE", "") or os.path.join(CURRENT_DIR, "form_data.db")
+
+def _sqlite_store():
+    """Yapılandırılmış sqlite_handler modülünü döndürür"""
+    import sqlite_handler
+    sqlite_handler.initialize(SQLITE_FILE, seed_excel_file=EXCEL_FILE, before_seed=compact_submission_journal)
+    return sqlite_handler
+
+def import_excel_to_sqlite(source=None):
+    """form_data.xlsx (veya yüklenen dosya) içeriğini SQLite veritabanına aktarır"""
+    store = _sqlite_store()
+    if source is None:
+        # Günlükte bekleyen gönderimler aktarıma dahil olsun
+        compact_submission_journal()
+    counts = store.import_from_excel(source or EXCEL_FILE)
+    invalidate_reference_cache()
+    invalidate_user_directory()
+    return counts
+
+def export_sqlite_to_excel(target):
+    """SQLite veritabanını form_data.xlsx formatında target'a (yol veya BytesIO) yazar"""
+    _sqlite_store().export_to_excel(target)
+
 def create_default_excel():
     """Default değerlerle Excel dosyası oluşturur"""
     wb = Workbook()
@@ -194,11 +493,13 @@ def create_default_excel():
     ws_users.append(["innovodriver", "123456", "Mehmet Berk", "mehmet.berk@example.com", "No"])
     ws_users.append(["admin", "admin123", "Admin User", "admin@example.com", "Yes"])
     
-    wb.save(EXCEL_FILE)
+    _save_workbook(wb)
+    invalidate_reference_cache()
+    invalidate_user_directory()
     return wb
 
-def get_excel_file():
-    """Excel dosyasını açar, yoksa oluşturur - Mevcut verileri korur"""
+def _open_excel_file():
+    """Excel dosyasını diskten açar, yoksa oluşturur - Mevcut verileri korur"""
     # Google Sheets kullanılıyorsa Excel dosyasına gerek yok
     if USE_GOOGLE_SHEETS:
         # Yine de fallback için varsayılan Excel oluştur
@@ -232,7 +533,7 @@ def get_excel_file():
                     ws.append(["Username", "Password", "Full Name", "Email", "Admin"])
                 modified = True
         if modified:
-            wb.save(EXCEL_FILE)
+            _save_workbook(wb)
         return wb
     except Exception as e:
         # Dosya bozuksa yeniden oluştur (son çare - mevcut veriler kaybolur)
@@ -251,510 +552,1720 @@ def get_excel_file():
             pass
         return create_default_excel()
 
-def load_vehicles():
-    """Vehicles sheet'inden araç listesini okur"""
-    # Google Sheets'ten oku
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
-            try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Vehicles")
-                all_values = sheet.get_all_values()
-                vehicles = []
-                for row in all_values[1:]:  # İlk satır başlık
-                    if row and row[0]:
-                        vehicles.append(row[0])
-                return vehicles
-            except Exception as e:
-                _log("E", "excel_handler.py:load_vehicles:google_sheets", "Google Sheets load failed, falling back to Excel", {"error": str(e)})
-    
-    # Excel'den oku (fallback)
-    wb = get_excel_file()
-    ws = wb["Vehicles"]
-    vehicles = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row[0]:
-            vehicles.append(row[0])
-    return vehicles
+# Bellekte tutulan workbook - her çağrıda load_workbook yapmak yerine bir kez yüklenir
+# Dosyanın mtime/boyutu izlenir; dışarıdan değiştirilirse workbook yeniden yüklenir
+try:
+    WORKBOOK_MAX_RESIDENT_CELLS = int(get_secret("WORKBOOK_MAX_RESIDENT_CELLS", "500000"))
+except (TypeError, ValueError):
+    WORKBOOK_MAX_RESIDENT_CELLS = 500000
+EXCEL_ROW_CHUNK_SIZE = 1000  # bellekteki sheet'ler kilit altında bu kadar satırlık parçalarla okunur
 
-def load_fuel_levels():
-    """FuelLevels sheet'inden yakıt seviyelerini okur"""
-    # Google Sheets'ten oku
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
-            try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("FuelLevels")
-                all_values = sheet.get_all_values()
-                levels = []
-                for row in all_values[1:]:  # İlk satır başlık
-                    if row and row[0]:
-                        levels.append(row[0])
-                return levels
-            except Exception as e:
-                _log("E", "excel_handler.py:load_fuel_levels:google_sheets", "Google Sheets load failed, falling back to Excel", {"error": str(e)})
-    
-    # Excel'den oku (fallback)
-    wb = get_excel_file()
-    ws = wb["FuelLevels"]
-    levels = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row[0]:
-            levels.append(row[0])
-    return levels
+_workbook_lock = threading.RLock()
+_resident_workbook = None
+_resident_signature = None  # (mtime_ns, boyut)
+_resident_cells = 0
+_stream_threshold_bytes = None  # bu boyuttan büyük dosyalar bellekte tutulmaz, read-only okunur
+_workbook_stats = {"loads": 0, "hits": 0, "external_reloads": 0, "saves": 0, "not_kept_resident": 0, "streamed_reads": 0}
 
-def load_check_fields(category):
-    """İlgili sheet'ten kontrolleri okur
-    category: 'ExteriorChecks', 'EngineChecks', 'SafetyEquipment', 'InteriorChecks'
+def _excel_file_signature():
+    """EXCEL_FILE için (mtime_ns, boyut) döndürür, dosya yoksa None"""
+    try:
+        file_stat = os.stat(EXCEL_FILE)
+    except OSError:
+        return None
+    return (file_stat.st_mtime_ns, file_stat.st_size)
+
+def _estimate_workbook_cells(wb):
+    """Workbook'taki yaklaşık hücre sayısı (bellek kullanımının göstergesi)"""
+    return sum(ws.max_row * ws.max_column for ws in wb.worksheets)
+
+def _remember_workbook(wb):
+    """Diskteki hali ile aynı olan workbook'u bellekte tutar (limit aşılırsa tutmaz)"""
+    global _resident_workbook, _resident_signature, _resident_cells, _stream_threshold_bytes
+    cells = _estimate_workbook_cells(wb)
+    signature = _excel_file_signature()
+    if signature is None or cells > WORKBOOK_MAX_RESIDENT_CELLS:
+        _workbook_stats["not_kept_resident"] += 1
+        _resident_workbook, _resident_signature, _resident_cells = None, None, 0
+        if signature is not None:
+            _stream_threshold_bytes = signature[1]
+        return
+    _resident_workbook, _resident_signature, _resident_cells = wb, signature, cells
+
+def _drop_resident_workbook():
+    """Bellekteki workbook'u bırakır; sonraki get_excel_file diskten yükler"""
+    global _resident_workbook, _resident_signature, _resident_cells
+    with _workbook_lock:
+        _resident_workbook, _resident_signature, _resident_cells = None, None, 0
+
+def _save_workbook(wb, new_submissions=(), first_row=None, compacted=0):
+    """Workbook'u EXCEL_FILE'a kaydeder ve bellekteki kopyayı günceller
+    Gönderim indeksi için: new_submissions bu kayıtla Submissions'a first_row'dan itibaren eklenen (headers, row)
+    kayıtları, compacted ise günlükten first_row'dan itibaren aktarılan kayıt sayısıdır
     """
-    # Google Sheets'ten oku
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
+    with _workbook_lock:
+        before = {"workbook": _file_signature(EXCEL_FILE)}
+        try:
+            # Önce geçici dosyaya yaz, sonra yerine koy: read-only okuyucular yarım dosya görmez
+            temp_file = EXCEL_FILE + ".tmp"
+            wb.save(temp_file)
             try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet(category)
-                all_values = sheet.get_all_values()
-                fields = []
-                for row in all_values[1:]:  # İlk satır başlık
-                    if row and row[0]:
-                        fields.append(row[0])
-                return fields
-            except Exception as e:
-                _log("E", f"excel_handler.py:load_check_fields:google_sheets:{category}", "Google Sheets load failed, falling back to Excel", {"error": str(e)})
-    
-    # Excel'den oku (fallback)
-    wb = get_excel_file()
-    if category not in wb.sheetnames:
-        return []
-    ws = wb[category]
-    fields = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row[0]:
-            fields.append(row[0])
-    return fields
+                os.replace(temp_file, EXCEL_FILE)
+            except PermissionError:
+                # Windows'ta dosya başka bir okuyucuda açıksa doğrudan yaz
+                os.remove(temp_file)
+                wb.save(EXCEL_FILE)
+        except Exception:
+            # Bellekteki kopya artık diskle uyumlu değil
+            _drop_resident_workbook()
+            raise
+        _workbook_stats["saves"] += 1
+        _remember_workbook(wb)
+        # Kaydedilen workbook ertelenmiş referans değişikliklerini de içerir
+        _reference_changes_saved()
+        _submission_index_sources_changed(before, new_submissions, first_row, compacted)
 
-def load_items():
-    """Items sheet'inden eşya listesini okur"""
-    # Google Sheets'ten oku
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
-            try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Items")
-                all_values = sheet.get_all_values()
-                items = []
-                for row in all_values[1:]:  # İlk satır başlık
-                    if row and row[0]:
-                        items.append(row[0])
-                return items
-            except Exception as e:
-                _log("E", "excel_handler.py:load_items:google_sheets", "Google Sheets load failed, falling back to Excel", {"error": str(e)})
-    
-    # Excel'den oku (fallback)
-    wb = get_excel_file()
-    ws = wb["Items"]
-    items = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row[0]:
-            items.append(row[0])
-    return items
+def _with_workbook_lock(func):
+    """Fonksiyonu workbook kilidi altında çalıştırır (bellekteki workbook oturumlar arasında paylaşılır)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _workbook_lock:
+            return func(*args, **kwargs)
+    return wrapper
 
-def load_users():
-    """Users sheet'inden kullanıcıları okur"""
-    _log("A", "excel_handler.py:load_users:entry", "load_users called", {})
-    
-    # Google Sheets'ten oku
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
-            try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Users")
-                all_values = sheet.get_all_values()
-                
-                if not all_values or len(all_values) < 2:
-                    return {}
-                
-                headers = all_values[0]
-                _log("A", "excel_handler.py:load_users:headers", "Users sheet headers", {"headers": headers})
-                
-                users = {}
-                for row in all_values[1:]:  # İlk satır başlık
-                    if row and len(row) >= 3 and row[0] and row[1] and row[2]:
-                        users[row[0]] = {
-                            "password": row[1],
-                            "full_name": row[2],
-                            "email": row[3] if len(row) > 3 and row[3] else ""
-                        }
-                        _log("A", "excel_handler.py:load_users:user_added", "User added to dict", {"username": row[0]})
-                
-                _log("A", "excel_handler.py:load_users:exit", "load_users returning", {"user_count": len(users), "usernames": list(users.keys())})
-                return users
-            except Exception as e:
-                _log("E", "excel_handler.py:load_users:google_sheets", "Google Sheets load failed, falling back to Excel", {"error": str(e)})
-    
-    # Excel'den oku (fallback)
-    wb = get_excel_file()
-    ws = wb["Users"]
-    
-    headers = [cell.value for cell in ws[1]]
-    _log("A", "excel_handler.py:load_users:headers", "Users sheet headers", {"headers": headers})
-    
-    users = {}
-    row_num = 0
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        row_num += 1
-        _log("A", "excel_handler.py:load_users:row", f"Processing row {row_num}", {"row": list(row), "row_length": len(row) if row else 0})
-        if row[0] and row[1] and row[2]:
-            users[row[0]] = {
-                "password": row[1],
-                "full_name": row[2],
-                "email": row[3] if len(row) > 3 and row[3] else ""
-            }
-            _log("A", "excel_handler.py:load_users:user_added", "User added to dict", {"username": row[0]})
+def get_excel_file():
+    """Excel workbook'unu döndürür - dosya değişmediyse bellekteki kopya kullanılır"""
+    with _workbook_lock:
+        signature = _excel_file_signature()
+        if _resident_workbook is not None:
+            if signature == _resident_signature:
+                _workbook_stats["hits"] += 1
+                return _resident_workbook
+            # Dosya dışarıdan değişmiş
+            _workbook_stats["external_reloads"] += 1
+            invalidate_reference_cache()
+            invalidate_user_directory()
+            invalidate_submission_index()
+        wb = _open_excel_file()
+        _workbook_stats["loads"] += 1
+        if wb is not _resident_workbook:
+            _remember_workbook(wb)
+        # Kaydedilmemiş referans değişiklikleri (önceki çalışma veya dışarıdan yeniden yükleme) tekrar uygulanır
+        _replay_reference_oplog(wb)
+        return wb
+
+def _should_stream_excel(signature):
+    """Dosya bellekte tutulamayacak kadar büyükse True (read-only modda okunur, _workbook_lock altında çağrılmalı)"""
+    return (
+        signature is not None
+        and _resident_workbook is None
+        and _stream_threshold_bytes is not None
+        and signature[1] >= _stream_threshold_bytes
+    )
+
+def iter_excel_rows(sheet_name, min_row=1):
+    """Sheet satırlarını (values_only) generator olarak döndürür
+    Küçük dosyalar bellekteki workbook'tan EXCEL_ROW_CHUNK_SIZE satırlık parçalarla okunur (sheet kopyalanmaz);
+    bellekte tutulamayacak kadar büyük dosyalar read-only modda açılıp satır satır okunur. Her iki durumda da
+    ek bellek kullanımı satır sayısından bağımsız kalır
+    """
+    with _workbook_lock:
+        stream = _should_stream_excel(_excel_file_signature())
+        ws = None
+        if not stream:
+            wb = get_excel_file()
+            if sheet_name not in wb.sheetnames:
+                return
+            ws = wb[sheet_name]
+            # Okunacak aralık başta sabitlenir: sonradan eklenen satırlar okunmaz
+            # (max_row/max_column tüm hücreleri dolaşır, parça başına hesaplanmaz)
+            max_row, max_col = ws.max_row, ws.max_column
+        else:
+            _workbook_stats["streamed_reads"] += 1
+    
+    if ws is not None:
+        # Kilit parçalar arasında bırakılır. EXCEL_ROW_CHUNK_SIZE'dan kısa sheet'ler (referans listeleri, Users)
+        # tek parçada okunur; Submissions'a sadece satır eklendiği için okunmamış satırları yer değiştirmez.
+        # Çok parçalı bir Users okuması sırasında kullanıcı silinirse bir satır atlanabilir
+        for start in range(min_row, max_row + 1, EXCEL_ROW_CHUNK_SIZE):
+            end = min(start + EXCEL_ROW_CHUNK_SIZE - 1, max_row)
+            with _workbook_lock:
+                chunk = list(ws.iter_rows(min_row=start, max_row=end, max_col=max_col, values_only=True))
+            yield from chunk
+        return
     
-    _log("A", "excel_handler.py:load_users:exit", "load_users returning", {"user_count": len(users), "usernames": list(users.keys())})
-    return users
+    wb = load_workbook(EXCEL_FILE, read_only=True, data_only=True)
+    try:
+        if sheet_name not in wb.sheetnames:
+            return
+        for row in wb[sheet_name].iter_rows(min_row=min_row, values_only=True):
+            yield row
+    finally:
+        wb.close()
 
-def add_vehicle(vehicle_name):
-    """Yeni araç ekler"""
-    wb = get_excel_file()
-    ws = wb["Vehicles"]
-    # Aynı isimde araç var mı kontrol et
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row and row[0] == vehicle_name:
-            return False
-    ws.append([vehicle_name])
-    wb.save(EXCEL_FILE)
-    return True
+def get_workbook_stats():
+    """Bellekteki workbook istatistiklerini döndürür (yükleme/hit sayıları, hücre sayısı)"""
+    with _workbook_lock:
+        stats = dict(_workbook_stats)
+        stats["resident"] = _resident_workbook is not None
+        stats["resident_cells"] = _resident_cells
+        stats["max_resident_cells"] = WORKBOOK_MAX_RESIDENT_CELLS
+        stats["file_size"] = _resident_signature[1] if _resident_signature else None
+        stats["stream_threshold_bytes"] = _stream_threshold_bytes
+    return stats
 
-def delete_vehicle(vehicle_name):
-    """Aracı siler"""
-    wb = get_excel_file()
-    ws = wb["Vehicles"]
-    for row_idx in range(2, ws.max_row + 1):
-        if ws.cell(row=row_idx, column=1).value == vehicle_name:
-            ws.delete_rows(row_idx)
-            wb.save(EXCEL_FILE)
-            return True
-    return False
+# Referans listesi değişiklikleri için yazma tamponu (write-behind)
+# Admin değişiklikleri bellekteki workbook'a hemen uygulanır ama kayıt ertelenir: kısa bir süre
+# (REFERENCE_WRITE_BEHIND_DELAY) veya batch() bloğu içindeki tüm değişiklikler tek kayıtla yazılır.
+# Her değişiklikten sonra sheet'in yeni değer listesi op log'a (fsync) eklenir; süreç kayıttan önce kapanırsa
+# her sheet'in log'daki son hali bir sonraki yüklemede workbook'a yazılır. Herhangi bir workbook kaydı log'u temizler.
+REFERENCE_OPLOG_FILE = os.path.join(CURRENT_DIR, "form_data.reference_ops.jsonl")
+try:
+    REFERENCE_WRITE_BEHIND_DELAY = float(get_secret("REFERENCE_WRITE_BEHIND_DELAY", "2"))
+except (TypeError, ValueError):
+    REFERENCE_WRITE_BEHIND_DELAY = 2.0
 
-def update_vehicle(old_name, new_name):
-    """Araç adını günceller"""
-    wb = get_excel_file()
-    ws = wb["Vehicles"]
-    for row_idx in range(2, ws.max_row + 1):
-        if ws.cell(row=row_idx, column=1).value == old_name:
-            ws.cell(row=row_idx, column=1, value=new_name)
-            wb.save(EXCEL_FILE)
-            return True
-    return False
+_reference_batch_depth = 0
+_reference_pending = 0  # kaydedilmemiş (op log'daki) değişiklik sayısı
+_reference_flush_timer = None
+_reference_write_stats = {"operations": 0, "deferred": 0, "flushes": 0, "coalesced": 0, "replayed": 0}
 
-def add_fuel_level(level):
-    """Yeni yakıt seviyesi ekler"""
-    wb = get_excel_file()
-    ws = wb["FuelLevels"]
-    # Aynı seviye var mı kontrol et
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row and row[0] == level:
-            return False
-    ws.append([level])
-    wb.save(EXCEL_FILE)
-    return True
+def _reference_worksheet(wb, sheet):
+    """Referans sheet'ini döndürür, yoksa başlığıyla oluşturur"""
+    if sheet not in wb.sheetnames:
+        ws = wb.create_sheet(sheet)
+        ws.append([REFERENCE_SHEET_HEADERS.get(sheet, "Field")])
+        return ws
+    return wb[sheet]
 
-def delete_fuel_level(level):
-    """Yakıt seviyesini siler"""
-    wb = get_excel_file()
-    ws = wb["FuelLevels"]
-    for row_idx in range(2, ws.max_row + 1):
-        if ws.cell(row=row_idx, column=1).value == level:
-            ws.delete_rows(row_idx)
-            wb.save(EXCEL_FILE)
-            return True
-    return False
+def _reference_sheet_values(ws):
+    """Referans sheet'indeki değerler (başlık ve boş hücreler hariç)"""
+    return [row[0] for row in ws.iter_rows(min_row=2, values_only=True) if row and row[0] is not None]
 
-def update_fuel_level(old_level, new_level):
-    """Yakıt seviyesini günceller"""
-    wb = get_excel_file()
-    ws = wb["FuelLevels"]
-    for row_idx in range(2, ws.max_row + 1):
-        if ws.cell(row=row_idx, column=1).value == old_level:
-            ws.cell(row=row_idx, column=1, value=new_level)
-            wb.save(EXCEL_FILE)
-            return True
-    return False
+def _apply_reference_change(wb, operation, sheet, *args):
+    """Referans listesi değişikliğini workbook'a uygular (kaydetmez)
+    Değişiklik olmadıysa False (toplu ekleme: eklenen değerlerin listesi, boşsa değişiklik yok)
+    """
+    if operation == "add_list_values":
+        values, = args
+        ws = _reference_worksheet(wb, sheet)
+        existing = {row[0] for row in ws.iter_rows(min_row=2, values_only=True) if row}
+        added = []
+        for value in values:
+            if value not in existing:
+                existing.add(value)
+                ws.append([value])
+                added.append(value)
+        return added
 
-def add_check_field(category, field_name):
-    """Yeni kontrol alanı ekler"""
-    wb = get_excel_file()
-    if category not in wb.sheetnames:
-        wb.create_sheet(category)
-        ws = wb[category]
-        ws.append(["Field"])
-    else:
-        ws = wb[category]
-    # Aynı alan var mı kontrol et
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row and row[0] == field_name:
+    if operation == "replace_list_values":
+        values, = args
+        ws = _reference_worksheet(wb, sheet)
+        if _reference_sheet_values(ws) == list(values):
             return False
-    ws.append([field_name])
-    wb.save(EXCEL_FILE)
-    return True
+        if ws.max_row > 1:
+            ws.delete_rows(2, ws.max_row - 1)
+        for value in values:
+            ws.append([value])
+        return True
 
-def delete_check_field(category, field_name):
-    """Kontrol alanını siler"""
-    wb = get_excel_file()
-    if category not in wb.sheetnames:
-        return False
-    ws = wb[category]
-    for row_idx in range(2, ws.max_row + 1):
-        if ws.cell(row=row_idx, column=1).value == field_name:
-            ws.delete_rows(row_idx)
-            wb.save(EXCEL_FILE)
-            return True
-    return False
+    if operation == "add_list_value":
+        value, = args
+        ws = _reference_worksheet(wb, sheet)
+        # Aynı değer var mı kontrol et
+        for row in ws.iter_rows(min_row=2, values_only=True):
+            if row and row[0] == value:
+                return False
+        ws.append([value])
+        return True
 
-def update_check_field(category, old_name, new_name):
-    """Kontrol alanını günceller"""
-    wb = get_excel_file()
-    if category not in wb.sheetnames:
+    if operation not in ("delete_list_value", "update_list_value"):
+        raise ValueError(f"Unknown reference operation: {operation}")
+    if sheet not in wb.sheetnames:
         return False
-    ws = wb[category]
-    for row_idx in range(2, ws.max_row + 1):
-        if ws.cell(row=row_idx, column=1).value == old_name:
-            ws.cell(row=row_idx, column=1, value=new_name)
-            wb.save(EXCEL_FILE)
-            return True
-    return False
-
-def add_item(item_name):
-    """Yeni eşya ekler"""
-    wb = get_excel_file()
-    ws = wb["Items"]
-    # Aynı eşya var mı kontrol et
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row and row[0] == item_name:
-            return False
-    ws.append([item_name])
-    wb.save(EXCEL_FILE)
-    return True
-
-def delete_item(item_name):
-    """Eşyayı siler"""
-    wb = get_excel_file()
-    ws = wb["Items"]
+    ws = wb[sheet]
     for row_idx in range(2, ws.max_row + 1):
-        if ws.cell(row=row_idx, column=1).value == item_name:
-            ws.delete_rows(row_idx)
-            wb.save(EXCEL_FILE)
+        if ws.cell(row=row_idx, column=1).value == args[0]:
+            if operation == "delete_list_value":
+                ws.delete_rows(row_idx)
+            else:
+                ws.cell(row=row_idx, column=1, value=args[1])
             return True
     return False
 
-def update_item(old_name, new_name):
-    """Eşya adını günceller"""
-    wb = get_excel_file()
-    ws = wb["Items"]
-    for row_idx in range(2, ws.max_row + 1):
-        if ws.cell(row=row_idx, column=1).value == old_name:
-            ws.cell(row=row_idx, column=1, value=new_name)
-            wb.save(EXCEL_FILE)
-            return True
-    return False
+def _write_reference_change(operation, sheet, *args):
+    """Değişikliği bellekteki workbook'a uygular; kaydı erteler veya (tampon kapalıysa) hemen kaydeder"""
+    global _reference_pending
+    with _workbook_lock:
+        wb = get_excel_file()
+        result = _apply_reference_change(wb, operation, sheet, *args)
+        if not result:
+            return result
+        _reference_write_stats["operations"] += 1
+        deferred = _reference_batch_depth > 0 or REFERENCE_WRITE_BEHIND_DELAY > 0
+        if not deferred or wb is not _resident_workbook:
+            # Workbook bellekte tutulmuyorsa değişiklik ancak hemen kaydedilerek korunur
+            _save_workbook(wb)
+            return result
+        # İşlem yerine sonuç yazılır: log kayıttan sonra silinemezse tekrar uygulamak listeyi bozmaz
+        values = _reference_sheet_values(wb[sheet])
+        with open(REFERENCE_OPLOG_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"sheet": sheet, "values": values}, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        _reference_pending += 1
+        _reference_write_stats["deferred"] += 1
+        if _reference_batch_depth == 0:
+            _schedule_reference_flush()
+        return result
 
-def add_user(username, password, full_name, email="", is_admin_user=False):
-    """Yeni kullanıcı ekler"""
-    # Google Sheets kullanılıyorsa
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
-            try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Users")
-                all_values = sheet.get_all_values()
-                
-                # Başlık kontrolü
-                if not all_values:
-                    sheet.append_row(["Username", "Password", "Full Name", "Email", "Admin"])
-                
-                # Kullanıcı zaten var mı kontrol et
-                for row in all_values[1:]:
-                    if row and row[0] == username:
-                        return False
-                
-                # Yeni kullanıcı ekle
-                sheet.append_row([username, password, full_name, email, "Yes" if is_admin_user else "No"])
-                return True
-            except Exception as e:
-                _log("E", "excel_handler.py:add_user:google_sheets", "Failed to add user to Google Sheets", {"error": str(e)})
-                return False
-    
-    # Excel'e ekle
-    wb = get_excel_file()
-    ws = wb["Users"]
-    
-    # Başlık satırını kontrol et ve gerekli kolonları ekle
-    headers = [cell.value for cell in ws[1]]
-    if "Email" not in headers:
-        ws.cell(row=1, column=len(headers) + 1, value="Email")
-        headers.append("Email")
-    if "Admin" not in headers:
-        ws.cell(row=1, column=len(headers) + 1, value="Admin")
-        headers.append("Admin")
-    
-    # Kullanıcı zaten var mı kontrol et
-    for row_idx in range(2, ws.max_row + 1):
-        if ws.cell(row=row_idx, column=1).value == username:
-            return False
-    
-    # Yeni satır ekle
-    username_col = 1
-    password_col = 2
-    full_name_col = 3
-    email_col = headers.index("Email") + 1 if "Email" in headers else 4
-    admin_col = headers.index("Admin") + 1 if "Admin" in headers else 5
-    
-    new_row = [None] * max(username_col, password_col, full_name_col, email_col, admin_col)
-    new_row[username_col - 1] = username
-    new_row[password_col - 1] = password
-    new_row[full_name_col - 1] = full_name
-    if email_col <= len(new_row):
-        new_row[email_col - 1] = email
-    if admin_col <= len(new_row):
-        new_row[admin_col - 1] = "Yes" if is_admin_user else "No"
-    
-    ws.append(new_row)
-    wb.save(EXCEL_FILE)
-    return True
+def _reference_changes_saved():
+    """Workbook kaydedildi: op log'daki değişiklikler artık dosyada (çağıran _workbook_lock'u tutar)"""
+    global _reference_pending
+    if not _reference_pending:
+        return
+    _reference_write_stats["flushes"] += 1
+    _reference_write_stats["coalesced"] += _reference_pending - 1
+    _reference_pending = 0
+    try:
+        os.remove(REFERENCE_OPLOG_FILE)
+    except FileNotFoundError:
+        pass
 
-def delete_user(username):
-    """Kullanıcıyı siler"""
-    # Google Sheets kullanılıyorsa
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
+def _replay_reference_oplog(wb):
+    """Op log'daki kaydedilmemiş değişiklikleri diskten yüklenen workbook'a uygular ve kaydeder"""
+    global _reference_pending
+    if not os.path.exists(REFERENCE_OPLOG_FILE):
+        return
+    entries = 0
+    sheet_values = {}
+    with open(REFERENCE_OPLOG_FILE, "r", encoding="utf-8") as f:
+        for line in f:
             try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Users")
-                all_values = sheet.get_all_values()
-                
-                if not all_values or len(all_values) < 2:
-                    return False
-                
-                # Kullanıcıyı bul ve sil
-                for i, row in enumerate(all_values[1:], start=2):
-                    if row and row[0] == username:
-                        sheet.delete_rows(i)
-                        return True
-                
-                return False
-            except Exception as e:
-                _log("E", "excel_handler.py:delete_user:google_sheets", "Failed to delete user from Google Sheets", {"error": str(e)})
-                return False
-    
-    # Excel'den sil
+                entry = json.loads(line)
+            except ValueError:
+                # Yarım yazılmış son satır (değişiklik çağırana onaylanmamıştı)
+                _log("E", "excel_handler.py:_replay_reference_oplog", "Skipping corrupt oplog line", {})
+                continue
+            entries += 1
+            sheet_values[entry["sheet"]] = entry["values"]
+    # Her sheet'in son hali yazılır; log önceki bir kayıtta zaten dosyaya yazılmış değişiklikler içerse de
+    # (kayıttan sonra silinemeden kapanma) sonuç aynıdır
+    for sheet, values in sheet_values.items():
+        _apply_reference_change(wb, "replace_list_values", sheet, values)
+    _reference_pending = max(entries, 1)
+    _reference_write_stats["replayed"] += entries
+    invalidate_reference_cache()
     try:
-        wb = get_excel_file()
-        ws = wb["Users"]
-        
-        # Kullanıcıyı bul ve sil
-        for row_idx in range(2, ws.max_row + 1):
-            if ws.cell(row=row_idx, column=1).value == username:
-                ws.delete_rows(row_idx)
-                wb.save(EXCEL_FILE)
-                return True
-        
-        return False
+        _save_workbook(wb)
     except Exception as e:
-        _log("E", "excel_handler.py:delete_user", "Failed to delete user", {"error": str(e)})
-        return False
+        # Log yerinde kalır; bir sonraki yüklemede tekrar denenir
+        _log("E", "excel_handler.py:_replay_reference_oplog", "Replayed changes could not be saved", {"error": str(e)})
 
-def update_user(username, password=None, full_name=None, email=None, is_admin=None):
-    """Kullanıcı bilgilerini günceller"""
-    # Google Sheets kullanılıyorsa
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
-            try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Users")
-                all_values = sheet.get_all_values()
-                
-                if not all_values or len(all_values) < 2:
-                    return False
-                
-                headers = all_values[0]
-                
-                # Kullanıcıyı bul ve güncelle
-                for i, row in enumerate(all_values[1:], start=2):
-                    if row and row[0] == username:
-                        if password is not None:
-                            pwd_col = headers.index("Password") + 1 if "Password" in headers else 2
-                            sheet.update_cell(i, pwd_col, password)
-                        if full_name is not None:
-                            name_col = headers.index("Full Name") + 1 if "Full Name" in headers else 3
-                            sheet.update_cell(i, name_col, full_name)
-                        if email is not None:
-                            email_col = headers.index("Email") + 1 if "Email" in headers else 4
-                            sheet.update_cell(i, email_col, email)
-                        if is_admin is not None:
-                            admin_col = headers.index("Admin") + 1 if "Admin" in headers else 5
-                            sheet.update_cell(i, admin_col, "Yes" if is_admin else "No")
-                        return True
-                
-                return False
-            except Exception as e:
-                _log("E", "excel_handler.py:update_user:google_sheets", "Failed to update user in Google Sheets", {"error": str(e)})
-                return False
-    
-    # Excel'den güncelle
+def _schedule_reference_flush():
+    global _reference_flush_timer
+    if _reference_flush_timer is not None and _reference_flush_timer.is_alive():
+        return
+    _reference_flush_timer = threading.Timer(REFERENCE_WRITE_BEHIND_DELAY, _flush_reference_writes_in_background)
+    _reference_flush_timer.daemon = True
+    _reference_flush_timer.start()
+
+def _flush_reference_writes_in_background():
     try:
-        wb = get_excel_file()
-        ws = wb["Users"]
-        
-        headers = [cell.value for cell in ws[1]]
-        
-        # Kullanıcıyı bul ve güncelle
-        for row_idx in range(2, ws.max_row + 1):
-            if ws.cell(row=row_idx, column=1).value == username:
-                if password is not None:
-                    pwd_col = headers.index("Password") + 1 if "Password" in headers else 2
-                    ws.cell(row=row_idx, column=pwd_col, value=password)
-                if full_name is not None:
-                    name_col = headers.index("Full Name") + 1 if "Full Name" in headers else 3
-                    ws.cell(row=row_idx, column=name_col, value=full_name)
-                if email is not None:
-                    email_col = headers.index("Email") + 1 if "Email" in headers else 4
-                    ws.cell(row=row_idx, column=email_col, value=email)
-                if is_admin is not None:
-                    admin_col = headers.index("Admin") + 1 if "Admin" in headers else 5
-                    ws.cell(row=row_idx, column=admin_col, value="Yes" if is_admin else "No")
-                
-                wb.save(EXCEL_FILE)
-                return True
-        
-        return False
+        flush_reference_writes()
     except Exception as e:
-        _log("E", "excel_handler.py:update_user", "Failed to update user", {"error": str(e)})
-        return False
+        # Değişiklikler op log'da; bir sonraki değişiklikte veya yüklemede tekrar denenir
+        _log("E", "excel_handler.py:_flush_reference_writes_in_background", "Deferred reference save failed", {"error": str(e)})
 
-def update_excel_with_admin_column():
-    """Mevcut Excel dosyasına Admin ve Email kolonlarını ekler ve admin kullanıcısını ekler
-    Google Sheets kullanılıyorsa bu fonksiyon hiçbir şey yapmaz (Google Sheets'te manuel yapılmalı)
-    NOT: Bu fonksiyon mevcut kullanıcıları korur, sadece eksik kolonları ve admin kullanıcısını ekler
+def flush_reference_writes():
+    """Ertelenmiş referans listesi değişikliklerini hemen kaydeder, kaydedilen değişiklik sayısını döndürür"""
+    with _workbook_lock:
+        pending = _reference_pending
+        if not pending:
+            return 0
+        if _resident_workbook is None:
+            # Bellekteki kopya bırakılmış: get_excel_file op log'u diskteki workbook'a uygular ve kaydeder
+            get_excel_file()
+        else:
+            _save_workbook(_resident_workbook)
+        return pending
+
+@contextlib.contextmanager
+def batch():
+    """Blok içindeki referans listesi değişikliklerini (Excel) tek workbook kaydında toplar
+    Kayıt bloğun sonunda yapılır; SQLite ve Google Sheets değişiklikleri her işlemde yazılır
     """
-    # Google Sheets kullanılıyorsa Excel işlemlerini atla
-    if USE_GOOGLE_SHEETS:
-        _log("D", "excel_handler.py:update_excel_with_admin_column", "Google Sheets enabled, skipping Excel update", {})
-        return
-    
-    # Dosya yoksa veya Users sheet'i yoksa hiçbir şey yapma (get_excel_file zaten oluşturuyor)
-    if not os.path.exists(EXCEL_FILE):
-        return
-    
+    global _reference_batch_depth
+    with _workbook_lock:
+        _reference_batch_depth += 1
     try:
-        wb = load_workbook(EXCEL_FILE)
-        
-        # Users sheet'i yoksa hiçbir şey yapma
-        if "Users" not in wb.sheetnames:
-            return
-        
-        ws = wb["Users"]
+        yield
+    finally:
+        with _workbook_lock:
+            _reference_batch_depth -= 1
+            outermost = _reference_batch_depth == 0
+        if outermost:
+            flush_reference_writes()
+
+def get_reference_write_stats():
+    """Yazma tamponu istatistikleri (coalesced: birleştirilerek kaçınılan workbook kayıtları)"""
+    with _workbook_lock:
+        stats = dict(_reference_write_stats)
+        stats["pending"] = _reference_pending
+    return stats
+
+# Depolama backend'leri
+# Her veri işlemi (referans listeleri, kullanıcılar, gönderimler) tek bir arayüzden geçer.
+# Önbellek, toplu yazma gibi özellikler backend'den bağımsız olarak bir kez eklenebilir.
+REFERENCE_SHEET_HEADERS = {"Vehicles": "Vehicle", "FuelLevels": "Level", "Items": "Item"}  # kontrol sheet'leri: "Field"
+USER_HEADERS = ["Username", "Password", "Full Name", "Email", "Admin"]
+
+class StorageUnavailableError(Exception):
+    """Backend şu anda kullanılamıyor (örn: Google Sheets client oluşturulamadı)"""
+
+@dataclass(frozen=True)
+class SubmissionQuery:
+    """Gönderim sorgusu (admin paneli filtreleri)
+    date_from/date_to: "YYYY-MM-DD" (dahil), order: "newest" veya "oldest", limit None ise tüm eşleşenler
+    """
+    driver: str = None
+    vehicle: str = None
+    date_from: str = None
+    date_to: str = None
+    order: str = "newest"
+    limit: int = None
+    offset: int = 0
+
+    @property
+    def newest_first(self):
+        return self.order != "oldest"
+
+    def matches(self, submission):
+        if self.driver is not None and submission.get("Driver Name") != self.driver:
+            return False
+        if self.vehicle is not None and submission.get("Vehicle") != self.vehicle:
+            return False
+        day = _submission_timestamp_text(submission.get("Timestamp"))[:10]
+        if self.date_from and day < self.date_from:
+            return False
+        if self.date_to and day > self.date_to:
+            return False
+        return True
+
+@dataclass
+class SubmissionPage:
+    """Sorgunun döndürdüğü sayfa (total: filtreye uyan toplam gönderim sayısı)"""
+    rows: list
+    total: int
+
+def _submission_timestamp_text(value):
+    """Timestamp değerini sıralanabilir metne çevirir (Excel'de datetime olarak da saklanmış olabilir)"""
+    from datetime import datetime
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+def _select_submission_page(submissions, query):
+    """Gönderimleri akış halinde filtreler ve sayfayı seçer
+    limit verilmişse bellekte sadece offset + limit kadar satır tutulur
+    """
+    import heapq
+    total = 0
+
+    def matched():
+        nonlocal total
+        for seq, submission in enumerate(submissions):
+            if query.matches(submission):
+                total += 1
+                # seq: aynı Timestamp'li satırlarda kayıt sırası (dict'ler karşılaştırılmaz)
+                yield (_submission_timestamp_text(submission.get("Timestamp")), seq, submission)
+
+    if query.limit is None:
+        ordered = sorted(matched(), reverse=query.newest_first)
+    elif query.limit <= 0:
+        ordered = []
+        for _ in matched():
+            pass
+    else:
+        select = heapq.nlargest if query.newest_first else heapq.nsmallest
+        ordered = select(query.offset + query.limit, matched())
+    return SubmissionPage([submission for _, _, submission in ordered[query.offset:]], total)
+
+class StorageBackend:
+    """Depolama arayüzü
+    Desteklenmeyen işlemler NotImplementedError fırlatır; FallbackBackend bu durumda ikinci backend'e geçer
+    """
+    name = "base"
+
+    # Referans listeleri (Vehicles, FuelLevels, Items, kontrol kategorileri)
+    def load_lists(self, sheet_names):
+        """Verilen sheet'lerin ilk kolon değerlerini sheet adı -> liste olarak döndürür"""
+        raise NotImplementedError
+
+    def load_list(self, sheet):
+        return self.load_lists([sheet]).get(sheet, [])
+
+    def add_list_value(self, sheet, value):
+        raise NotImplementedError
+
+    def delete_list_value(self, sheet, value):
+        raise NotImplementedError
+
+    def update_list_value(self, sheet, old_value, new_value):
+        raise NotImplementedError
+
+    def add_list_values(self, sheet, values):
+        """Değerleri ekler (listede olanlar atlanır), eklenen değerleri döndürür"""
+        existing = set(self.load_list(sheet))
+        added = []
+        for value in values:
+            if value not in existing and self.add_list_value(sheet, value):
+                existing.add(value)
+                added.append(value)
+        return added
+
+    def replace_list_values(self, sheet, values):
+        """Listeyi verilen değerlerle (bu sırayla) değiştirir, değişiklik olduysa True"""
+        raise NotImplementedError
+
+    # Kullanıcılar
+    def load_user_records(self):
+        """Tüm kullanıcıları admin bayrağı çözülmüş UserRecord listesi olarak tek okumayla döndürür"""
+        raise NotImplementedError
+
+    def load_users(self):
+        """{kullanıcı adı: {"password", "full_name", "email"}} döndürür"""
+        return {record.username: record.as_dict() for record in self.load_user_records()}
+
+    def is_admin(self, username):
+        return any(record.username == username and record.is_admin for record in self.load_user_records())
+
+    def add_user(self, username, password, full_name, email="", is_admin_user=False):
+        raise NotImplementedError
+
+    def delete_user(self, username):
+        raise NotImplementedError
+
+    def update_user(self, username, password=None, full_name=None, email=None, is_admin=None, row=None):
+        """Verilen alanları günceller; row: önbellekteki satır numarası (ipucu, backend doğrular)"""
+        raise NotImplementedError
+
+    # Form gönderimleri
+    def append_submissions(self, entries):
+        """(headers, row) listesini Submissions'a ekler"""
+        raise NotImplementedError
+
+    def load_submissions(self):
+        raise NotImplementedError
+
+    def query_submissions(self, query):
+        """SubmissionQuery'ye uyan gönderimlerden istenen sayfayı döndürür (SubmissionPage)"""
+        return _select_submission_page(self.load_submissions(), query)
+
+    def list_submission_values(self, column):
+        """Gönderimlerde bir kolonun (örn: "Driver Name", "Vehicle") farklı değerlerini sıralı döndürür"""
+        return sorted({submission.get(column) for submission in self.load_submissions() if submission.get(column)})
+
+    def iter_submissions(self, query):
+        """Sorguya uyan gönderimleri kayıt sırasıyla tek tek üretir (limit/offset dikkate alınmaz)"""
+        return (submission for submission in self.load_submissions() if query.matches(submission))
+
+    def submission_headers(self, query):
+        """Dışa aktarılacak kolonlar (ilk görüldükleri sırayla)"""
+        headers = {}
+        for submission in self.iter_submissions(query):
+            headers.update(dict.fromkeys(header for header in submission if header))
+        return list(headers)
+
+    def on_error(self, error):
+        """İşlem hata verdiğinde çağrılır (bağlantı önbelleklerini temizlemek için)"""
+        pass
+
+@dataclass
+class UserRecord:
+    """Users sheet'indeki bir kullanıcı (row: sheet satır numarası, bilinmiyorsa None)"""
+    username: str
+    password: str
+    full_name: str
+    email: str = ""
+    is_admin: bool = False
+    row: int = None
+
+    def as_dict(self):
+        """load_users formatındaki kullanıcı bilgisi"""
+        return {"password": self.password, "full_name": self.full_name, "email": self.email}
+
+def _admin_column_index(headers):
+    """Users başlıklarında Admin kolonunun indeksini döndürür"""
+    if "Admin" in headers:
+        return headers.index("Admin")
+    if len(headers) > 3:
+        return 3
+    return None
+
+def _parse_user_records(headers, rows, first_row=2):
+    """Users satırlarını (başlık hariç) UserRecord listesine çevirir
+    Admin kolonu boşsa sadece 'admin' kullanıcısı admin sayılır
+    """
+    admin_col_idx = _admin_column_index(list(headers))
+    records = []
+    for row_num, row in enumerate(rows, start=first_row):
+        if not (row and len(row) >= 3 and row[0] and row[1] and row[2]):
+            continue
+        username = row[0]
+        if admin_col_idx and len(row) > admin_col_idx:
+            admin_value = row[admin_col_idx]
+            is_admin_user = admin_value == "Yes" or admin_value == True
+        else:
+            is_admin_user = username == "admin"
+        records.append(UserRecord(
+            username=username,
+            password=row[1],
+            full_name=row[2],
+            email=row[3] if len(row) > 3 and row[3] else "",
+            is_admin=is_admin_user,
+            row=row_num
+        ))
+    return records
+
+def _user_column(headers, name, default):
+    """Users sheet'inde başlığa göre 1 tabanlı kolon numarası"""
+    return headers.index(name) + 1 if name in headers else default
+
+def _user_update_cells(headers, password=None, full_name=None, email=None, is_admin=None):
+    """Değişen kullanıcı alanlarını (1 tabanlı kolon, değer) listesi olarak döndürür"""
+    admin_value = None if is_admin is None else ("Yes" if is_admin else "No")
+    fields = [("Password", 2, password), ("Full Name", 3, full_name), ("Email", 4, email), ("Admin", 5, admin_value)]
+    return [(_user_column(headers, name, default), value) for name, default, value in fields if value is not None]
+
+def _merge_submission_headers(existing_headers, entries):
+    """Mevcut başlıklara gönderimlerdeki yeni kolonları (sırayla) ekler, (tüm başlıklar, yeni başlıklar) döndürür
+    Var olan kolonların yeri değişmez; böylece eski satırlar olduğu gibi kalır
+    """
+    all_headers = [header for header in existing_headers]
+    known = set(header for header in all_headers if header)
+    new_headers = []
+    for headers, _ in entries:
+        for header in headers:
+            if header not in known:
+                known.add(header)
+                all_headers.append(header)
+                new_headers.append(header)
+    return all_headers, new_headers
+
+def _map_submission_row(column_index, headers, row):
+    """Satırı başlık adına göre sheet kolonlarına yerleştirir (column_index: başlık -> 0 tabanlı kolon)"""
+    mapped = [""] * (max(column_index.values()) + 1 if column_index else 0)
+    for header, value in zip(headers, row):
+        mapped[column_index[header]] = value
+    return mapped
+
+def _submission_column_index(all_headers):
+    """Başlık -> kolon indeksi (aynı başlık birden fazla varsa ilki)"""
+    column_index = {}
+    for idx, header in enumerate(all_headers):
+        if header and header not in column_index:
+            column_index[header] = idx
+    return column_index
+
+class ExcelBackend(StorageBackend):
+    """form_data.xlsx (bellekteki workbook ve Submissions günlüğü üzerinden)"""
+    name = "excel"
+
+    def load_lists(self, sheet_names):
+        with _workbook_lock:
+            wb = get_excel_file()
+            lists = {}
+            for name in sheet_names:
+                if name not in wb.sheetnames:
+                    lists[name] = []
+                    continue
+                lists[name] = _first_column_values(wb[name].iter_rows(min_row=2, values_only=True))
+            return lists
+
+    def add_list_value(self, sheet, value):
+        return _write_reference_change("add_list_value", sheet, value)
+
+    def delete_list_value(self, sheet, value):
+        return _write_reference_change("delete_list_value", sheet, value)
+
+    def update_list_value(self, sheet, old_value, new_value):
+        return _write_reference_change("update_list_value", sheet, old_value, new_value)
+
+    def add_list_values(self, sheet, values):
+        return _write_reference_change("add_list_values", sheet, list(values)) or []
+
+    def replace_list_values(self, sheet, values):
+        return _write_reference_change("replace_list_values", sheet, list(values))
+
+    def load_user_records(self):
+        # Satırlar tek tek okunur (büyük dosyalar read-only modda)
+        rows = iter_excel_rows("Users")
+        headers = list(next(rows, ()))
+        _log("A", "excel_handler.py:load_users:headers", "Users sheet headers", {"headers": headers})
+        return _parse_user_records(headers, rows)
+
+    def add_user(self, username, password, full_name, email="", is_admin_user=False):
+        with _workbook_lock:
+            wb = get_excel_file()
+            ws = wb["Users"]
+
+            # Başlık satırını kontrol et ve gerekli kolonları ekle
+            headers = [cell.value for cell in ws[1]]
+            if "Email" not in headers:
+                ws.cell(row=1, column=len(headers) + 1, value="Email")
+                headers.append("Email")
+            if "Admin" not in headers:
+                ws.cell(row=1, column=len(headers) + 1, value="Admin")
+                headers.append("Admin")
+
+            # Kullanıcı zaten var mı kontrol et
+            for row_idx in range(2, ws.max_row + 1):
+                if ws.cell(row=row_idx, column=1).value == username:
+                    return False
+
+            # Yeni satır ekle
+            email_col = _user_column(headers, "Email", 4)
+            admin_col = _user_column(headers, "Admin", 5)
+            new_row = [None] * max(3, email_col, admin_col)
+            new_row[0] = username
+            new_row[1] = password
+            new_row[2] = full_name
+            new_row[email_col - 1] = email
+            new_row[admin_col - 1] = "Yes" if is_admin_user else "No"
+
+            ws.append(new_row)
+            _save_workbook(wb)
+            return True
+
+    def delete_user(self, username):
+        with _workbook_lock:
+            try:
+                wb = get_excel_file()
+                ws = wb["Users"]
+                for row_idx in range(2, ws.max_row + 1):
+                    if ws.cell(row=row_idx, column=1).value == username:
+                        ws.delete_rows(row_idx)
+                        _save_workbook(wb)
+                        return True
+                return False
+            except Exception as e:
+                _log("E", "excel_handler.py:delete_user", "Failed to delete user", {"error": str(e)})
+                return False
+
+    def update_user(self, username, password=None, full_name=None, email=None, is_admin=None, row=None):
+        with _workbook_lock:
+            try:
+                wb = get_excel_file()
+                ws = wb["Users"]
+
+                # Önbellekteki satır geçerliyse doğrudan kullanılır, değilse kullanıcı aranır
+                if not (row and row > 1 and ws.cell(row=row, column=1).value == username):
+                    rows = ws.iter_rows(min_row=2, max_col=1, values_only=True)
+                    row = next((row_idx for row_idx, values in enumerate(rows, start=2) if values[0] == username), None)
+                    if row is None:
+                        return False
+
+                headers = [cell.value for cell in ws[1]]
+                for column, value in _user_update_cells(headers, password, full_name, email, is_admin):
+                    ws.cell(row=row, column=column, value=value)
+                _save_workbook(wb)
+                return True
+            except Exception as e:
+                _log("E", "excel_handler.py:update_user", "Failed to update user", {"error": str(e)})
+                return False
+
+    def append_submissions(self, entries):
+        # Günlük açıksa satırlar önce JSONL günlüğüne eklenir, workbook'a arka planda toplu aktarılır
+        if USE_SUBMISSIONS_JOURNAL:
+            _append_submission_journal(entries)
+            return
+        _append_submissions_to_workbook(entries)
+
+    def load_submissions(self):
+        return list(iter_excel_submissions())
+
+    def query_submissions(self, query):
+        page = _select_indexed_submissions(query)
+        if page is not None:
+            return page
+        # İndeks yoksa satırlar tek tek okunur, tüm sheet listeye alınmaz
+        return _select_submission_page(iter_excel_submissions(), query)
+
+    def list_submission_values(self, column):
+        index = get_submission_index()
+        if index is not None:
+            with _submission_index_lock:
+                values = index.values(column)
+            if values is not None:
+                return values
+        return sorted({submission.get(column) for submission in iter_excel_submissions() if submission.get(column)})
+
+    def iter_submissions(self, query):
+        return (submission for submission in iter_excel_submissions() if query.matches(submission))
+
+    def submission_headers(self, query):
+        # Başlık satırı + günlükte bekleyen gönderimlerin yeni kolonları (satırlar taranmaz)
+        rows = iter_excel_rows("Submissions")
+        try:
+            headers = [header for header in next(rows, ()) if header]
+        finally:
+            rows.close()
+        with _compaction_lock:
+            pending = _read_journal_entries(SUBMISSIONS_COMPACTING_FILE)
+            with _journal_lock:
+                pending += _read_journal_entries(SUBMISSIONS_JOURNAL_FILE)
+        all_headers, _ = _merge_submission_headers(headers, pending)
+        return all_headers
+
+class GoogleSheetsBackend(StorageBackend):
+    """GOOGLE_SHEET_ID ile belirtilen Google Sheets dosyası (paylaşılan client üzerinden)
+    Referans listesi değişikliklerinin her biri tek yazma isteğidir (values_append veya batch_update)
+    """
+    name = "google_sheets"
+
+    def __init__(self):
+        self._submission_headers_lock = threading.Lock()
+        self._submission_headers = None  # Submissions başlık satırı (her gönderimde row_values(1) okunmasın diye)
+
+    def _worksheet(self, title):
+        worksheet = get_google_worksheet(title)
+        if worksheet is None:
+            raise StorageUnavailableError("Google Sheets client is not available")
+        return worksheet
+
+    def on_error(self, error):
+        _on_google_sheets_error(error)
+        # Başlık satırı dışarıdan değişmiş olabilir, sonraki yazmada yeniden okunur
+        with self._submission_headers_lock:
+            self._submission_headers = None
+
+    def load_lists(self, sheet_names):
+        # Tek bir values_batch_get isteği (tek round trip)
+        spreadsheet = get_google_spreadsheet()
+        if spreadsheet is None:
+            raise StorageUnavailableError("Google Sheets client is not available")
+        ranges = [f"'{name}'!A2:A" for name in sheet_names]
+        response = spreadsheet.values_batch_get(ranges)
+        value_ranges = response.get("valueRanges", [])
+        lists = {name: [] for name in sheet_names}
+        for name, value_range in zip(sheet_names, value_ranges):
+            lists[name] = _first_column_values(value_range.get("values", []))
+        return lists
+
+    def _reference_column(self, worksheet):
+        """Referans sheet'inin ilk kolonunu (başlık dahil) tek istekle okur, satır numarası = index + 1"""
+        return worksheet.col_values(1)
+
+    def _reference_column_range(self, worksheet):
+        """Başlık hariç ilk kolonun tamamı (batch_update GridRange)"""
+        return {"sheetId": worksheet.id, "startRowIndex": 1, "startColumnIndex": 0, "endColumnIndex": 1}
+
+    def add_list_value(self, sheet, value):
+        return bool(self.add_list_values(sheet, [value]))
+
+    def add_list_values(self, sheet, values):
+        worksheet = self._worksheet(sheet)
+        existing = set(self._reference_column(worksheet)[1:])
+        added = [value for value in dict.fromkeys(values) if value not in existing]
+        if added:
+            worksheet.append_rows([[value] for value in added], value_input_option="RAW", table_range="A1")
+        return added
+
+    def delete_list_value(self, sheet, value):
+        worksheet = self._worksheet(sheet)
+        column = self._reference_column(worksheet)
+        if value not in column[1:]:
+            return False
+        row_index = column.index(value, 1)
+        worksheet.spreadsheet.batch_update({"requests": [{"deleteDimension": {"range": {
+            "sheetId": worksheet.id, "dimension": "ROWS", "startIndex": row_index, "endIndex": row_index + 1,
+        }}}]})
+        return True
+
+    def update_list_value(self, sheet, old_value, new_value):
+        # Satırı aramak için okuma yapılmaz; findReplace hücreyi sunucu tarafında bulur
+        worksheet = self._worksheet(sheet)
+        response = worksheet.spreadsheet.batch_update({"requests": [{"findReplace": {
+            "find": old_value, "replacement": new_value, "matchCase": True, "matchEntireCell": True,
+            "range": self._reference_column_range(worksheet),
+        }}]})
+        replies = response.get("replies") or [{}]
+        return replies[0].get("findReplace", {}).get("occurrencesChanged", 0) > 0
+
+    def replace_list_values(self, sheet, values):
+        # Eski değerler temizlenir ve yeniler başlığın altına yazılır (tek batch_update, atomik)
+        worksheet = self._worksheet(sheet)
+        requests = [{"updateCells": {"range": self._reference_column_range(worksheet), "fields": "userEnteredValue"}}]
+        if values:
+            requests.append({"appendCells": {
+                "sheetId": worksheet.id,
+                "rows": [{"values": [{"userEnteredValue": {"stringValue": str(value)}}]} for value in values],
+                "fields": "userEnteredValue",
+            }})
+        worksheet.spreadsheet.batch_update({"requests": requests})
+        return True
+
+    def load_user_records(self):
+        all_values = self._worksheet("Users").get_all_values()
+        if not all_values or len(all_values) < 2:
+            return []
+        _log("A", "excel_handler.py:load_users:headers", "Users sheet headers", {"headers": all_values[0]})
+        return _parse_user_records(all_values[0], all_values[1:])
+
+    def add_user(self, username, password, full_name, email="", is_admin_user=False):
+        sheet = self._worksheet("Users")
+        all_values = sheet.get_all_values()
+
+        # Başlık kontrolü
+        if not all_values:
+            sheet.append_row(USER_HEADERS)
+
+        # Kullanıcı zaten var mı kontrol et
+        for row in all_values[1:]:
+            if row and row[0] == username:
+                return False
+
+        sheet.append_row([username, password, full_name, email, "Yes" if is_admin_user else "No"])
+        return True
+
+    def delete_user(self, username):
+        sheet = self._worksheet("Users")
+        all_values = sheet.get_all_values()
+        for i, row in enumerate(all_values[1:], start=2):
+            if row and row[0] == username:
+                sheet.delete_rows(i)
+                return True
+        return False
+
+    def update_user(self, username, password=None, full_name=None, email=None, is_admin=None, row=None):
+        sheet = self._worksheet("Users")
+        headers = None
+        if row and row > 1:
+            # Önbellekteki satır, başlık satırıyla birlikte tek küçük okumada doğrulanır
+            response = sheet.spreadsheet.values_batch_get(["'Users'!1:1", f"'Users'!A{row}"])
+            header_range, user_range = (response.get("valueRanges", []) + [{}, {}])[:2]
+            if user_range.get("values") == [[username]]:
+                headers = (header_range.get("values") or [[]])[0]
+        if headers is None:
+            all_values = sheet.get_all_values()
+            if not all_values or len(all_values) < 2:
+                return False
+            headers = all_values[0]
+            row = next((i for i, values in enumerate(all_values[1:], start=2) if values and values[0] == username), None)
+            if row is None:
+                return False
+
+        # Değişen tüm kolonlar tek values_batch_update isteğiyle yazılır
+        cells = _user_update_cells(headers, password, full_name, email, is_admin)
+        if cells:
+            sheet.batch_update(
+                [{"range": f"{get_column_letter(column)}{row}", "values": [[value]]} for column, value in cells],
+                value_input_option="USER_ENTERED"
+            )
+        return True
+
+    def append_submissions(self, entries):
+        if not entries:
+            return
+        sheet = self._worksheet("Submissions")
+        with self._submission_headers_lock:
+            if self._submission_headers is None:
+                self._submission_headers = sheet.row_values(1)
+            all_headers, new_headers = _merge_submission_headers(self._submission_headers, entries)
+            if new_headers:
+                # Yeni kolonlar başlık satırının sonuna eklenir; mevcut veriler silinmez
+                if len(all_headers) > sheet.col_count:
+                    sheet.add_cols(len(all_headers) - sheet.col_count)
+                start_col = len(all_headers) - len(new_headers) + 1
+                sheet.update(values=[new_headers], range_name=f"{get_column_letter(start_col)}1")
+                self._submission_headers = all_headers
+        column_index = _submission_column_index(all_headers)
+        rows = [_map_submission_row(column_index, headers, row) for headers, row in entries]
+        sheet.append_rows(rows, table_range="A1")
+
+    def load_submissions(self):
+        all_values = self._worksheet("Submissions").get_all_values()
+        if not all_values or len(all_values) < 2:
+            return []
+
+        headers = all_values[0]
+        submissions = []
+        for row in all_values[1:]:
+            if row and row[0]:  # Timestamp varsa
+                submission = {}
+                for i, header in enumerate(headers):
+                    submission[header] = row[i] if i < len(row) else None
+                submissions.append(submission)
+        return submissions
+
+    def _submission_header_row(self, sheet):
+        with self._submission_headers_lock:
+            if self._submission_headers is None:
+                self._submission_headers = sheet.row_values(1)
+            return list(self._submission_headers)
+
+    def _submission_columns(self, headers, names):
+        """Verilen başlıkların kolonlarını tek values_batch_get ile okur (başlık satırı hariç)"""
+        spreadsheet = get_google_spreadsheet()
+        if spreadsheet is None:
+            raise StorageUnavailableError("Google Sheets client is not available")
+        ranges = []
+        for name in names:
+            letter = get_column_letter(headers.index(name) + 1)
+            ranges.append(f"'Submissions'!{letter}2:{letter}")
+        response = spreadsheet.values_batch_get(ranges)
+        return [
+            [row[0] if row else "" for row in value_range.get("values", [])]
+            for value_range in response.get("valueRanges", [])
+        ]
+
+    def query_submissions(self, query):
+        # Önce sadece filtre kolonları okunur, ardından yalnızca sayfadaki satırlar istenir (iki istek)
+        sheet = self._worksheet("Submissions")
+        headers = self._submission_header_row(sheet)
+        key_headers = ["Timestamp", "Driver Name", "Vehicle"]
+        if not all(header in headers for header in key_headers):
+            return super().query_submissions(query)
+        timestamps, drivers, vehicles = self._submission_columns(headers, key_headers)
+
+        def cell(values, idx):
+            return values[idx] if idx < len(values) else ""
+
+        keys = (
+            {"Timestamp": timestamp, "Driver Name": cell(drivers, idx), "Vehicle": cell(vehicles, idx), "_row": idx + 2}
+            for idx, timestamp in enumerate(timestamps) if timestamp
+        )
+        page = _select_submission_page(keys, query)
+        if not page.rows:
+            return page
+
+        last_col = get_column_letter(len(headers))
+        ranges = [f"'Submissions'!A{key['_row']}:{last_col}{key['_row']}" for key in page.rows]
+        response = get_google_spreadsheet().values_batch_get(ranges)
+        rows = []
+        for value_range in response.get("valueRanges", []):
+            values = value_range.get("values", [])
+            row = values[0] if values else []
+            rows.append({header: row[i] if i < len(row) else None for i, header in enumerate(headers)})
+        return SubmissionPage(rows, page.total)
+
+    def iter_submissions(self, query):
+        # Kurulum hemen yapılır (client yoksa FallbackBackend Excel'e geçebilsin), satırlar parça parça okunur
+        sheet = self._worksheet("Submissions")
+        headers = self._submission_header_row(sheet)
+        return self._iter_submission_chunks(sheet, headers, query)
+
+    def _iter_submission_chunks(self, sheet, headers, query):
+        if not headers:
+            return
+        last_col = get_column_letter(len(headers))
+        start = 2
+        while True:
+            rows = sheet.get(f"A{start}:{last_col}{start + SUBMISSION_EXPORT_CHUNK_ROWS - 1}")
+            for row in rows:
+                if row and row[0]:  # Timestamp varsa
+                    submission = {header: row[i] if i < len(row) else None for i, header in enumerate(headers)}
+                    if query.matches(submission):
+                        yield submission
+            if len(rows) < SUBMISSION_EXPORT_CHUNK_ROWS:
+                return
+            start += SUBMISSION_EXPORT_CHUNK_ROWS
+
+    def submission_headers(self, query):
+        return [header for header in self._submission_header_row(self._worksheet("Submissions")) if header]
+
+    def list_submission_values(self, column):
+        headers = self._submission_header_row(self._worksheet("Submissions"))
+        if column not in headers:
+            return []
+        values, = self._submission_columns(headers, [column])
+        return sorted({value for value in values if value})
+
+class SqliteBackend(StorageBackend):
+    """SQLITE_FILE veritabanı (sqlite_handler üzerinden)"""
+    name = "sqlite"
+
+    def load_lists(self, sheet_names):
+        return _sqlite_store().load_lists(sheet_names)
+
+    def load_list(self, sheet):
+        return _sqlite_store().load_list(sheet)
+
+    def add_list_value(self, sheet, value):
+        return _sqlite_store().add_list_value(sheet, value)
+
+    def delete_list_value(self, sheet, value):
+        return _sqlite_store().delete_list_value(sheet, value)
+
+    def update_list_value(self, sheet, old_value, new_value):
+        return _sqlite_store().update_list_value(sheet, old_value, new_value)
+
+    def add_list_values(self, sheet, values):
+        return _sqlite_store().add_list_values(sheet, values)
+
+    def replace_list_values(self, sheet, values):
+        return _sqlite_store().replace_list_values(sheet, values)
+
+    def load_user_records(self):
+        return [
+            UserRecord(username, password, full_name, email, admin_flag)
+            for username, password, full_name, email, admin_flag in _sqlite_store().load_user_rows()
+        ]
+
+    def load_users(self):
+        return _sqlite_store().load_users()
+
+    def is_admin(self, username):
+        return _sqlite_store().is_admin(username)
+
+    def add_user(self, username, password, full_name, email="", is_admin_user=False):
+        return _sqlite_store().add_user(username, password, full_name, email, is_admin_user)
+
+    def delete_user(self, username):
+        return _sqlite_store().delete_user(username)
+
+    def update_user(self, username, password=None, full_name=None, email=None, is_admin=None, row=None):
+        return _sqlite_store().update_user(username, password=password, full_name=full_name, email=email, is_admin=is_admin)
+
+    def append_submissions(self, entries):
+        _sqlite_store().save_submissions(entries)
+
+    def load_submissions(self):
+        return _sqlite_store().load_submissions()
+
+    def query_submissions(self, query):
+        rows, total = _sqlite_store().query_submissions(
+            driver=query.driver, vehicle=query.vehicle, date_from=query.date_from, date_to=query.date_to,
+            newest_first=query.newest_first, limit=query.limit, offset=query.offset
+        )
+        return SubmissionPage(rows, total)
+
+    def list_submission_values(self, column):
+        return _sqlite_store().list_submission_values(column)
+
+    def iter_submissions(self, query):
+        return _sqlite_store().iter_submissions(
+            driver=query.driver, vehicle=query.vehicle, date_from=query.date_from, date_to=query.date_to
+        )
+
+class MemoryBackend(StorageBackend):
+    """Süreç belleğinde tutulan backend (geliştirme ve denemeler için, veriler kalıcı değildir)
+    lists: sheet adı -> liste, users: load_users formatı ("is_admin" anahtarı opsiyonel)
+    """
+    name = "memory"
+
+    def __init__(self, lists=None, users=None, submissions=None):
+        self._lock = threading.RLock()
+        self._lists = {name: list(values) for name, values in (lists or {}).items()}
+        self._users = {}
+        for username, user_data in (users or {}).items():
+            self._users[username] = {
+                "password": user_data.get("password", ""),
+                "full_name": user_data.get("full_name", ""),
+                "email": user_data.get("email", "") or "",
+                "is_admin": bool(user_data.get("is_admin", False)),
+            }
+        self._submissions = [dict(submission) for submission in (submissions or [])]
+
+    def load_lists(self, sheet_names):
+        with self._lock:
+            return {name: list(self._lists.get(name, [])) for name in sheet_names}
+
+    def add_list_value(self, sheet, value):
+        with self._lock:
+            values = self._lists.setdefault(sheet, [])
+            if value in values:
+                return False
+            values.append(value)
+            return True
+
+    def delete_list_value(self, sheet, value):
+        with self._lock:
+            values = self._lists.get(sheet, [])
+            if value not in values:
+                return False
+            values.remove(value)
+            return True
+
+    def update_list_value(self, sheet, old_value, new_value):
+        with self._lock:
+            values = self._lists.get(sheet, [])
+            if old_value not in values:
+                return False
+            values[values.index(old_value)] = new_value
+            return True
+
+    def add_list_values(self, sheet, values):
+        with self._lock:
+            current = self._lists.setdefault(sheet, [])
+            existing = set(current)
+            added = [value for value in dict.fromkeys(values) if value not in existing]
+            current.extend(added)
+            return added
+
+    def replace_list_values(self, sheet, values):
+        with self._lock:
+            values = list(values)
+            if self._lists.get(sheet, []) == values:
+                return False
+            self._lists[sheet] = values
+            return True
+
+    def load_user_records(self):
+        with self._lock:
+            return [
+                UserRecord(username, data["password"], data["full_name"], data["email"], data["is_admin"])
+                for username, data in self._users.items()
+            ]
+
+    def add_user(self, username, password, full_name, email="", is_admin_user=False):
+        with self._lock:
+            if username in self._users:
+                return False
+            self._users[username] = {"password": password, "full_name": full_name, "email": email or "", "is_admin": bool(is_admin_user)}
+            return True
+
+    def delete_user(self, username):
+        with self._lock:
+            return self._users.pop(username, None) is not None
+
+    def update_user(self, username, password=None, full_name=None, email=None, is_admin=None, row=None):
+        with self._lock:
+            user_data = self._users.get(username)
+            if user_data is None:
+                return False
+            if password is not None:
+                user_data["password"] = password
+            if full_name is not None:
+                user_data["full_name"] = full_name
+            if email is not None:
+                user_data["email"] = email
+            if is_admin is not None:
+                user_data["is_admin"] = bool(is_admin)
+            return True
+
+    def append_submissions(self, entries):
+        with self._lock:
+            for headers, row in entries:
+                self._submissions.append(dict(zip(headers, row)))
+
+    def load_submissions(self):
+        with self._lock:
+            return [dict(submission) for submission in self._submissions]
+
+class FallbackBackend(StorageBackend):
+    """Önce primary backend'i dener, işlem desteklenmiyorsa veya backend kullanılamıyorsa fallback'e geçer
+    Okumalar ve gönderim kayıtları hata durumunda da fallback'e düşer; kullanıcı ve referans listesi
+    değişiklikleri iki kaynağın birbirinden ayrışmaması için düşmez, False döner
+    """
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+
+    def _call(self, operation, *args, fall_back_on_error=True, **kwargs):
+        try:
+            return getattr(self.primary, operation)(*args, **kwargs)
+        except (NotImplementedError, StorageUnavailableError):
+            pass
+        except Exception as e:
+            self.primary.on_error(e)
+            if not fall_back_on_error:
+                _log("E", f"excel_handler.py:{operation}:{self.primary.name}", f"{operation} failed on {self.primary.name}", {"error": str(e)})
+                return False
+            _log("E", f"excel_handler.py:{operation}:{self.primary.name}", f"{self.primary.name} failed, falling back to {self.fallback.name}", {"error": str(e)})
+        return getattr(self.fallback, operation)(*args, **kwargs)
+
+    def load_lists(self, sheet_names):
+        return self._call("load_lists", sheet_names)
+
+    def load_list(self, sheet):
+        return self._call("load_list", sheet)
+
+    def add_list_value(self, sheet, value):
+        return self._call("add_list_value", sheet, value, fall_back_on_error=False)
+
+    def delete_list_value(self, sheet, value):
+        return self._call("delete_list_value", sheet, value, fall_back_on_error=False)
+
+    def update_list_value(self, sheet, old_value, new_value):
+        return self._call("update_list_value", sheet, old_value, new_value, fall_back_on_error=False)
+
+    def add_list_values(self, sheet, values):
+        return self._call("add_list_values", sheet, values, fall_back_on_error=False) or []
+
+    def replace_list_values(self, sheet, values):
+        return self._call("replace_list_values", sheet, values, fall_back_on_error=False)
+
+    def load_user_records(self):
+        return self._call("load_user_records")
+
+    def load_users(self):
+        return self._call("load_users")
+
+    def is_admin(self, username):
+        return self._call("is_admin", username)
+
+    def add_user(self, username, password, full_name, email="", is_admin_user=False):
+        return self._call("add_user", username, password, full_name, email, is_admin_user, fall_back_on_error=False)
+
+    def delete_user(self, username):
+        return self._call("delete_user", username, fall_back_on_error=False)
+
+    def update_user(self, username, password=None, full_name=None, email=None, is_admin=None, row=None):
+        return self._call("update_user", username, password=password, full_name=full_name, email=email, is_admin=is_admin, row=row, fall_back_on_error=False)
+
+    def append_submissions(self, entries):
+        return self._call("append_submissions", entries)
+
+    def load_submissions(self):
+        return self._call("load_submissions")
+
+    def query_submissions(self, query):
+        return self._call("query_submissions", query)
+
+    def list_submission_values(self, column):
+        return self._call("list_submission_values", column)
+
+    def iter_submissions(self, query):
+        return self._call("iter_submissions", query)
+
+    def submission_headers(self, query):
+        return self._call("submission_headers", query)
+
+_storage_backend_lock = threading.Lock()
+_storage_backend = None
+
+def _create_storage_backend():
+    """Yapılandırmaya göre backend oluşturur: SQLite > Google Sheets (Excel fallback) > Excel"""
+    if USE_SQLITE:
+        return SqliteBackend()
+    if USE_GOOGLE_SHEETS:
+        return FallbackBackend(GoogleSheetsBackend(), ExcelBackend())
+    return ExcelBackend()
+
+def get_storage_backend():
+    """Aktif depolama backend'ini döndürür"""
+    global _storage_backend
+    with _storage_backend_lock:
+        if _storage_backend is None:
+            _storage_backend = _create_storage_backend()
+        return _storage_backend
+
+def set_storage_backend(backend):
+    """Aktif backend'i değiştirir (örn: MemoryBackend); None verilirse yapılandırmadan yeniden oluşturulur"""
+    global _storage_backend
+    with _storage_backend_lock:
+        _storage_backend = backend
+    invalidate_reference_cache()
+    invalidate_user_directory()
+
+# Referans veri önbelleği (araçlar, yakıt seviyeleri, eşyalar, kontrol alanları)
+# Bu listeler ayda birkaç kez değişir; her Streamlit rerun'ında yeniden okunmaları gereksiz.
+# Her sheet için bir versiyon tutulur; admin işlemleri versiyonu artırarak önbelleği geçersiz kılar.
+try:
+    REFERENCE_CACHE_TTL = float(get_secret("REFERENCE_CACHE_TTL", "300"))
+except (TypeError, ValueError):
+    REFERENCE_CACHE_TTL = 300.0
+
+_reference_cache_lock = threading.RLock()
+_reference_cache = {}  # sheet adı -> (değerler, yüklenme zamanı, versiyon)
+_reference_versions = {}  # sheet adı -> versiyon
+_reference_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+def _reference_cache_lookup(name):
+    """Önbellekteki listeyi döndürür; süresi dolmuş veya eski versiyonlu kayıt atılır (lock altında çağrılmalı)"""
+    entry = _reference_cache.get(name)
+    if entry is None:
+        return None
+    values, loaded_at, version = entry
+    if version != _reference_versions.get(name, 0) or time.monotonic() - loaded_at > REFERENCE_CACHE_TTL:
+        del _reference_cache[name]
+        _reference_cache_stats["evictions"] += 1
+        return None
+    return values
+
+def _reference_cache_store(name, values, version):
+    """Listeyi önbelleğe yazar; okuma sırasında invalidate edildiyse yazmaz"""
+    with _reference_cache_lock:
+        if version != _reference_versions.get(name, 0):
+            return
+        _reference_cache[name] = (list(values), time.monotonic(), version)
+
+def _cached_reference_list(name):
+    """Önbellekte varsa listeyi döndürür, yoksa aktif backend'den okuyup önbelleğe yazar"""
+    with _reference_cache_lock:
+        values = _reference_cache_lookup(name)
+        if values is not None:
+            _reference_cache_stats["hits"] += 1
+            return list(values)
+        _reference_cache_stats["misses"] += 1
+        version = _reference_versions.get(name, 0)
+    values = get_storage_backend().load_list(name)
+    _reference_cache_store(name, values, version)
+    return list(values)
+
+def invalidate_reference_cache(*names):
+    """Verilen sheet'lerin önbelleğini geçersiz kılar (isim verilmezse tümü)"""
+    with _reference_cache_lock:
+        targets = names or list(set(_reference_cache) | set(_reference_versions))
+        for name in targets:
+            _reference_versions[name] = _reference_versions.get(name, 0) + 1
+            _reference_cache.pop(name, None)
+        _reference_cache_stats["invalidations"] += 1
+
+def get_reference_cache_stats():
+    """Önbellek istatistiklerini döndürür (hit/miss/evict)"""
+    with _reference_cache_lock:
+        stats = dict(_reference_cache_stats)
+        stats["entries"] = len(_reference_cache)
+        stats["ttl_seconds"] = REFERENCE_CACHE_TTL
+    return stats
+
+def load_vehicles():
+    """Vehicles sheet'inden araç listesini okur (önbellekli)"""
+    return _cached_reference_list("Vehicles")
+
+def load_fuel_levels():
+    """FuelLevels sheet'inden yakıt seviyelerini okur (önbellekli)"""
+    return _cached_reference_list("FuelLevels")
+
+def load_check_fields(category):
+    """İlgili sheet'ten kontrolleri okur (önbellekli)
+    category: 'ExteriorChecks', 'EngineChecks', 'SafetyEquipment', 'InteriorChecks'
+    """
+    return _cached_reference_list(category)
+
+def load_items():
+    """Items sheet'inden eşya listesini okur (önbellekli)"""
+    return _cached_reference_list("Items")
+
+# Kontrol kategorileri: (sheet adı, Submissions başlık prefix'i, form_data anahtarı)
+CHECK_CATEGORIES = [
+    ("ExteriorChecks", "Exterior", "exterior_checks"),
+    ("EngineChecks", "Engine", "engine_checks"),
+    ("SafetyEquipment", "Safety", "safety_checks"),
+    ("InteriorChecks", "Interior", "interior_checks"),
+]
+
+@dataclass
+class FormCatalog:
+    """Kontrol formunun ihtiyaç duyduğu tüm referans listeleri"""
+    vehicles: list = dataclass_field(default_factory=list)
+    fuel_levels: list = dataclass_field(default_factory=list)
+    items: list = dataclass_field(default_factory=list)
+    check_fields: dict = dataclass_field(default_factory=dict)  # sheet adı -> alan listesi
+
+    def fields(self, category):
+        """Kategoriye ait kontrol alanlarını döndürür (örn: 'ExteriorChecks')"""
+        return self.check_fields.get(category, [])
+
+def _first_column_values(rows):
+    """Başlık hariç satırlardan ilk kolonun dolu değerlerini döndürür"""
+    return [row[0] for row in rows if row and row[0]]
+
+FORM_CATALOG_SHEETS = ["Vehicles", "FuelLevels", "Items"] + [category for category, _, _ in CHECK_CATEGORIES]
+
+def _read_form_catalog_lists(sheet_names):
+    """Verilen referans sheet'lerini tek seferde okur, sheet adı -> liste döndürür
+    Google Sheets'te tek bir values_batch_get isteği, Excel'de tek bir workbook yüklemesi yapılır
+    """
+    return get_storage_backend().load_lists(sheet_names)
+
+def load_form_catalog():
+    """Araçları, yakıt seviyelerini, eşyaları ve dört kontrol kategorisini FormCatalog olarak döndürür
+    Önbellekte olmayan listeler tek seferde okunur; hepsi önbellekteyse hiç I/O yapılmaz
+    """
+    lists = {}
+    with _reference_cache_lock:
+        for name in FORM_CATALOG_SHEETS:
+            values = _reference_cache_lookup(name)
+            if values is not None:
+                _reference_cache_stats["hits"] += 1
+                lists[name] = list(values)
+        missing = [name for name in FORM_CATALOG_SHEETS if name not in lists]
+        _reference_cache_stats["misses"] += len(missing)
+        versions = {name: _reference_versions.get(name, 0) for name in missing}
+
+    if missing:
+        loaded = _read_form_catalog_lists(missing)
+        for name in missing:
+            values = loaded.get(name, [])
+            _reference_cache_store(name, values, versions[name])
+            lists[name] = list(values)
+
+    return FormCatalog(
+        vehicles=lists["Vehicles"],
+        fuel_levels=lists["FuelLevels"],
+        items=lists["Items"],
+        check_fields={category: lists[category] for category, _, _ in CHECK_CATEGORIES}
+    )
+
+@dataclass
+class UserDirectory:
+    """Kullanıcı indeksi: kullanıcı adına ve küçük harfli e-postaya göre O(1) erişim
+    Tek bir Users okumasından oluşturulur; admin bayrağı önceden çözülmüştür
+    """
+    by_username: dict = dataclass_field(default_factory=dict)  # kullanıcı adı -> UserRecord
+    by_email: dict = dataclass_field(default_factory=dict)  # küçük harfli e-posta -> UserRecord
+
+    @classmethod
+    def from_records(cls, records):
+        directory = cls()
+        for record in records:
+            # Aynı kullanıcı adı birden fazla satırdaysa sonuncusu geçerlidir (load_users ile aynı)
+            directory.by_username[record.username] = record
+        for record in directory.by_username.values():
+            if record.email:
+                directory.by_email.setdefault(record.email.lower(), record)
+        return directory
+
+    def get(self, username):
+        return self.by_username.get(username)
+
+    def find_by_email(self, email):
+        return self.by_email.get((email or "").lower())
+
+    def is_admin(self, username):
+        record = self.by_username.get(username)
+        return bool(record and record.is_admin)
+
+    def as_user_dict(self):
+        """load_users formatı"""
+        return {username: record.as_dict() for username, record in self.by_username.items()}
+
+# Kullanıcı indeksi önbelleği - login, admin kontrolü ve e-posta aramaları tek okumayı paylaşır
+# Kullanıcı değişiklikleri indeksi geçersiz kılar; TTL dışarıdan (örn: Sheet'te elle) yapılan değişiklikler içindir
+try:
+    USER_DIRECTORY_TTL = float(get_secret("USER_DIRECTORY_TTL", "60"))
+except (TypeError, ValueError):
+    USER_DIRECTORY_TTL = 60.0
+
+_user_directory_lock = threading.Lock()
+_user_directory = None  # (UserDirectory, yüklenme zamanı)
+_user_directory_version = 0
+_user_directory_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+def get_user_directory():
+    """Kullanıcı indeksini döndürür; önbellekte yoksa aktif backend'den tek okumayla oluşturur"""
+    global _user_directory
+    with _user_directory_lock:
+        if _user_directory is not None:
+            directory, loaded_at = _user_directory
+            if time.monotonic() - loaded_at <= USER_DIRECTORY_TTL:
+                _user_directory_stats["hits"] += 1
+                return directory
+            _user_directory = None
+        _user_directory_stats["misses"] += 1
+        version = _user_directory_version
+    
+    directory = UserDirectory.from_records(get_storage_backend().load_user_records())
+    with _user_directory_lock:
+        # Okuma sırasında bir kullanıcı değiştiyse eski indeksi önbelleğe yazma
+        if version == _user_directory_version:
+            _user_directory = (directory, time.monotonic())
+    return directory
+
+def invalidate_user_directory():
+    """Kullanıcı indeksini geçersiz kılar (sonraki erişimde yeniden okunur)"""
+    global _user_directory, _user_directory_version
+    with _user_directory_lock:
+        _user_directory = None
+        _user_directory_version += 1
+        _user_directory_stats["invalidations"] += 1
+
+def get_user_directory_stats():
+    """Kullanıcı indeksi önbellek istatistiklerini döndürür"""
+    with _user_directory_lock:
+        stats = dict(_user_directory_stats)
+        stats["cached"] = _user_directory is not None
+        stats["users"] = len(_user_directory[0].by_username) if _user_directory else 0
+        stats["ttl_seconds"] = USER_DIRECTORY_TTL
+    return stats
+
+def _mutate_users(operation, *args, **kwargs):
+    """Kullanıcı değişikliğini aktif backend'de yapar ve kullanıcı indeksini geçersiz kılar"""
+    try:
+        return getattr(get_storage_backend(), operation)(*args, **kwargs)
+    finally:
+        invalidate_user_directory()
+
+def load_users():
+    """Users sheet'inden kullanıcıları okur (kullanıcı indeksi üzerinden)"""
+    _log("A", "excel_handler.py:load_users:entry", "load_users called", {})
+    users = get_user_directory().as_user_dict()
+    _log("A", "excel_handler.py:load_users:exit", "load_users returning", {"user_count": len(users), "usernames": list(users.keys())})
+    return users
+
+def load_users_with_roles():
+    """load_users ile aynı, her kullanıcıda ayrıca "is_admin" bayrağı bulunur (tek okuma, kullanıcı başına is_admin çağrısı gerekmez)"""
+    return {
+        username: dict(record.as_dict(), is_admin=record.is_admin)
+        for username, record in get_user_directory().by_username.items()
+    }
+
+def _mutate_reference_list(sheet, operation, *args):
+    """Referans listesini aktif backend'de değiştirir ve başarılıysa önbelleği geçersiz kılar"""
+    result = getattr(get_storage_backend(), operation)(sheet, *args)
+    if result:
+        invalidate_reference_cache(sheet)
+    return result
+
+def add_vehicle(vehicle_name):
+    """Yeni araç ekler"""
+    return _mutate_reference_list("Vehicles", "add_list_value", vehicle_name)
+
+def delete_vehicle(vehicle_name):
+    """Aracı siler"""
+    return _mutate_reference_list("Vehicles", "delete_list_value", vehicle_name)
+
+def update_vehicle(old_name, new_name):
+    """Araç adını günceller"""
+    return _mutate_reference_list("Vehicles", "update_list_value", old_name, new_name)
+
+def add_fuel_level(level):
+    """Yeni yakıt seviyesi ekler"""
+    return _mutate_reference_list("FuelLevels", "add_list_value", level)
+
+def delete_fuel_level(level):
+    """Yakıt seviyesini siler"""
+    return _mutate_reference_list("FuelLevels", "delete_list_value", level)
+
+def update_fuel_level(old_level, new_level):
+    """Yakıt seviyesini günceller"""
+    return _mutate_reference_list("FuelLevels", "update_list_value", old_level, new_level)
+
+def add_check_field(category, field_name):
+    """Yeni kontrol alanı ekler"""
+    return _mutate_reference_list(category, "add_list_value", field_name)
+
+def delete_check_field(category, field_name):
+    """Kontrol alanını siler"""
+    return _mutate_reference_list(category, "delete_list_value", field_name)
+
+def update_check_field(category, old_name, new_name):
+    """Kontrol alanını günceller"""
+    return _mutate_reference_list(category, "update_list_value", old_name, new_name)
+
+def add_item(item_name):
+    """Yeni eşya ekler"""
+    return _mutate_reference_list("Items", "add_list_value", item_name)
+
+def delete_item(item_name):
+    """Eşyayı siler"""
+    return _mutate_reference_list("Items", "delete_list_value", item_name)
+
+def update_item(old_name, new_name):
+    """Eşya adını günceller"""
+    return _mutate_reference_list("Items", "update_list_value", old_name, new_name)
+
+# Toplu referans listesi işlemleri (admin panelindeki CSV/yapıştırma ile yükleme)
+# Her işlem backend'de tek yazmadır (Excel: tek kayıt, SQLite: tek transaction)
+
+def clean_reference_values(values):
+    """Toplu girişteki değerleri temizler: boşluklar kırpılır, boş ve tekrarlanan değerler (ilk sıra korunarak) atlanır"""
+    seen = set()
+    cleaned = []
+    for value in values:
+        value = str(value).strip() if value is not None else ""
+        if value and value not in seen:
+            seen.add(value)
+            cleaned.append(value)
+    return cleaned
+
+def _add_reference_values(sheet, values):
+    """Listede olmayan değerleri ekler, eklenen değerleri döndürür"""
+    values = clean_reference_values(values)
+    if not values:
+        return []
+    return _mutate_reference_list(sheet, "add_list_values", values)
+
+def _replace_reference_values(sheet, values):
+    """Listeyi verilen değerlerle (bu sırayla) değiştirir, {"added": [...], "removed": [...]} döndürür"""
+    values = clean_reference_values(values)
+    current = get_storage_backend().load_list(sheet)
+    current_set, new_set = set(current), set(values)
+    changes = {
+        "added": [value for value in values if value not in current_set],
+        "removed": [value for value in current if value not in new_set],
+    }
+    if current != values and not _mutate_reference_list(sheet, "replace_list_values", values):
+        return {"added": [], "removed": []}
+    return changes
+
+def add_vehicles(vehicle_names):
+    """Birden fazla aracı tek yazmayla ekler"""
+    return _add_reference_values("Vehicles", vehicle_names)
+
+def replace_vehicles(vehicle_names):
+    """Araç listesini verilen listeyle değiştirir"""
+    return _replace_reference_values("Vehicles", vehicle_names)
+
+def add_fuel_levels(levels):
+    """Birden fazla yakıt seviyesini tek yazmayla ekler"""
+    return _add_reference_values("FuelLevels", levels)
+
+def replace_fuel_levels(levels):
+    """Yakıt seviyesi listesini verilen listeyle değiştirir"""
+    return _replace_reference_values("FuelLevels", levels)
+
+def add_check_fields(category, field_names):
+    """Kategoriye birden fazla kontrol alanını tek yazmayla ekler"""
+    return _add_reference_values(category, field_names)
+
+def replace_check_fields(category, field_names):
+    """Kategorinin kontrol alanlarını verilen listeyle değiştirir"""
+    return _replace_reference_values(category, field_names)
+
+def add_items(item_names):
+    """Birden fazla eşyayı tek yazmayla ekler"""
+    return _add_reference_values("Items", item_names)
+
+def replace_items(item_names):
+    """Eşya listesini verilen listeyle değiştirir"""
+    return _replace_reference_values("Items", item_names)
+
+def add_user(username, password, full_name, email="", is_admin_user=False):
+    """Yeni kullanıcı ekler"""
+    return _mutate_users("add_user", username, password, full_name, email, is_admin_user)
+
+def delete_user(username):
+    """Kullanıcıyı siler"""
+    return _mutate_users("delete_user", username)
+
+def update_user(username, password=None, full_name=None, email=None, is_admin=None):
+    """Kullanıcı bilgilerini günceller (satır numarası kullanıcı indeksinden alınır, Users yeniden taranmaz)"""
+    record = get_user_directory().get(username)
+    row = record.row if record else None
+    return _mutate_users("update_user", username, password=password, full_name=full_name, email=email, is_admin=is_admin, row=row)
+
+@_with_workbook_lock
+def update_excel_with_admin_column():
+    """Mevcut Excel dosyasına Admin ve Email kolonlarını ekler ve admin kullanıcısını ekler
+    Google Sheets kullanılıyorsa bu fonksiyon hiçbir şey yapmaz (Google Sheets'te manuel yapılmalı)
+    NOT: Bu fonksiyon mevcut kullanıcıları korur, sadece eksik kolonları ve admin kullanıcısını ekler
+    """
+    # Google Sheets veya SQLite kullanılıyorsa Excel işlemlerini atla
+    if USE_GOOGLE_SHEETS or USE_SQLITE:
+        _log("D", "excel_handler.py:update_excel_with_admin_column", "Google Sheets enabled, skipping Excel update", {})
+        return
+    
+    # Dosya yoksa veya Users sheet'i yoksa hiçbir şey yapma (get_excel_file zaten oluşturuyor)
+    if not os.path.exists(EXCEL_FILE):
+        return
+    
+    try:
+        wb = get_excel_file()
+        
+        # Users sheet'i yoksa hiçbir şey yapma
+        if "Users" not in wb.sheetnames:
+            return
+        
+        ws = wb["Users"]
         
         # Başlık satırı yoksa hiçbir şey yapma
         if ws.max_row < 1:
@@ -762,6 +2273,7 @@ def update_excel_with_admin_column():
         
         # Başlık satırını kontrol et
         headers = [cell.value for cell in ws[1]]
+        modified = False
         
         # Email kolonu yoksa ekle
         if "Email" not in headers:
@@ -771,6 +2283,7 @@ def update_excel_with_admin_column():
             ws.insert_cols(email_col_idx)
             ws.cell(row=1, column=email_col_idx, value="Email")
             headers.insert(email_col_idx - 1, "Email")
+            modified = True
             
             # Mevcut kullanıcılara boş email ekle
             for row_idx in range(2, ws.max_row + 1):
@@ -782,6 +2295,7 @@ def update_excel_with_admin_column():
             admin_col_idx = len(headers) + 1
             ws.cell(row=1, column=admin_col_idx, value="Admin")
             headers.append("Admin")
+            modified = True
             
             # Mevcut kullanıcılara "No" ekle (admin hariç)
             for row_idx in range(2, ws.max_row + 1):
@@ -807,12 +2321,19 @@ def update_excel_with_admin_column():
                 ws.append(["admin", "admin123", "Admin User", "admin@example.com", "Yes"])
             else:
                 ws.append(["admin", "admin123", "Admin User", "admin@example.com"])
+            modified = True
         
-        wb.save(EXCEL_FILE)
+        # Değişiklik yoksa kaydetme (uygulama her rerun'da bu fonksiyonu çağırıyor)
+        if not modified:
+            return
+        _save_workbook(wb)
+        invalidate_user_directory()
         _log("D", "excel_handler.py:update_excel_with_admin_column", "Excel updated successfully", {})
     except Exception as e:
         # Excel dosyası bozuksa veya oluşturulamazsa hata verme, sadece log
         _log("E", "excel_handler.py:update_excel_with_admin_column", "Failed to update Excel file", {"error": str(e)})
+        # Yarım kalan değişiklikler bellekteki kopyada kalmasın
+        _drop_resident_workbook()
         # Bulut ortamında Excel dosyası olmayabilir, bu normal
         pass
 
@@ -823,356 +2344,1402 @@ if os.path.exists(EXCEL_FILE_LOCAL):
 else:
     SUBMISSIONS_FILE = EXCEL_FILE_TEMP
 
-def _prepare_submission_row(form_data):
-    """Form verilerini Excel/Sheets satırına dönüştürür"""
-    from datetime import datetime
-    
-    # Başlık satırı oluştur
-    headers = [
-        "Timestamp", "Driver Name", "Vehicle", "Odometer Start", 
-        "Fuel Level", "Oil Level", "Fuel Card", "Measuring Tape", 
-        "Safety Vest", "Fuel Amount", "Additional Comments"
-    ]
-    
-    # Exterior checks başlıkları
-    exterior_fields = load_check_fields("ExteriorChecks")
-    for field in exterior_fields:
-        headers.append(f"Exterior_{field}")
-    
-    # Engine checks başlıkları
-    engine_fields = load_check_fields("EngineChecks")
-    for field in engine_fields:
-        headers.append(f"Engine_{field}")
-    
-    # Safety equipment başlıkları
-    safety_fields = load_check_fields("SafetyEquipment")
-    for field in safety_fields:
-        headers.append(f"Safety_{field}")
-    
-    # Interior checks başlıkları
-    interior_fields = load_check_fields("InteriorChecks")
-    for field in interior_fields:
-        headers.append(f"Interior_{field}")
-    
-    # Veri satırı oluştur
-    row = [
-        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        form_data.get("driver_name", ""),
-        form_data.get("vehicle", ""),
-        form_data.get("odometer_start", ""),
-        form_data.get("fuel_level", ""),
-        form_data.get("oil_level", ""),
-        form_data.get("fuel_card", ""),
-        form_data.get("measuring_tape", ""),
-        form_data.get("safety_vest", ""),
-        form_data.get("fuel_amount", ""),
-        form_data.get("additional_comments", "")
-    ]
-    
-    # Exterior checks değerleri
-    exterior_checks = form_data.get("exterior_checks", {})
-    for field in exterior_fields:
-        row.append(exterior_checks.get(field, ""))
-    
-    # Engine checks değerleri
-    engine_checks = form_data.get("engine_checks", {})
-    for field in engine_fields:
-        row.append(engine_checks.get(field, ""))
-    
-    # Safety equipment değerleri
-    safety_checks = form_data.get("safety_checks", {})
-    for field in safety_fields:
-        row.append(safety_checks.get(field, ""))
-    
-    # Interior checks değerleri
-    interior_checks = form_data.get("interior_checks", {})
-    for field in interior_fields:
-        row.append(interior_checks.get(field, ""))
-    
-    return headers, row
+# Submissions temel kolonları: (başlık, form_data anahtarı); Timestamp gönderim anında doldurulur
+SUBMISSION_BASE_COLUMNS = [
+    ("Timestamp", None),
+    ("Driver Name", "driver_name"),
+    ("Vehicle", "vehicle"),
+    ("Odometer Start", "odometer_start"),
+    ("Fuel Level", "fuel_level"),
+    ("Oil Level", "oil_level"),
+    ("Fuel Card", "fuel_card"),
+    ("Measuring Tape", "measuring_tape"),
+    ("Safety Vest", "safety_vest"),
+    ("Fuel Amount", "fuel_amount"),
+    ("Additional Comments", "additional_comments"),
+]
+
+@dataclass(frozen=True)
+class SubmissionSchema:
+    """Submissions başlık düzeni: başlıklar ve her kolonun form_data'daki karşılığı
+    Kontrol alanları değişmedikçe aynı nesne kullanılır (key: kategorilerin alan listeleri)
+    """
+    key: tuple
+    headers: tuple
+    columns: tuple  # her kolon için (form_data anahtarı, kontrol alanı adı veya None)
+    category_headers: dict = dataclass_field(default_factory=dict)  # başlık prefix'i -> o kategorinin başlıkları
+
+    @classmethod
+    def from_check_fields(cls, key):
+        headers = [header for header, _ in SUBMISSION_BASE_COLUMNS]
+        columns = [(form_key, None) for _, form_key in SUBMISSION_BASE_COLUMNS]
+        category_headers = {}
+        for (category, prefix, form_key), fields in zip(CHECK_CATEGORIES, key):
+            category_headers[prefix] = [f"{prefix}_{field}" for field in fields]
+            headers.extend(category_headers[prefix])
+            columns.extend((form_key, field) for field in fields)
+        return cls(key=key, headers=tuple(headers), columns=tuple(columns), category_headers=category_headers)
+
+    def build_row(self, form_data, timestamp=None):
+        """form_data'dan başlık sırasına uygun satır oluşturur"""
+        from datetime import datetime
+        row = []
+        for form_key, field in self.columns:
+            if form_key is None:
+                row.append(timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            elif field is None:
+                row.append(form_data.get(form_key, ""))
+            else:
+                row.append(form_data.get(form_key, {}).get(field, ""))
+        return row
+
+_submission_schema_lock = threading.Lock()
+_submission_schema = None
+_submission_schema_stats = {"builds": 0, "reuses": 0}
+
+def get_submission_schema(catalog=None):
+    """Güncel kontrol alanlarına göre SubmissionSchema döndürür (alanlar değişmediyse önbellekteki nesne)
+    catalog verilmezse kontrol alanları referans önbelleğinden okunur
+    """
+    global _submission_schema
+    if catalog is not None:
+        key = tuple(tuple(catalog.fields(category)) for category, _, _ in CHECK_CATEGORIES)
+    else:
+        key = tuple(tuple(load_check_fields(category)) for category, _, _ in CHECK_CATEGORIES)
+    with _submission_schema_lock:
+        if _submission_schema is not None and _submission_schema.key == key:
+            _submission_schema_stats["reuses"] += 1
+            return _submission_schema
+        _submission_schema = SubmissionSchema.from_check_fields(key)
+        _submission_schema_stats["builds"] += 1
+        return _submission_schema
+
+@functools.lru_cache(maxsize=64)
+def _submission_schema_for_headers(headers):
+    key = tuple(
+        tuple(header[len(prefix) + 1:] for header in headers if isinstance(header, str) and header.startswith(f"{prefix}_"))
+        for _, prefix, _ in CHECK_CATEGORIES
+    )
+    with _submission_schema_lock:
+        if _submission_schema is not None and _submission_schema.key == key:
+            return _submission_schema
+    return SubmissionSchema.from_check_fields(key)
+
+def get_submission_schema_for(submission):
+    """Kayıtlı bir gönderimin başlık düzenine karşılık gelen SubmissionSchema
+    Kontrol kolonlarının kategorilere ayrılması her başlık düzeni için bir kez yapılır (satır başına değil)
+    """
+    return _submission_schema_for_headers(tuple(submission))
+
+def _prepare_submission_row(form_data, catalog=None):
+    """Form verilerini Excel/Sheets satırına dönüştürür
+    catalog: formun kullandığı FormCatalog (verilmezse kontrol alanları önbellekten okunur)
+    """
+    schema = get_submission_schema(catalog)
+    return list(schema.headers), schema.build_row(form_data)
+
+def save_form_submission_to_google_apps_script(form_data, timeout=10):
+    """Form verilerini Google Apps Script'e HTTP POST ile gönderir (eski yöntem - Google Sheets formatına uygun)"""
+    import urllib.request
+    import urllib.parse
+    import json
+    
+    try:
+        # Form verilerini Google Sheets formatına uygun şekilde düzleştir
+        # Eski HTML formundaki field isimlerini kullan
+        flat_data = {}
+        
+        # Temel alanlar (eski formdaki isimlerle aynı)
+        flat_data["driver_name"] = form_data.get("driver_name", "")
+        
+        # Vehicle - "Other" seçildiyse other_vehicle kullan
+        vehicle = form_data.get("vehicle", "")
+        if vehicle == "Other":
+            flat_data["vehicle"] = "Other"
+            flat_data["other_vehicle"] = form_data.get("other_vehicle", "")
+        else:
+            flat_data["vehicle"] = vehicle
+            flat_data["other_vehicle"] = ""
+        
+        flat_data["odometer_start"] = str(form_data.get("odometer_start", ""))
+        
+        # Fuel level - "Other" seçildiyse other_fuel kullan
+        fuel_level = form_data.get("fuel_level", "")
+        if fuel_level == "Other":
+            flat_data["fuel_level"] = "Other"
+            flat_data["other_fuel"] = form_data.get("other_fuel", "")
+        else:
+            flat_data["fuel_level"] = fuel_level
+            flat_data["other_fuel"] = ""
+        
+        flat_data["oil_level"] = form_data.get("oil_level", "")
+        flat_data["fuel_card"] = form_data.get("fuel_card", "")
+        flat_data["measuring_tape"] = form_data.get("measuring_tape", "")
+        flat_data["safety_vest"] = form_data.get("safety_vest", "")
+        flat_data["fuel_amount"] = form_data.get("fuel_amount", "")
+        flat_data["additional_comments"] = form_data.get("additional_comments", "")
+        
+        # Dosya yüklemeleri (şimdilik boş, gelecekte eklenebilir)
+        flat_data["odometer_file"] = ""
+        flat_data["fuel_receipt"] = ""
+        
+        # Exterior checks - direkt field isimleri (prefix olmadan)
+        exterior_checks = form_data.get("exterior_checks", {})
+        exterior_fields = ['headlights', 'break_lights', 'indicators', 'mirrors', 'windows', 
+                          'windshield', 'wiper_fluid', 'wipers', 'tires', 'body_paint']
+        for field in exterior_fields:
+            flat_data[field] = exterior_checks.get(field, "Needs Attention")
+        
+        # Engine checks - direkt field isimleri
+        engine_checks = form_data.get("engine_checks", {})
+        engine_fields = ['engine_noise', 'coolant_level', 'brake_fluid', 'battery_condition', 'belts_hoses']
+        for field in engine_fields:
+            flat_data[field] = engine_checks.get(field, "Needs Attention")
+        
+        # Safety equipment - direkt field isimleri
+        safety_checks = form_data.get("safety_checks", {})
+        safety_fields = ['seatbelts', 'fire_extinguisher', 'first_aid_kit', 'horn', 'jumper_cables', 'snow_brush']
+        for field in safety_fields:
+            flat_data[field] = safety_checks.get(field, "Needs Attention")
+        
+        # Interior checks - direkt field isimleri
+        interior_checks = form_data.get("interior_checks", {})
+        interior_fields = ['cleanliness', 'dashboard_lights', 'hvac', 'seats']
+        for field in interior_fields:
+            flat_data[field] = interior_checks.get(field, "Needs Attention")
+        
+        # HTTP POST isteği gönder (multipart/form-data yerine application/x-www-form-urlencoded)
+        data = urllib.parse.urlencode(flat_data).encode('utf-8')
+        req = urllib.request.Request(GOOGLE_APPS_SCRIPT_URL, data=data, method='POST')
+        req.add_header('Content-Type', 'application/x-www-form-urlencoded')
+        
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            result = response.read().decode('utf-8')
+            # #region agent log
+            _log("F", "excel_handler.py:save_form_submission_to_google_apps_script", "Google Apps Script response", {"status_code": response.status, "result": result[:100]})
+            # #endregion agent log
+            return True
+    except Exception as e:
+        # #region agent log
+        _log("F", "excel_handler.py:save_form_submission_to_google_apps_script", "Google Apps Script error", {"error": str(e)})
+        # #endregion agent log
+        return False
+
+def save_form_submission(form_data, catalog=None):
+    """Form verilerini Excel dosyasına veya Google Sheets'e kaydeder
+    Outbox açıksa gönderim diske yazılıp hemen döner; iletim arka planda yapılır
+    """
+    headers, row = _prepare_submission_row(form_data, catalog)
+    
+    if USE_SUBMISSION_OUTBOX:
+        _enqueue_submission(form_data, headers, row)
+        return
+    
+    # Apps Script ve aktif backend'e paralel kaydet (Google Sheets hata verirse Excel'e düşer)
+    results = _deliver_to_sinks(_submission_sinks(), form_data, headers, row)
+    for sink, error in results.items():
+        if error is not None:
+            _log("E", f"excel_handler.py:save_form_submission:{sink}", "Submission sink failed", {"error": str(error)})
+    if not _submission_policy_met(results):
+        # Önce ana hedefin hatası bildirilir
+        errors = sorted((sink != PRIMARY_SUBMISSION_SINK, sink) for sink, error in results.items() if error is not None)
+        raise results[errors[0][1]]
+
+def _batch_submission_timestamp(form_data):
+    """Toplu gönderimdeki formu doğrular; "submitted_at" verildiyse Submissions formatında döndürür"""
+    from datetime import datetime
+    if not isinstance(form_data, dict):
+        raise ValueError("form data must be a dict")
+    for key in ("driver_name", "vehicle"):
+        if not str(form_data.get(key) or "").strip():
+            raise ValueError(f"{key} is required")
+    for _, _, form_key in CHECK_CATEGORIES:
+        if not isinstance(form_data.get(form_key, {}), dict):
+            raise ValueError(f"{form_key} must be a dict")
+    submitted_at = form_data.get("submitted_at")
+    if not submitted_at:
+        return None
+    if not isinstance(submitted_at, datetime):
+        try:
+            submitted_at = datetime.fromisoformat(str(submitted_at))
+        except ValueError:
+            raise ValueError(f"submitted_at is not a valid date: {submitted_at}")
+    return submitted_at.strftime("%Y-%m-%d %H:%M:%S")
+
+def save_form_submissions_batch(form_data_list, catalog=None):
+    """Birden fazla formu tek seferde kaydeder (çevrimdışı cihazlarda biriken formlar için)
+    Formlar önce doğrulanır, geçerli olanlar backend'e tek istekle yazılır (Sheets: tek append_rows,
+    Excel: tek günlük yazması ve tek workbook kaydı, SQLite: tek transaction). Formdaki opsiyonel
+    "submitted_at" alanı Timestamp olarak kullanılır. Her form için {"index", "ok", "error"} döndürür
+    """
+    schema = get_submission_schema(catalog)
+    headers = list(schema.headers)
+    results = []
+    accepted = []  # (index, form_data, row)
+    for index, form_data in enumerate(form_data_list):
+        try:
+            timestamp = _batch_submission_timestamp(form_data)
+        except ValueError as e:
+            results.append({"index": index, "ok": False, "error": str(e)})
+            continue
+        accepted.append((index, form_data, schema.build_row(form_data, timestamp=timestamp)))
+        results.append({"index": index, "ok": True, "error": None})
+    if not accepted:
+        return results
+    
+    sinks = _submission_sinks()
+    storage_error = None
+    try:
+        _store_submissions([(headers, row) for _, _, row in accepted])
+    except Exception as e:
+        storage_error = e
+        _log("E", "excel_handler.py:save_form_submissions_batch:storage", "Batch storage write failed", {"error": str(e), "rows": len(accepted)})
+    
+    if USE_SUBMISSION_OUTBOX:
+        # Kalan hedefler (Apps Script, backend yazılamadıysa o da) outbox üzerinden yeniden denenir
+        retry_sinks = [sink for sink in sinks if sink != "storage" or storage_error is not None]
+        if retry_sinks:
+            for _, form_data, row in accepted:
+                _enqueue_submission(form_data, headers, row, sinks=retry_sinks)
+        return results
+    
+    # Outbox kapalıysa Apps Script'e paralel gönderilir, her form başarı politikasına göre değerlendirilir
+    apps_script_errors = {}
+    if "apps_script" in sinks:
+        executor = _get_sink_executor()
+        futures = {index: executor.submit(_deliver_to_sinks, ["apps_script"], form_data, headers, row) for index, form_data, row in accepted}
+        apps_script_errors = {index: future.result()["apps_script"] for index, future in futures.items()}
+    for index, _, _ in accepted:
+        sink_results = {"storage": storage_error}
+        if "apps_script" in sinks:
+            sink_results["apps_script"] = apps_script_errors[index]
+        if not _submission_policy_met(sink_results):
+            error = storage_error if storage_error is not None else sink_results.get("apps_script")
+            results[index] = {"index": index, "ok": False, "error": str(error)}
+    return results
+
+def _append_submissions_to_workbook(entries, indexed=False):
+    """(headers, row) listesini Submissions sheet'ine ekler ve workbook'u bir kez kaydeder
+    indexed: satırlar gönderim indeksinde zaten var (günlükten aktarılan satırlar)
+    """
+    if not entries:
+        return
+    with _workbook_lock:
+        wb = get_excel_file()
+        
+        # Submissions sheet'i yoksa oluştur
+        if "Submissions" not in wb.sheetnames:
+            ws = wb.create_sheet("Submissions")
+            existing_headers = []
+        else:
+            ws = wb["Submissions"]
+            existing_headers = [cell.value for cell in ws[1]] if ws.max_row >= 1 else []
+            # Sondaki boş başlık hücreleri kolon sayılmaz
+            while existing_headers and not existing_headers[-1]:
+                existing_headers.pop()
+        
+        # Yeni kolonlar başlık satırının sonuna eklenir, satırlar başlık adına göre yerleştirilir
+        all_headers, new_headers = _merge_submission_headers(existing_headers, entries)
+        for col, header in enumerate(new_headers, start=len(all_headers) - len(new_headers) + 1):
+            ws.cell(row=1, column=col, value=header)
+        column_index = _submission_column_index(all_headers)
+        first_row = ws.max_row + 1
+        for headers, row in entries:
+            ws.append(_map_submission_row(column_index, headers, row))
+        if indexed:
+            _save_workbook(wb, first_row=first_row, compacted=len(entries))
+        else:
+            _save_workbook(wb, new_submissions=entries, first_row=first_row)
+
+# Submissions günlüğü (append-only JSONL)
+# Her gönderim tek satır olarak eklenir (O(1)); arka plandaki compactor satırları toplu halde
+# workbook'a aktarır. Böylece her gönderimde tüm xlsx dosyası yeniden yazılmaz.
+USE_SUBMISSIONS_JOURNAL = str(get_secret("USE_SUBMISSIONS_JOURNAL", "true")).lower() == "true"
+SUBMISSIONS_JOURNAL_FILE = os.path.join(CURRENT_DIR, "form_data.submissions.jsonl")
+SUBMISSIONS_COMPACTING_FILE = SUBMISSIONS_JOURNAL_FILE + ".compacting"
+try:
+    SUBMISSIONS_COMPACT_INTERVAL = float(get_secret("SUBMISSIONS_COMPACT_INTERVAL", "30"))
+    SUBMISSIONS_COMPACT_BATCH = int(get_secret("SUBMISSIONS_COMPACT_BATCH", "50"))
+except (TypeError, ValueError):
+    SUBMISSIONS_COMPACT_INTERVAL = 30.0
+    SUBMISSIONS_COMPACT_BATCH = 50
+
+_journal_lock = threading.Lock()  # günlüğe ekleme
+_compaction_lock = threading.RLock()  # compaction ve birleşik okuma
+_compactor_thread = None
+_compactor_wakeup = threading.Event()
+_journal_pending = 0
+_journal_stats = {"appended": 0, "compactions": 0, "compacted_rows": 0, "compaction_failures": 0}
+
+def _append_submission_journal(entries):
+    """(headers, row) listesini günlük dosyasına tek yazma ile ekler ve diske yazılmasını bekler"""
+    global _journal_pending
+    lines = "".join(json.dumps({"headers": headers, "row": row}, ensure_ascii=False, default=str) + "\n" for headers, row in entries)
+    with _journal_lock:
+        before = {"journal": _file_signature(SUBMISSIONS_JOURNAL_FILE)}
+        with open(SUBMISSIONS_JOURNAL_FILE, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        _submission_index_sources_changed(before, entries)
+        _journal_stats["appended"] += len(entries)
+        _journal_pending += len(entries)
+        pending = _journal_pending
+    _ensure_submission_compactor()
+    if pending >= SUBMISSIONS_COMPACT_BATCH:
+        _compactor_wakeup.set()
+
+def _read_journal_entries(path):
+    """Günlük dosyasındaki (headers, row) kayıtlarını okur; yarım yazılmış son satır atlanır"""
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                _log("E", "excel_handler.py:_read_journal_entries", "Skipping corrupt journal line", {"path": path})
+                continue
+            entries.append((entry["headers"], entry["row"]))
+    return entries
+
+def compact_submission_journal():
+    """Günlükteki gönderimleri Submissions sheet'ine tek bir kayıtla aktarır, aktarılan satır sayısını döndürür"""
+    global _journal_pending
+    with _compaction_lock:
+        # Önceki compaction yarıda kaldıysa önce onu bitir, yoksa günlüğü devral
+        if not os.path.exists(SUBMISSIONS_COMPACTING_FILE):
+            with _journal_lock:
+                if not os.path.exists(SUBMISSIONS_JOURNAL_FILE):
+                    return 0
+                before = {"journal": _file_signature(SUBMISSIONS_JOURNAL_FILE), "compacting": _file_signature(SUBMISSIONS_COMPACTING_FILE)}
+                os.replace(SUBMISSIONS_JOURNAL_FILE, SUBMISSIONS_COMPACTING_FILE)
+                _journal_pending = 0
+                _submission_index_sources_changed(before)
+        
+        entries = _read_journal_entries(SUBMISSIONS_COMPACTING_FILE)
+        try:
+            # Satırların sırası değişmez; indeksteki günlük konumları eklendikleri sheet satırlarına taşınır
+            _append_submissions_to_workbook(entries, indexed=True)
+        except Exception as e:
+            _journal_stats["compaction_failures"] += 1
+            _log("E", "excel_handler.py:compact_submission_journal", "Compaction failed, will retry", {"error": str(e)})
+            raise
+        before = {"compacting": _file_signature(SUBMISSIONS_COMPACTING_FILE)}
+        os.remove(SUBMISSIONS_COMPACTING_FILE)
+        _submission_index_sources_changed(before)
+        _journal_stats["compactions"] += 1
+        _journal_stats["compacted_rows"] += len(entries)
+        return len(entries)
+
+def _submission_compactor_loop():
+    while True:
+        _compactor_wakeup.wait(SUBMISSIONS_COMPACT_INTERVAL)
+        _compactor_wakeup.clear()
+        try:
+            compact_submission_journal()
+        except Exception:
+            # Hata loglandı; dosyalar yerinde kaldığı için bir sonraki turda tekrar denenir
+            pass
+
+def _ensure_submission_compactor():
+    """Arka plan compactor thread'ini (yoksa) başlatır"""
+    global _compactor_thread
+    with _journal_lock:
+        if _compactor_thread is not None and _compactor_thread.is_alive():
+            return
+        _compactor_thread = threading.Thread(target=_submission_compactor_loop, name="submission-compactor", daemon=True)
+        _compactor_thread.start()
+
+def get_submission_journal_stats():
+    """Günlük istatistiklerini döndürür (bekleyen satırlar dahil)"""
+    with _compaction_lock:
+        pending = len(_read_journal_entries(SUBMISSIONS_COMPACTING_FILE))
+        with _journal_lock:
+            pending += len(_read_journal_entries(SUBMISSIONS_JOURNAL_FILE))
+            stats = dict(_journal_stats)
+    stats["pending_rows"] = pending
+    return stats
+
+# Gönderim indeksleri (Excel)
+# Sürücü, araç ve gün bazında satır id'leri tutulur; filtre seçenekleri ve filtreler tüm geçmişi taramadan
+# indeksten hesaplanır. Her kaydın konumu (sheet satır numarası veya günlük sırası) da tutulur, böylece
+# sayfadaki gönderimler doğrudan okunur. İndeks gönderim eklendikçe güncellenir ve workbook'un yanında saklanır
+# (gönderim başına bir JSONL kaydı, günlük aktarımları için bir taşıma kaydı + kaynak dosyaların imzalarını
+# tutan meta dosyası).
+# Kaynak dosyalar uygulama dışında değişmişse indeks bir sonraki sorguda yeniden oluşturulur.
+USE_SUBMISSION_INDEX = str(get_secret("USE_SUBMISSION_INDEX", "true")).lower() == "true"
+SUBMISSIONS_INDEX_FILE = os.path.join(CURRENT_DIR, "form_data.submissions.index.jsonl")
+SUBMISSIONS_INDEX_META_FILE = SUBMISSIONS_INDEX_FILE + ".meta"
+SUBMISSION_INDEX_VERSION = 2
+
+_submission_index_lock = threading.RLock()
+_submission_index = None  # bellekteki SubmissionIndex (None: yüklenmedi veya geçersiz)
+_submission_index_stats = {"loads": 0, "rebuilds": 0, "invalidations": 0, "appended": 0, "queries": 0}
+
+@dataclass
+class SubmissionIndex:
+    """Excel gönderimleri için ikincil indeksler
+    Satır id'si, Timestamp'i olan gönderimlerin iter_excel_submissions sırasındaki numarasıdır
+    Konum: Submissions sheet'indeki satır numarası, günlükte bekleyenler için -(günlük sırası + 1)
+    """
+    sources: dict = dataclass_field(default_factory=dict)  # kaynak dosya adı -> [mtime_ns, boyut]
+    timestamps: list = dataclass_field(default_factory=list)
+    locations: list = dataclass_field(default_factory=list)
+    pending: int = 0  # günlükteki (aktarılan + bekleyen) kayıt sayısı, Timestamp'i olmayanlar dahil
+    journal_row_ids: list = dataclass_field(default_factory=list)  # konumu günlükte olan satır id'leri
+    lines: int = 0  # indeks dosyasındaki kayıt sayısı (taşıma kayıtları dahil)
+    by_driver: dict = dataclass_field(default_factory=dict)
+    by_vehicle: dict = dataclass_field(default_factory=dict)
+    by_day: dict = dataclass_field(default_factory=dict)
+    sorted_days: list = None  # by_day anahtarları (aralık sorguları için, yeni gün eklenince yeniden sıralanır)
+
+    @staticmethod
+    def key_of(submission):
+        """Gönderimin indeks kaydı: [timestamp, sürücü, araç]; Timestamp yoksa None"""
+        timestamp = _submission_timestamp_text(submission.get("Timestamp"))
+        if not timestamp:
+            return None
+        driver = submission.get("Driver Name")
+        vehicle = submission.get("Vehicle")
+        return [timestamp, str(driver) if driver else "", str(vehicle) if vehicle else ""]
+
+    def add(self, key, location):
+        timestamp, driver, vehicle = key
+        row_id = len(self.timestamps)
+        self.timestamps.append(timestamp)
+        self.locations.append(location)
+        if location < 0:
+            self.journal_row_ids.append(row_id)
+        if driver:
+            self.by_driver.setdefault(driver, []).append(row_id)
+        if vehicle:
+            self.by_vehicle.setdefault(vehicle, []).append(row_id)
+        day = timestamp[:10]
+        if day not in self.by_day:
+            self.sorted_days = None
+        self.by_day.setdefault(day, []).append(row_id)
+        return row_id
+
+    def add_journal_entry(self, key):
+        """Günlüğe eklenen kaydı sayar; Timestamp'i varsa (key) indekse ekler"""
+        self.pending += 1
+        if key is not None:
+            self.add(key, -self.pending)
+
+    def relocate(self, compacted, first_row):
+        """Günlüğün ilk `compacted` kaydı sheet'e first_row'dan itibaren aktarıldı; konumları taşır"""
+        remaining = []
+        for row_id in self.journal_row_ids:
+            position = -self.locations[row_id] - 1
+            if position < compacted:
+                self.locations[row_id] = first_row + position
+            else:
+                self.locations[row_id] = -(position - compacted + 1)
+                remaining.append(row_id)
+        self.journal_row_ids = remaining
+        self.pending -= compacted
+
+    def values(self, column):
+        if column == "Driver Name":
+            return sorted(self.by_driver)
+        if column == "Vehicle":
+            return sorted(self.by_vehicle)
+        return None
+
+    def select(self, query):
+        """Sorguya uyan sayfadaki satır id'leri ve toplam eşleşme sayısı: (id'ler, toplam)"""
+        import bisect
+        import heapq
+        candidates = []
+        if query.driver is not None:
+            candidates.append(self.by_driver.get(query.driver, []))
+        if query.vehicle is not None:
+            candidates.append(self.by_vehicle.get(query.vehicle, []))
+        if query.date_from or query.date_to:
+            if self.sorted_days is None:
+                self.sorted_days = sorted(self.by_day)
+            low = bisect.bisect_left(self.sorted_days, query.date_from) if query.date_from else 0
+            high = bisect.bisect_right(self.sorted_days, query.date_to) if query.date_to else len(self.sorted_days)
+            candidates.append([row_id for day in self.sorted_days[low:high] for row_id in self.by_day[day]])
+
+        if candidates:
+            # En kısa listeden başlanır, diğer filtreler küme üyeliğiyle kontrol edilir
+            candidates.sort(key=len)
+            others = [set(candidate) for candidate in candidates[1:]]
+            matched = [row_id for row_id in candidates[0] if all(row_id in other for other in others)]
+        else:
+            matched = range(len(self.timestamps))
+
+        def sort_key(row_id):
+            return (self.timestamps[row_id], row_id)
+
+        if query.limit is None:
+            ordered = sorted(matched, key=sort_key, reverse=query.newest_first)
+        elif query.limit <= 0:
+            ordered = []
+        else:
+            select = heapq.nlargest if query.newest_first else heapq.nsmallest
+            ordered = select(query.offset + query.limit, matched, key=sort_key)
+        return ordered[query.offset:], len(matched)
+
+def _file_signature(path):
+    """Dosyanın [mtime_ns, boyut] imzası, dosya yoksa None (JSON'a yazılabilsin diye liste)"""
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    return [file_stat.st_mtime_ns, file_stat.st_size]
+
+def _submission_source_signatures():
+    """Gönderimlerin okunduğu dosyaların (workbook, günlük, aktarılan günlük) imzaları"""
+    return {
+        "workbook": _file_signature(EXCEL_FILE),
+        "journal": _file_signature(SUBMISSIONS_JOURNAL_FILE),
+        "compacting": _file_signature(SUBMISSIONS_COMPACTING_FILE),
+    }
+
+def _write_submission_index_meta(index, lines):
+    temp_path = SUBMISSIONS_INDEX_META_FILE + ".tmp"
+    meta = {
+        "version": SUBMISSION_INDEX_VERSION,
+        "count": len(index.timestamps),
+        "lines": lines,
+        "pending": index.pending,
+        "sources": index.sources,
+    }
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(temp_path, SUBMISSIONS_INDEX_META_FILE)
+
+def _write_submission_index(index, records):
+    """İndeksi baştan yazar (yeniden oluşturma sonrası)"""
+    temp_path = SUBMISSIONS_INDEX_FILE + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+    os.replace(temp_path, SUBMISSIONS_INDEX_FILE)
+    index.lines = len(records)
+    _write_submission_index_meta(index, index.lines)
+
+def _load_submission_index(expected_sources):
+    """Bellekteki indeksi, yoksa diskteki indeksi döndürür; disktekinin kaynak imzaları tutmuyorsa None
+    (Yeniden oluşturmaz; çağıran _submission_index_lock'u tutmalıdır)
+    """
+    global _submission_index
+    if _submission_index is not None:
+        return _submission_index
+    try:
+        with open(SUBMISSIONS_INDEX_META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != SUBMISSION_INDEX_VERSION or meta.get("sources") != expected_sources:
+        return None
+    index = SubmissionIndex(sources=meta["sources"])
+    try:
+        with open(SUBMISSIONS_INDEX_FILE, "r", encoding="utf-8") as f:
+            # Meta dosyası satırlardan sonra yazılır; fazladan (yarım kalmış) satırlar dikkate alınmaz
+            for line in f:
+                if index.lines >= meta["lines"]:
+                    break
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    index.relocate(record["compacted"], record["first_row"])
+                else:
+                    index.add(record[:3], record[3])
+                index.lines += 1
+    except (OSError, ValueError, KeyError, IndexError):
+        return None
+    if index.lines != meta["lines"] or len(index.timestamps) != meta["count"]:
+        return None
+    index.pending = meta["pending"]
+    _submission_index = index
+    _submission_index_stats["loads"] += 1
+    return index
+
+def _rebuild_submission_index():
+    """İndeksi gönderimleri bir kez tarayarak yeniden oluşturur; tarama sırasında dosyalar değişirse tekrar dener"""
+    global _submission_index
+    for _ in range(3):
+        sources = _submission_source_signatures()
+        index = SubmissionIndex(sources=sources)
+        records = []
+        # Tarama _submission_index_lock dışında yapılır (yazma yolları önce workbook/günlük kilidini alır)
+        for location, submission in _iter_located_excel_submissions():
+            if location < 0:
+                index.pending = -location
+            key = SubmissionIndex.key_of(submission)
+            if key is not None:
+                index.add(key, location)
+                records.append(key + [location])
+        with _submission_index_lock:
+            if _submission_source_signatures() != sources:
+                continue
+            try:
+                _write_submission_index(index, records)
+            except OSError as e:
+                # İndeks bu süreçte yine kullanılır, bir sonraki başlatmada yeniden oluşturulur
+                _log("E", "excel_handler.py:_rebuild_submission_index", "Submission index could not be saved", {"error": str(e)})
+            _submission_index = index
+            _submission_index_stats["rebuilds"] += 1
+            return index
+    return None
+
+def _submission_index_sources_changed(before, new_entries=(), first_row=None, compacted=0):
+    """Uygulama içi bir yazmadan sonra indeksi günceller
+    before: değişen dosyaların yazmadan önceki imzaları; indeksinkilerle uyuşmuyorsa dosyalar dışarıdan
+    değişmiştir ve indeks geçersiz sayılır. new_entries: eklenen (headers, row) kayıtları; first_row verildiyse
+    sheet'e bu satırdan itibaren, verilmediyse günlüğe eklenmişlerdir. compacted: sheet'e aktarılan günlük kaydı sayısı
+    """
+    if not USE_SUBMISSION_INDEX:
+        return
+    current = _submission_source_signatures()
+    with _submission_index_lock:
+        index = _load_submission_index({**current, **before})
+        if index is None:
+            return
+        if any(index.sources.get(name) != signature for name, signature in before.items()):
+            invalidate_submission_index()
+            return
+        records = []
+        if compacted:
+            index.relocate(compacted, first_row)
+            records.append({"compacted": compacted, "first_row": first_row})
+        appended = 0
+        for offset, (headers, row) in enumerate(new_entries):
+            key = SubmissionIndex.key_of(dict(zip(headers, row)))
+            if first_row is None:
+                index.add_journal_entry(key)
+                location = -index.pending
+            elif key is not None:
+                location = first_row + offset
+                index.add(key, location)
+            if key is not None:
+                records.append(key + [location])
+                appended += 1
+        index.sources.update({name: current[name] for name in before})
+        try:
+            if records:
+                with open(SUBMISSIONS_INDEX_FILE, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+                index.lines += len(records)
+            _write_submission_index_meta(index, index.lines)
+        except OSError as e:
+            _log("E", "excel_handler.py:_submission_index_sources_changed", "Submission index could not be saved", {"error": str(e)})
+            invalidate_submission_index()
+            return
+        _submission_index_stats["appended"] += appended
+
+def get_submission_index():
+    """Excel gönderim indeksini döndürür (gerekirse diskten yükler veya yeniden oluşturur), kapalıysa None"""
+    if not USE_SUBMISSION_INDEX:
+        return None
+    with _submission_index_lock:
+        index = _load_submission_index(_submission_source_signatures())
+    if index is None:
+        index = _rebuild_submission_index()
+    return index
+
+def invalidate_submission_index():
+    """İndeksi geçersiz kılar; bir sonraki sorguda yeniden oluşturulur"""
+    global _submission_index
+    with _submission_index_lock:
+        _submission_index = None
+        _submission_index_stats["invalidations"] += 1
+        try:
+            os.remove(SUBMISSIONS_INDEX_META_FILE)
+        except OSError:
+            pass
+
+def _select_indexed_submissions(query):
+    """Sorguyu indeksle çalıştırır ve sayfadaki gönderimleri okur; indeks kullanılamıyorsa None"""
+    index = get_submission_index()
+    if index is None:
+        return None
+    with _compaction_lock:
+        # Konumlar okunurken günlük sheet'e aktarılmasın
+        with _submission_index_lock:
+            row_ids, total = index.select(query)
+            located = [(index.locations[row_id], index.timestamps[row_id]) for row_id in row_ids]
+            _submission_index_stats["queries"] += 1
+        if not row_ids:
+            return SubmissionPage([], total)
+        # Sadece sayfadaki satırlar konumlarından okunur
+        found = _read_located_submissions([location for location, _ in located])
+
+    rows = []
+    for location, timestamp in located:
+        submission = found.get(location)
+        if submission is None or _submission_timestamp_text(submission.get("Timestamp")) != timestamp:
+            # İndeks dosyalarla uyuşmuyor (örn: satırlar elle silinmiş)
+            invalidate_submission_index()
+            return None
+        rows.append(submission)
+    return SubmissionPage(rows, total)
+
+def get_submission_index_stats():
+    """İndeks istatistiklerini döndürür (satır, sürücü, araç ve gün sayıları dahil)"""
+    with _submission_index_lock:
+        stats = dict(_submission_index_stats)
+        index = _submission_index
+        stats["rows"] = len(index.timestamps) if index else None
+        stats["drivers"] = len(index.by_driver) if index else None
+        stats["vehicles"] = len(index.by_vehicle) if index else None
+        stats["days"] = len(index.by_day) if index else None
+    return stats
+
+# Gönderim outbox'ı (kalıcı giden kutusu)
+# save_form_submission gönderimi önce diske (her gönderim ayrı bir JSON dosyası) yazar ve hemen döner.
+# Arka plandaki worker'lar gönderimi Apps Script'e ve aktif backend'e (Sheets/Excel/SQLite) iletir;
+# başarısız hedefler artan bekleme süreleriyle yeniden denenir. Dosya tüm hedefler tamamlanınca silinir.
+USE_SUBMISSION_OUTBOX = str(get_secret("USE_SUBMISSION_OUTBOX", "true")).lower() == "true"
+SUBMISSION_OUTBOX_DIR = os.path.join(CURRENT_DIR, "form_data.outbox")
+try:
+    SUBMISSION_OUTBOX_WORKERS = max(1, int(get_secret("SUBMISSION_OUTBOX_WORKERS", "2")))
+    SUBMISSION_RETRY_BASE_DELAY = float(get_secret("SUBMISSION_RETRY_BASE_DELAY", "2"))
+    SUBMISSION_RETRY_MAX_DELAY = float(get_secret("SUBMISSION_RETRY_MAX_DELAY", "300"))
+except (TypeError, ValueError):
+    SUBMISSION_OUTBOX_WORKERS = 2
+    SUBMISSION_RETRY_BASE_DELAY = 2.0
+    SUBMISSION_RETRY_MAX_DELAY = 300.0
+
+# Hedefler (Apps Script, backend) paralel çalışır; toplam süre en yavaş hedef kadardır.
+# SUBMISSION_SINK_TIMEOUT Apps Script isteğinin zaman aşımıdır; backend yazması her zaman sonuna kadar beklenir
+# (zaman aşımına sayılıp arka planda tamamlanan bir yazma yeniden denenince satır iki kez eklenirdi)
+# Başarı politikası: "primary" = backend kaydı yeterli, "any" = herhangi bir hedef, "all" = tüm hedefler
+SUBMISSION_SUCCESS_POLICY = str(get_secret("SUBMISSION_SUCCESS_POLICY", "primary")).lower()
+if SUBMISSION_SUCCESS_POLICY not in ("primary", "any", "all"):
+    SUBMISSION_SUCCESS_POLICY = "primary"
+PRIMARY_SUBMISSION_SINK = "storage"
+try:
+    SUBMISSION_SINK_TIMEOUT = float(get_secret("SUBMISSION_SINK_TIMEOUT", "15"))
+except (TypeError, ValueError):
+    SUBMISSION_SINK_TIMEOUT = 15.0
+
+_sink_executor_lock = threading.Lock()
+_sink_executor = None
+
+_outbox_condition = threading.Condition()
+_outbox_schedule = []  # heap: (deneme zamanı, gönderim id)
+_outbox_pending = {}  # gönderim id -> oluşturulma zamanı (time.time)
+_outbox_in_flight = set()  # şu an bir worker tarafından iletilen kayıtlar
+_outbox_deferred = {}  # iletilirken vadesi gelen kayıtlar: gönderim id -> deneme zamanı (iletim bitince yeniden planlanır)
+_outbox_workers = []
+_outbox_stats = {"enqueued": 0, "delivered": 0, "attempts": 0, "failures": 0, "recovered": 0,
+                 "last_delivery_lag": None, "max_delivery_lag": 0.0}
+
+def _submission_sinks():
+    """Gönderimin iletileceği hedefler (Apps Script açıksa önce o, sonra aktif backend)"""
+    sinks = []
+    if USE_GOOGLE_APPS_SCRIPT and GOOGLE_APPS_SCRIPT_URL:
+        sinks.append("apps_script")
+    sinks.append("storage")
+    return sinks
+
+def _store_submissions(entries):
+    """Gönderimleri aktif backend'e yazar ve snapshot'ı eskimiş olarak işaretler"""
+    with sheets_priority(SHEETS_PRIORITY_SUBMISSION):
+        get_storage_backend().append_submissions(entries)
+    _mark_submission_snapshot_stale()
+
+def _deliver_to_sink(sink, form_data, headers, row):
+    """Gönderimi tek bir hedefe iletir, başarısızsa hata fırlatır"""
+    if sink == "apps_script":
+        if not save_form_submission_to_google_apps_script(form_data, timeout=SUBMISSION_SINK_TIMEOUT):
+            raise RuntimeError("Google Apps Script delivery failed")
+    elif sink == "storage":
+        _store_submissions([(headers, row)])
+    else:
+        raise ValueError(f"Unknown submission sink: {sink}")
+
+def _get_sink_executor():
+    """Hedeflere paralel iletim için paylaşılan thread havuzu"""
+    global _sink_executor
+    with _sink_executor_lock:
+        if _sink_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _sink_executor = ThreadPoolExecutor(max_workers=2 * SUBMISSION_OUTBOX_WORKERS + 2, thread_name_prefix="submission-sink")
+        return _sink_executor
+
+def _deliver_to_sinks(sinks, form_data, headers, row):
+    """Gönderimi hedeflere paralel iletir, hedef -> hata (başarılıysa None) döndürür
+    Her hedef bitene kadar beklenir; süre sınırı hedefin kendisinde uygulanır (Apps Script: SUBMISSION_SINK_TIMEOUT)
+    """
+    if len(sinks) == 1:
+        try:
+            _deliver_to_sink(sinks[0], form_data, headers, row)
+            return {sinks[0]: None}
+        except Exception as e:
+            return {sinks[0]: e}
+    
+    executor = _get_sink_executor()
+    futures = {sink: executor.submit(_deliver_to_sink, sink, form_data, headers, row) for sink in sinks}
+    results = {}
+    for sink, future in futures.items():
+        try:
+            future.result()
+            results[sink] = None
+        except Exception as e:
+            results[sink] = e
+    return results
+
+def _submission_policy_met(results):
+    """İletim sonuçları SUBMISSION_SUCCESS_POLICY'yi karşılıyor mu"""
+    succeeded = [sink for sink, error in results.items() if error is None]
+    if SUBMISSION_SUCCESS_POLICY == "all":
+        return len(succeeded) == len(results)
+    if SUBMISSION_SUCCESS_POLICY == "any":
+        return bool(succeeded)
+    return PRIMARY_SUBMISSION_SINK not in results or PRIMARY_SUBMISSION_SINK in succeeded
 
-def save_form_submission_to_google_apps_script(form_data):
-    """Form verilerini Google Apps Script'e HTTP POST ile gönderir (eski yöntem - Google Sheets formatına uygun)"""
-    import urllib.request
-    import urllib.parse
-    import json
-    
+def _outbox_path(submission_id):
+    return os.path.join(SUBMISSION_OUTBOX_DIR, submission_id + ".json")
+
+def _write_outbox_entry(entry):
+    """Outbox kaydını atomik olarak diske yazar (geçici dosya + fsync + os.replace)"""
+    path = _outbox_path(entry["id"])
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def _read_outbox_entry(submission_id):
     try:
-        # Form verilerini Google Sheets formatına uygun şekilde düzleştir
-        # Eski HTML formundaki field isimlerini kullan
-        flat_data = {}
-        
-        # Temel alanlar (eski formdaki isimlerle aynı)
-        flat_data["driver_name"] = form_data.get("driver_name", "")
-        
-        # Vehicle - "Other" seçildiyse other_vehicle kullan
-        vehicle = form_data.get("vehicle", "")
-        if vehicle == "Other":
-            flat_data["vehicle"] = "Other"
-            flat_data["other_vehicle"] = form_data.get("other_vehicle", "")
-        else:
-            flat_data["vehicle"] = vehicle
-            flat_data["other_vehicle"] = ""
-        
-        flat_data["odometer_start"] = str(form_data.get("odometer_start", ""))
-        
-        # Fuel level - "Other" seçildiyse other_fuel kullan
-        fuel_level = form_data.get("fuel_level", "")
-        if fuel_level == "Other":
-            flat_data["fuel_level"] = "Other"
-            flat_data["other_fuel"] = form_data.get("other_fuel", "")
-        else:
-            flat_data["fuel_level"] = fuel_level
-            flat_data["other_fuel"] = ""
-        
-        flat_data["oil_level"] = form_data.get("oil_level", "")
-        flat_data["fuel_card"] = form_data.get("fuel_card", "")
-        flat_data["measuring_tape"] = form_data.get("measuring_tape", "")
-        flat_data["safety_vest"] = form_data.get("safety_vest", "")
-        flat_data["fuel_amount"] = form_data.get("fuel_amount", "")
-        flat_data["additional_comments"] = form_data.get("additional_comments", "")
-        
-        # Dosya yüklemeleri (şimdilik boş, gelecekte eklenebilir)
-        flat_data["odometer_file"] = ""
-        flat_data["fuel_receipt"] = ""
-        
-        # Exterior checks - direkt field isimleri (prefix olmadan)
-        exterior_checks = form_data.get("exterior_checks", {})
-        exterior_fields = ['headlights', 'break_lights', 'indicators', 'mirrors', 'windows', 
-                          'windshield', 'wiper_fluid', 'wipers', 'tires', 'body_paint']
-        for field in exterior_fields:
-            flat_data[field] = exterior_checks.get(field, "Needs Attention")
-        
-        # Engine checks - direkt field isimleri
-        engine_checks = form_data.get("engine_checks", {})
-        engine_fields = ['engine_noise', 'coolant_level', 'brake_fluid', 'battery_condition', 'belts_hoses']
-        for field in engine_fields:
-            flat_data[field] = engine_checks.get(field, "Needs Attention")
-        
-        # Safety equipment - direkt field isimleri
-        safety_checks = form_data.get("safety_checks", {})
-        safety_fields = ['seatbelts', 'fire_extinguisher', 'first_aid_kit', 'horn', 'jumper_cables', 'snow_brush']
-        for field in safety_fields:
-            flat_data[field] = safety_checks.get(field, "Needs Attention")
-        
-        # Interior checks - direkt field isimleri
-        interior_checks = form_data.get("interior_checks", {})
-        interior_fields = ['cleanliness', 'dashboard_lights', 'hvac', 'seats']
-        for field in interior_fields:
-            flat_data[field] = interior_checks.get(field, "Needs Attention")
-        
-        # HTTP POST isteği gönder (multipart/form-data yerine application/x-www-form-urlencoded)
-        data = urllib.parse.urlencode(flat_data).encode('utf-8')
-        req = urllib.request.Request(GOOGLE_APPS_SCRIPT_URL, data=data, method='POST')
-        req.add_header('Content-Type', 'application/x-www-form-urlencoded')
-        
-        with urllib.request.urlopen(req, timeout=10) as response:
-            result = response.read().decode('utf-8')
-            # #region agent log
-            _log("F", "excel_handler.py:save_form_submission_to_google_apps_script", "Google Apps Script response", {"status_code": response.status, "result": result[:100]})
-            # #endregion agent log
-            return True
-    except Exception as e:
-        # #region agent log
-        _log("F", "excel_handler.py:save_form_submission_to_google_apps_script", "Google Apps Script error", {"error": str(e)})
-        # #endregion agent log
-        return False
+        with open(_outbox_path(submission_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _schedule_outbox_entry(submission_id, due):
+    import heapq
+    with _outbox_condition:
+        heapq.heappush(_outbox_schedule, (due, submission_id))
+        _outbox_condition.notify()
+
+def _enqueue_submission(form_data, headers, row, sinks=None):
+    """Gönderimi outbox'a kalıcı olarak yazar ve iletim için sıraya koyar (sinks: varsayılan tüm hedefler)"""
+    import uuid
+    os.makedirs(SUBMISSION_OUTBOX_DIR, exist_ok=True)
+    now = time.time()
+    # Dosya adı oluşturulma sırasına göre sıralanır (yeniden başlatmada aynı sırayla iletilir)
+    submission_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+    entry = {
+        "id": submission_id,
+        "created_at": now,
+        "form_data": form_data,
+        "headers": headers,
+        "row": row,
+        "pending_sinks": list(sinks or _submission_sinks()),
+        "attempts": 0,
+        "next_attempt_at": now,
+        "last_error": None,
+    }
+    _write_outbox_entry(entry)
+    with _outbox_condition:
+        _outbox_pending[submission_id] = now
+        _outbox_stats["enqueued"] += 1
+    _ensure_outbox_workers()
+    _schedule_outbox_entry(submission_id, now)
+    return submission_id
+
+def _retry_delay(attempts):
+    """Üstel bekleme süresi (jitter ile), SUBMISSION_RETRY_MAX_DELAY ile sınırlı"""
+    import random
+    delay = min(SUBMISSION_RETRY_BASE_DELAY * (2 ** (attempts - 1)), SUBMISSION_RETRY_MAX_DELAY)
+    return delay * random.uniform(0.5, 1.0)
+
+def _deliver_outbox_entry(submission_id):
+    """Outbox kaydının bekleyen hedeflerini dener; tamamlanınca dosyayı siler, yoksa yeniden planlar"""
+    entry = _read_outbox_entry(submission_id)
+    if entry is None:
+        with _outbox_condition:
+            _outbox_pending.pop(submission_id, None)
+        return
+
+    # Politika ne olursa olsun başarısız hedefler yeniden denenir; gönderim kullanıcıya zaten onaylandı
+    results = _deliver_to_sinks(entry["pending_sinks"], entry["form_data"], entry["headers"], entry["row"])
+    with _outbox_condition:
+        _outbox_stats["attempts"] += len(results)
+    errors = [f"{sink}: {error}" for sink, error in results.items() if error is not None]
+    entry["pending_sinks"] = [sink for sink in entry["pending_sinks"] if results[sink] is not None]
+
+    if not entry["pending_sinks"]:
+        os.remove(_outbox_path(submission_id))
+        lag = time.time() - entry["created_at"]
+        with _outbox_condition:
+            _outbox_pending.pop(submission_id, None)
+            _outbox_stats["delivered"] += 1
+            _outbox_stats["last_delivery_lag"] = lag
+            _outbox_stats["max_delivery_lag"] = max(_outbox_stats["max_delivery_lag"], lag)
+        return
+
+    entry["attempts"] += 1
+    entry["last_error"] = "; ".join(errors)
+    entry["next_attempt_at"] = time.time() + _retry_delay(entry["attempts"])
+    _write_outbox_entry(entry)
+    with _outbox_condition:
+        _outbox_stats["failures"] += 1
+    _log("E", "excel_handler.py:_deliver_outbox_entry", "Submission delivery failed, will retry", {"id": submission_id, "attempts": entry["attempts"], "error": entry["last_error"]})
+    _schedule_outbox_entry(submission_id, entry["next_attempt_at"])
+
+def _outbox_worker_loop():
+    import heapq
+    while True:
+        with _outbox_condition:
+            while True:
+                now = time.time()
+                if _outbox_schedule and _outbox_schedule[0][0] <= now:
+                    due, submission_id = heapq.heappop(_outbox_schedule)
+                    if submission_id in _outbox_in_flight:
+                        # Başka bir worker hâlâ iletiyor; o bitince yeniden planlanır
+                        _outbox_deferred[submission_id] = min(due, _outbox_deferred.get(submission_id, due))
+                        continue
+                    _outbox_in_flight.add(submission_id)
+                    break
+                timeout = _outbox_schedule[0][0] - now if _outbox_schedule else None
+                _outbox_condition.wait(timeout)
+        try:
+            _deliver_outbox_entry(submission_id)
+        except Exception as e:
+            # Outbox dosyası okunamadı/yazılamadı; kayıt yerinde kaldığı için bir süre sonra tekrar denenir
+            _log("E", "excel_handler.py:_outbox_worker_loop", "Outbox entry could not be processed", {"id": submission_id, "error": str(e)})
+            _schedule_outbox_entry(submission_id, time.time() + SUBMISSION_RETRY_MAX_DELAY)
+        finally:
+            with _outbox_condition:
+                _outbox_in_flight.discard(submission_id)
+                due = _outbox_deferred.pop(submission_id, None)
+                if due is not None:
+                    heapq.heappush(_outbox_schedule, (due, submission_id))
+                    _outbox_condition.notify()
+
+def _recover_outbox_entries():
+    """Önceki çalışmadan kalan outbox kayıtlarını sıraya koyar (worker'lar ilk başlatılırken bir kez)"""
+    if not os.path.isdir(SUBMISSION_OUTBOX_DIR):
+        return
+    for file_name in sorted(os.listdir(SUBMISSION_OUTBOX_DIR)):
+        if not file_name.endswith(".json"):
+            continue
+        submission_id = file_name[:-len(".json")]
+        try:
+            entry = _read_outbox_entry(submission_id)
+        except ValueError:
+            _log("E", "excel_handler.py:_recover_outbox_entries", "Skipping corrupt outbox entry", {"file": file_name})
+            continue
+        if entry is None:
+            continue
+        with _outbox_condition:
+            # Bu süreçte zaten sıraya konmuş kayıtlar atlanır
+            if submission_id in _outbox_pending:
+                continue
+            _outbox_pending[submission_id] = entry["created_at"]
+            _outbox_stats["recovered"] += 1
+        # Yeniden başlatmada bekleme süresi beklenmez
+        _schedule_outbox_entry(submission_id, time.time())
+
+def _ensure_outbox_workers():
+    """Outbox worker'larını (yoksa) başlatır; ilk başlatmada kalan kayıtları kurtarır"""
+    with _outbox_condition:
+        if _outbox_workers and all(worker.is_alive() for worker in _outbox_workers):
+            return
+        first_start = not _outbox_workers
+        _outbox_workers[:] = [worker for worker in _outbox_workers if worker.is_alive()]
+        while len(_outbox_workers) < SUBMISSION_OUTBOX_WORKERS:
+            worker = threading.Thread(target=_outbox_worker_loop, name=f"submission-outbox-{len(_outbox_workers) + 1}", daemon=True)
+            worker.start()
+            _outbox_workers.append(worker)
+    if first_start:
+        _recover_outbox_entries()
+
+def flush_submission_outbox(timeout=30.0):
+    """Outbox boşalana kadar (veya timeout dolana kadar) bekler, bekleyen kayıt kalmadıysa True döndürür"""
+    import heapq
+    _ensure_outbox_workers()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with _outbox_condition:
+            if not _outbox_pending:
+                return True
+            # Bekleyen yeniden denemeleri öne çek
+            _outbox_schedule[:] = [(0, submission_id) for _, submission_id in _outbox_schedule]
+            heapq.heapify(_outbox_schedule)
+            _outbox_condition.notify_all()
+        time.sleep(0.05)
+    with _outbox_condition:
+        return not _outbox_pending
+
+def get_submission_outbox_stats():
+    """Outbox derinliğini, en eski bekleyen gönderimin yaşını ve iletim gecikmelerini döndürür"""
+    if USE_SUBMISSION_OUTBOX:
+        _ensure_outbox_workers()
+    with _outbox_condition:
+        stats = dict(_outbox_stats)
+        stats["depth"] = len(_outbox_pending)
+        stats["oldest_pending_age"] = time.time() - min(_outbox_pending.values()) if _outbox_pending else 0.0
+        stats["workers"] = sum(1 for worker in _outbox_workers if worker.is_alive())
+    return stats
+
+def load_form_submissions():
+    """Form gönderimlerini aktif backend'den okur"""
+    if USE_SUBMISSION_OUTBOX:
+        # Önceki çalışmadan iletilmemiş gönderim kaldıysa iletim başlasın
+        _ensure_outbox_workers()
+    return get_storage_backend().load_submissions()
+
+def query_submissions(driver=None, vehicle=None, date_from=None, date_to=None, order="newest", limit=None, offset=0):
+    """Filtrelenmiş ve sayfalanmış form gönderimleri (SubmissionPage: rows, total)
+    Filtreleme backend'de yapılır (SQLite'ta SQL ile); sadece istenen sayfa döndürülür
+    """
+    if USE_SUBMISSION_OUTBOX:
+        _ensure_outbox_workers()
+    query = _submission_query(driver, vehicle, date_from, date_to, order=order, limit=limit, offset=offset)
+    return get_storage_backend().query_submissions(query)
+
+def _submission_query(driver=None, vehicle=None, date_from=None, date_to=None, order="newest", limit=None, offset=0):
+    """Public fonksiyon parametrelerinden SubmissionQuery oluşturur (tarihler date veya "YYYY-MM-DD")"""
+    return SubmissionQuery(
+        driver=driver or None,
+        vehicle=vehicle or None,
+        date_from=date_from.isoformat() if hasattr(date_from, "isoformat") else date_from or None,
+        date_to=date_to.isoformat() if hasattr(date_to, "isoformat") else date_to or None,
+        order=order,
+        limit=limit,
+        offset=max(0, int(offset or 0)),
+    )
+
+def list_submission_values(column):
+    """Gönderimlerdeki farklı sürücü/araç değerleri (filtre seçenekleri için)"""
+    return get_storage_backend().list_submission_values(column)
 
-def save_form_submission(form_data):
-    """Form verilerini Excel dosyasına veya Google Sheets'e kaydeder"""
+# Gönderimleri dışa aktarma (CSV/XLSX)
+# Satırlar backend'den tek tek okunup doğrudan dosyaya yazılır; DataFrame veya tüm CSV metni bellekte
+# oluşturulmaz. XLSX openpyxl'in write-only modunda yazılır.
+try:
+    SUBMISSION_EXPORT_CHUNK_ROWS = max(1, int(get_secret("SUBMISSION_EXPORT_CHUNK_ROWS", "1000")))
+except (TypeError, ValueError):
+    SUBMISSION_EXPORT_CHUNK_ROWS = 1000
+SUBMISSION_EXPORT_FORMATS = {"csv": "text/csv", "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"}
+
+def _export_value(value):
     from datetime import datetime
-    from openpyxl import Workbook
-    
-    headers, row = _prepare_submission_row(form_data)
-    
-    # Google Apps Script kullanılıyorsa (eski yöntem - öncelikli)
-    if USE_GOOGLE_APPS_SCRIPT and GOOGLE_APPS_SCRIPT_URL:
-        success = save_form_submission_to_google_apps_script(form_data)
-        if success:
-            # #region agent log
-            _log("F", "excel_handler.py:save_form_submission", "Saved to Google Apps Script successfully", {})
-            # #endregion agent log
-            # Yerel Excel'e de kaydet (backup)
-            pass  # Fall through to Excel save
-    
-    # Google Sheets kullanılıyorsa (yeni yöntem)
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
-            try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Submissions")
-                # Başlık satırını kontrol et
-                existing_headers = sheet.row_values(1)
-                if not existing_headers or len(existing_headers) < len(headers):
-                    sheet.clear()
-                    sheet.append_row(headers)
-                # Yeni satır ekle
-                sheet.append_row(row)
-                return
-            except Exception as e:
-                # #region agent log
-                _log("E", "excel_handler.py:save_form_submission:google_sheets", "Google Sheets save failed, falling back to Excel", {"error": str(e)})
-                # #endregion agent log
-                pass  # Fallback to Excel
-    
-    # Excel dosyasına kaydet (form_data.xlsx içindeki Submissions sheet'ine)
-    wb = get_excel_file()
-    
-    # Submissions sheet'i yoksa oluştur
-    if "Submissions" not in wb.sheetnames:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+def export_submissions(target, export_format="csv", driver=None, vehicle=None, date_from=None, date_to=None):
+    """Filtreye uyan gönderimleri target dosyasına (yol) satır satır yazar, yazılan satır sayısını döndürür
+    export_format: "csv" (Excel'de Türkçe karakterler için utf-8-sig) veya "xlsx"
+    """
+    import csv
+    if export_format not in SUBMISSION_EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    query = _submission_query(driver, vehicle, date_from, date_to, order="oldest")
+    backend = get_storage_backend()
+    headers = backend.submission_headers(query)
+    rows = ([_export_value(submission.get(header)) for header in headers] for submission in backend.iter_submissions(query))
+    count = 0
+    if export_format == "csv":
+        with open(target, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+    else:
+        wb = Workbook(write_only=True)
         ws = wb.create_sheet("Submissions")
         ws.append(headers)
+        for row in rows:
+            ws.append(row)
+            count += 1
+        wb.save(target)
+    return count
+
+# Gönderim snapshot'ı (kolon bazlı, admin panelindeki Summary raporu ve diğer analizler için)
+# Tüm gönderimler tipli bir DataFrame'e çevrilir (Timestamp datetime, Odometer tam sayı, kontrol sonuçları
+# kategorik) ve diske yazılır: pyarrow varsa Parquet (memory-map ile okunur), yoksa pandas pickle.
+# Snapshot SUBMISSION_SNAPSHOT_TTL dolunca veya bu süreçte yeni gönderim kaydedilince yeniden oluşturulur.
+import importlib.util
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None  # pandas Parquet motoru; modül burada kullanılmaz
+
+USE_SUBMISSION_SNAPSHOT = str(get_secret("USE_SUBMISSION_SNAPSHOT", "true")).lower() == "true"
+SUBMISSION_SNAPSHOT_FILE = os.path.join(CURRENT_DIR, "form_data.submissions.parquet" if HAS_PYARROW else "form_data.submissions.pkl")
+try:
+    SUBMISSION_SNAPSHOT_TTL = float(get_secret("SUBMISSION_SNAPSHOT_TTL", "300"))
+except (TypeError, ValueError):
+    SUBMISSION_SNAPSHOT_TTL = 300.0
+# Az sayıda farklı değer alan kolonlar (kontrol kolonlarına ek olarak kategorik saklanır)
+SUBMISSION_CATEGORY_COLUMNS = ["Driver Name", "Vehicle", "Fuel Level", "Oil Level", "Fuel Card", "Measuring Tape", "Safety Vest"]
+
+_snapshot_lock = threading.Lock()  # snapshot oluşturma (aynı anda tek oluşturma)
+_snapshot_version_lock = threading.Lock()
+_snapshot_frame = None
+_snapshot_built_at = 0.0
+_snapshot_version = None
+_submission_write_version = 0  # bu süreçte kaydedilen gönderimlerle artar
+_snapshot_stats = {"builds": 0, "file_loads": 0, "hits": 0, "last_build_seconds": None, "rows": 0}
+
+def _mark_submission_snapshot_stale():
+    global _submission_write_version
+    with _snapshot_version_lock:
+        _submission_write_version += 1
+
+def _text_column(series):
+    """Boş olmayan değerleri metne çevirir (Excel'den gelen sayı/metin karışık kolonlar için)"""
+    return series.where(series.isna(), series.astype(str))
+
+def typed_submissions_frame(submissions):
+    """Gönderim dict'lerini tipli DataFrame'e çevirir"""
+    import pandas as pd
+    df = pd.DataFrame(submissions)
+    # Başlığı boş (None) kolonlar Excel'deki boş hücrelerden gelir
+    df = df[[column for column in df.columns if column is not None]]
+    check_prefixes = tuple(f"{prefix}_" for _, prefix, _ in CHECK_CATEGORIES)
+    for column in df.columns:
+        values = df[column]
+        if column == "Timestamp":
+            df[column] = pd.to_datetime(_text_column(values), errors="coerce")
+        elif column == "Odometer Start":
+            values = values.mask(values == "")
+            numeric = pd.to_numeric(values, errors="coerce")
+            # Sayıya çevrilemeyen değer varsa kolon metin kalır (veri kaybolmasın)
+            if numeric.notna().sum() == values.notna().sum() and (numeric.dropna() % 1 == 0).all():
+                df[column] = numeric.astype("Int64")
+            else:
+                df[column] = _text_column(values)
+        elif column in SUBMISSION_CATEGORY_COLUMNS or str(column).startswith(check_prefixes):
+            df[column] = _text_column(values).astype("category")
+        elif values.dtype == object:
+            df[column] = _text_column(values)
+    return df
+
+def _write_submission_snapshot(df):
+    temp_path = SUBMISSION_SNAPSHOT_FILE + ".tmp"
+    if HAS_PYARROW:
+        df.to_parquet(temp_path, index=False)
     else:
-        ws = wb["Submissions"]
-        # Başlık satırı yoksa ekle
-        if ws.max_row == 0 or not any(ws.cell(row=1, column=col).value for col in range(1, len(headers) + 1)):
-            ws.append(headers)
-    
-    ws.append(row)
-    wb.save(EXCEL_FILE)
+        df.to_pickle(temp_path)
+    os.replace(temp_path, SUBMISSION_SNAPSHOT_FILE)
 
-def load_form_submissions():
-    """Form gönderimlerini Excel'den veya Google Sheets'ten okur"""
-    # Google Sheets kullanılıyorsa
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
+def _read_submission_snapshot(max_age):
+    """Diskteki snapshot yeterince yeniyse (DataFrame, oluşturulma zamanı) döndürür, yoksa (None, None)"""
+    import pandas as pd
+    try:
+        built_at = os.path.getmtime(SUBMISSION_SNAPSHOT_FILE)
+    except OSError:
+        return None, None
+    if time.time() - built_at > max_age:
+        return None, None
+    try:
+        if HAS_PYARROW:
+            return pd.read_parquet(SUBMISSION_SNAPSHOT_FILE, memory_map=True), built_at
+        return pd.read_pickle(SUBMISSION_SNAPSHOT_FILE), built_at
+    except Exception as e:
+        _log("E", "excel_handler.py:_read_submission_snapshot", "Snapshot could not be read", {"error": str(e)})
+        return None, None
+
+def load_submissions_snapshot(max_age=None):
+    """Tüm gönderimlerin tipli DataFrame'i (paylaşılan nesne, değiştirilmemelidir)
+    max_age: kabul edilen en eski snapshot yaşı (saniye), verilmezse SUBMISSION_SNAPSHOT_TTL
+    """
+    global _snapshot_frame, _snapshot_built_at, _snapshot_version
+    if not USE_SUBMISSION_SNAPSHOT:
+        return typed_submissions_frame(load_form_submissions())
+    max_age = SUBMISSION_SNAPSHOT_TTL if max_age is None else max_age
+    with _snapshot_lock:
+        with _snapshot_version_lock:
+            version = _submission_write_version
+        if _snapshot_frame is not None and _snapshot_version == version and time.time() - _snapshot_built_at <= max_age:
+            _snapshot_stats["hits"] += 1
+            return _snapshot_frame
+
+        df = None
+        if _snapshot_frame is None and version == 0:
+            # Süreç yeni başladı: önceki çalışmanın snapshot'ı yeterince yeniyse yeniden oluşturulmaz
+            df, built_at = _read_submission_snapshot(max_age)
+            if df is not None:
+                _snapshot_stats["file_loads"] += 1
+        if df is None:
+            started = time.time()
+            df = typed_submissions_frame(load_form_submissions())
+            built_at = time.time()
             try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Submissions")
-                all_values = sheet.get_all_values()
-                
-                if not all_values or len(all_values) < 2:
-                    return []
-                
-                headers = all_values[0]
-                submissions = []
-                
-                for row in all_values[1:]:
-                    if row and row[0]:  # Timestamp varsa
-                        submission = {}
-                        for i, header in enumerate(headers):
-                            submission[header] = row[i] if i < len(row) else None
-                        submissions.append(submission)
-                
-                return submissions
+                _write_submission_snapshot(df)
             except Exception as e:
-                # #region agent log
-                _log("E", "excel_handler.py:load_form_submissions:google_sheets", "Google Sheets load failed, falling back to Excel", {"error": str(e)})
-                # #endregion agent log
-                pass  # Fallback to Excel
-    
-    # Excel dosyasından oku (form_data.xlsx içindeki Submissions sheet'inden)
-    wb = get_excel_file()
-    if "Submissions" not in wb.sheetnames:
-        return []
-    
-    ws = wb["Submissions"]
-    submissions = []
-    
-    # Başlık satırını oku
-    headers = []
-    for cell in ws[1]:
-        headers.append(cell.value)
-    
-    # Veri satırlarını oku
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if row[0]:  # Timestamp varsa
-            submission = {}
-            for i, header in enumerate(headers):
-                submission[header] = row[i] if i < len(row) else None
-            submissions.append(submission)
-    
-    return submissions
+                # Bellekteki snapshot yine kullanılır
+                _log("E", "excel_handler.py:load_submissions_snapshot", "Snapshot could not be saved", {"error": str(e)})
+            _snapshot_stats["builds"] += 1
+            _snapshot_stats["last_build_seconds"] = built_at - started
+        _snapshot_frame, _snapshot_built_at, _snapshot_version = df, built_at, version
+        _snapshot_stats["rows"] = len(df)
+        return df
+
+def query_submissions_snapshot(driver=None, vehicle=None, date_from=None, date_to=None, order="newest"):
+    """query_submissions filtrelerini snapshot üzerinde uygular (raporlar için DataFrame)"""
+    import pandas as pd
+    df = load_submissions_snapshot()
+    if len(df) == 0:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if driver and "Driver Name" in df.columns:
+        mask &= df["Driver Name"] == driver
+    if vehicle and "Vehicle" in df.columns:
+        mask &= df["Vehicle"] == vehicle
+    if (date_from or date_to) and "Timestamp" in df.columns:
+        days = df["Timestamp"].dt.strftime("%Y-%m-%d")
+        if date_from:
+            mask &= days >= str(date_from)
+        if date_to:
+            mask &= days <= str(date_to)
+    result = df[mask]
+    if "Timestamp" in result.columns:
+        result = result.sort_values("Timestamp", ascending=order == "oldest", kind="stable")
+    return result
+
+def get_submission_snapshot_stats():
+    """Snapshot istatistiklerini döndürür (yaş ve format dahil)"""
+    with _snapshot_lock:
+        stats = dict(_snapshot_stats)
+        stats["age"] = time.time() - _snapshot_built_at if _snapshot_frame is not None else None
+    stats["format"] = "parquet" if HAS_PYARROW else "pickle"
+    return stats
+
+def _sheet_row_submission(headers, row):
+    """Submissions satırını dict'e çevirir; Timestamp kolonu boşsa None"""
+    if not (row and row[0]):
+        return None
+    return {header: row[i] if i < len(row) else None for i, header in enumerate(headers)}
+
+def _pending_journal_entries():
+    """Sheet'e henüz aktarılmamış günlük kayıtları (aktarılmakta olanlar önce), _compaction_lock altında çağrılmalı"""
+    pending = _read_journal_entries(SUBMISSIONS_COMPACTING_FILE)
+    with _journal_lock:
+        pending += _read_journal_entries(SUBMISSIONS_JOURNAL_FILE)
+    return pending
+
+def _iter_located_excel_submissions():
+    """iter_excel_submissions ile aynı sırada (konum, gönderim) üretir
+    Konum: Submissions sheet'indeki satır numarası, günlükteki gönderimler için -(günlük sırası + 1)
+    """
+    # Okuma süresince compaction beklesin; aksi halde aynı satır iki kez görülebilir
+    with _compaction_lock:
+        rows = iter_excel_rows("Submissions")
+        
+        # Başlık satırını oku
+        headers = list(next(rows, ()))
+        
+        # Veri satırlarını oku
+        for row_number, row in enumerate(rows, start=2):
+            submission = _sheet_row_submission(headers, row)
+            if submission is not None:
+                yield row_number, submission
+        
+        # Günlükte bekleyen gönderimler
+        pending = _pending_journal_entries()
+        for position, (entry_headers, row) in enumerate(pending):
+            yield -(position + 1), dict(zip(entry_headers, row))
+    
+    # Önceki çalışmadan kalan satırlar varsa aktarılsın
+    if pending:
+        _ensure_submission_compactor()
+
+def iter_excel_submissions():
+    """Excel Submissions sheet'indeki ve henüz aktarılmamış günlükteki gönderimleri dict olarak tek tek üretir"""
+    submissions = _iter_located_excel_submissions()
+    try:
+        for _location, submission in submissions:
+            yield submission
+    finally:
+        submissions.close()
+
+_submission_sheet_shape = None  # (dosya imzası, başlıklar, son satır): bellekteki Submissions sheet'i için
+
+def _read_submission_sheet_rows(row_numbers):
+    """Submissions sheet'inin verilen satırlarını okur, satır numarası -> gönderim döndürür
+    Bellekteki workbook'ta satırlara doğrudan erişilir; bellekte tutulamayan dosyalar read-only açılır
+    ve sadece istenen satır aralığı okunur
+    """
+    global _submission_sheet_shape
+    found = {}
+    with _workbook_lock:
+        signature = _excel_file_signature()
+        stream = _should_stream_excel(signature)
+        if not stream:
+            wb = get_excel_file()
+            if "Submissions" not in wb.sheetnames:
+                return found
+            ws = wb["Submissions"]
+            # Başlıklar ve son satır dosya her değiştiğinde bir kez hesaplanır (ws.max_row tüm hücreleri dolaşır)
+            if _submission_sheet_shape is None or _submission_sheet_shape[0] != signature:
+                headers = [cell.value for cell in ws[1]] if ws.max_row >= 1 else []
+                _submission_sheet_shape = (signature, headers, ws.max_row)
+            _, headers, last_row = _submission_sheet_shape
+            for row_number in row_numbers:
+                # Var olmayan satıra erişmek boş hücreler oluşturur
+                if 2 <= row_number <= last_row and headers:
+                    row = next(ws.iter_rows(min_row=row_number, max_row=row_number, max_col=len(headers), values_only=True))
+                    submission = _sheet_row_submission(headers, row)
+                    if submission is not None:
+                        found[row_number] = submission
+            return found
+        _workbook_stats["streamed_reads"] += 1
+    
+    wanted = set(row_numbers)
+    wb = load_workbook(EXCEL_FILE, read_only=True, data_only=True)
+    try:
+        if "Submissions" not in wb.sheetnames:
+            return found
+        ws = wb["Submissions"]
+        headers = list(next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ()))
+        first_row = max(2, min(wanted))
+        for row_number, row in enumerate(ws.iter_rows(min_row=first_row, max_row=max(wanted), values_only=True), start=first_row):
+            if row_number in wanted:
+                submission = _sheet_row_submission(headers, row)
+                if submission is not None:
+                    found[row_number] = submission
+    finally:
+        wb.close()
+    return found
+
+def _read_located_submissions(locations):
+    """Konumları verilen gönderimleri okur, konum -> gönderim döndürür (bulunamayanlar yer almaz)
+    _compaction_lock altında çağrılmalı; günlükten sadece bekleyen kayıtlar okunur
+    """
+    sheet_rows = sorted(location for location in locations if location > 0)
+    found = _read_submission_sheet_rows(sheet_rows) if sheet_rows else {}
+    if any(location < 0 for location in locations):
+        pending = _pending_journal_entries()
+        for location in locations:
+            if location < 0 and -location <= len(pending):
+                entry_headers, row = pending[-location - 1]
+                found[location] = dict(zip(entry_headers, row))
+    return found
 
 def is_admin(username):
     """Kullanıcının admin olup olmadığını kontrol eder"""
     _log("B", "excel_handler.py:is_admin:entry", "is_admin called", {"username": username})
-    
-    # Google Sheets'ten oku
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
-            try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Users")
-                all_values = sheet.get_all_values()
-                
-                if not all_values or len(all_values) < 2:
-                    return False
-                
-                headers = all_values[0]
-                _log("B", "excel_handler.py:is_admin:headers", "Users sheet headers", {"headers": headers, "has_admin": "Admin" in headers})
-                
-                admin_col_idx = None
-                if "Admin" in headers:
-                    admin_col_idx = headers.index("Admin")
-                elif len(headers) > 3:
-                    admin_col_idx = 3
-                
-                for row in all_values[1:]:
-                    if row and row[0] == username:
-                        if admin_col_idx and len(row) > admin_col_idx:
-                            admin_value = row[admin_col_idx]
-                            is_admin_result = admin_value == "Yes" or admin_value == True
-                            _log("B", "excel_handler.py:is_admin:admin_check", "Admin value check", {"admin_value": admin_value, "is_admin": is_admin_result})
-                            return is_admin_result
-                        if username == "admin":
-                            return True
-                
-                _log("B", "excel_handler.py:is_admin:user_not_found", "User not found or not admin", {"username": username})
-                return False
-            except Exception as e:
-                _log("E", "excel_handler.py:is_admin:google_sheets", "Google Sheets load failed, falling back to Excel", {"error": str(e)})
-    
-    # Excel'den oku (fallback)
-    wb = get_excel_file()
-    ws = wb["Users"]
-    
-    headers = [cell.value for cell in ws[1]]
-    _log("B", "excel_handler.py:is_admin:headers", "Users sheet headers", {"headers": headers, "has_admin": "Admin" in headers})
-    admin_col_idx = None
-    
-    if "Admin" in headers:
-        admin_col_idx = headers.index("Admin")
-        _log("B", "excel_handler.py:is_admin:admin_col_found", "Admin column found", {"admin_col_idx": admin_col_idx})
-    elif len(headers) > 3:
-        admin_col_idx = 3
-        _log("B", "excel_handler.py:is_admin:admin_col_assumed", "Assuming admin column at index 3", {"admin_col_idx": admin_col_idx})
-    
-    user_found = False
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        _log("B", "excel_handler.py:is_admin:checking_row", "Checking row", {"row_username": row[0] if row else None, "matches": row[0] == username if row else False})
-        if row[0] == username:
-            user_found = True
-            _log("B", "excel_handler.py:is_admin:user_found", "User found in sheet", {"username": username, "row_length": len(row), "admin_col_idx": admin_col_idx})
-            if admin_col_idx and len(row) > admin_col_idx:
-                admin_value = row[admin_col_idx]
-                is_admin_result = admin_value == "Yes" or admin_value == True
-                _log("B", "excel_handler.py:is_admin:admin_check", "Admin value check", {"admin_value": admin_value, "is_admin": is_admin_result})
-                return is_admin_result
-            if username == "admin":
-                _log("B", "excel_handler.py:is_admin:fallback", "Using fallback admin check", {"username": username, "is_admin": True})
-                return True
-    
-    _log("B", "excel_handler.py:is_admin:user_not_found", "User not found or not admin", {"username": username, "user_found": user_found})
-    return False
+    return get_user_directory().is_admin(username)
 
 # Şifre sıfırlama kodları için geçici dosya
 RESET_CODES_FILE = os.path.join(TEMP_DIR, "reset_codes.json")
 
 def get_user_by_email(email):
     """E-posta adresine göre kullanıcı bilgilerini döndürür"""
-    users = load_users()
-    for username, user_data in users.items():
-        if user_data.get("email", "").lower() == email.lower():
-            return username, user_data
-    return None, None
+    record = get_user_directory().find_by_email(email)
+    if record is None:
+        return None, None
+    return record.username, record.as_dict()
 
 def verify_user_email(username, email):
     """Kullanıcı adı ve e-posta kombinasyonunu doğrular"""
-    users = load_users()
-    user_data = users.get(username)
-    if user_data and user_data.get("email", "").lower() == email.lower():
-        return True, user_data
+    record = get_user_directory().get(username)
+    if record and record.email.lower() == email.lower():
+        return True, record.as_dict()
     return False, None
 
 def generate_reset_code():
@@ -1297,50 +3864,7 @@ Araç Kontrol Formu Ekibi
 
 def update_user_password(username, new_password):
     """Kullanıcı şifresini günceller"""
-    # Google Sheets kullanılıyorsa
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
-            try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Users")
-                all_values = sheet.get_all_values()
-                
-                if not all_values or len(all_values) < 2:
-                    return False
-                
-                headers = all_values[0]
-                password_col_idx = headers.index("Password") if "Password" in headers else 1
-                
-                # Kullanıcıyı bul ve şifresini güncelle
-                for i, row in enumerate(all_values[1:], start=2):
-                    if row and row[0] == username:
-                        sheet.update_cell(i, password_col_idx + 1, new_password)
-                        return True
-                
-                return False
-            except Exception as e:
-                _log("E", "excel_handler.py:update_user_password:google_sheets", "Failed to update password in Google Sheets", {"error": str(e)})
-                return False
-    
-    # Excel'den güncelle
-    try:
-        wb = get_excel_file()
-        ws = wb["Users"]
-        
-        headers = [cell.value for cell in ws[1]]
-        password_col_idx = headers.index("Password") if "Password" in headers else 1
-        
-        # Kullanıcıyı bul ve şifresini güncelle
-        for row_idx in range(2, ws.max_row + 1):
-            if ws.cell(row=row_idx, column=1).value == username:
-                ws.cell(row=row_idx, column=password_col_idx + 1, value=new_password)
-                wb.save(EXCEL_FILE)
-                return True
-        
-        return False
-    except Exception as e:
-        _log("E", "excel_handler.py:update_user_password", "Failed to update password", {"error": str(e)})
-        return False
+    return update_user(username, password=new_password)
 
 def delete_reset_code(code):
     """Kullanılan şifre sıfırlama kodunu siler"""
@@ -1362,48 +3886,4 @@ def delete_reset_code(code):
 
 def update_user_email(username, email):
     """Kullanıcının e-posta adresini günceller"""
-    # Google Sheets kullanılıyorsa
-    if USE_GOOGLE_SHEETS:
-        client = get_google_sheets_client()
-        if client:
-            try:
-                sheet = client.open_by_key(GOOGLE_SHEET_ID).worksheet("Users")
-                all_values = sheet.get_all_values()
-                
-                if not all_values or len(all_values) < 2:
-                    return False
-                
-                headers = all_values[0]
-                email_col_idx = headers.index("Email") if "Email" in headers else 3
-                
-                # Kullanıcıyı bul ve e-postasını güncelle
-                for i, row in enumerate(all_values[1:], start=2):
-                    if row and row[0] == username:
-                        sheet.update_cell(i, email_col_idx + 1, email)
-                        return True
-                
-                return False
-            except Exception as e:
-                _log("E", "excel_handler.py:update_user_email:google_sheets", "Failed to update email in Google Sheets", {"error": str(e)})
-                return False
-    
-    # Excel'den güncelle
-    try:
-        wb = get_excel_file()
-        ws = wb["Users"]
-        
-        headers = [cell.value for cell in ws[1]]
-        email_col_idx = headers.index("Email") if "Email" in headers else 3
-        
-        # Kullanıcıyı bul ve e-postasını güncelle
-        for row_idx in range(2, ws.max_row + 1):
-            if ws.cell(row=row_idx, column=1).value == username:
-                ws.cell(row=row_idx, column=email_col_idx + 1, value=email)
-                wb.save(EXCEL_FILE)
-                return True
-        
-        return False
-    except Exception as e:
-        _log("E", "excel_handler.py:update_user_email", "Failed to update email", {"error": str(e)})
-        return False
-
+    return update_user(username, email=email)
@@ -0,0 +1,398 @@
+"""
+SQLite depolama modülü
+excel_handler fonksiyonlarının SQLite karşılıkları (USE_SQLITE açıkken kullanılır)
+Kullanıcılar, referans listeleri ve form gönderimleri tek bir veritabanı dosyasında tutulur
+"""
+import os
+import json
+import sqlite3
+import threading
+
+# Referans listelerinin Excel'deki başlıkları (import/export için)
+REFERENCE_SHEETS = {
+    "Vehicles": "Vehicle",
+    "FuelLevels": "Level",
+    "ExteriorChecks": "Field",
+    "EngineChecks": "Field",
+    "SafetyEquipment": "Field",
+    "InteriorChecks": "Field",
+    "Items": "Item",
+}
+USER_HEADERS = ["Username", "Password", "Full Name", "Email", "Admin"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    email TEXT NOT NULL DEFAULT '',
+    is_admin INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users (email COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS reference_values (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sheet TEXT NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (sheet, value)
+);
+
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    driver TEXT NOT NULL DEFAULT '',
+    vehicle TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_timestamp ON submissions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_submissions_driver ON submissions (driver);
+CREATE INDEX IF NOT EXISTS idx_submissions_vehicle ON submissions (vehicle);
+"""
+
+DB_FILE = None
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized_files = set()
+
+def initialize(db_file, seed_excel_file=None, before_seed=None):
+    """Veritabanı dosyasını ayarlar ve şemayı oluşturur
+    Veritabanı boşsa ve seed_excel_file varsa veriler bir kez Excel'den aktarılır
+    before_seed: aktarımdan hemen önce çağrılır (örn: bekleyen gönderimleri dosyaya yazmak için)
+    """
+    global DB_FILE
+    DB_FILE = db_file
+    with _init_lock:
+        if db_file in _initialized_files:
+            return
+        conn = get_connection()
+        empty = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM users) AND NOT EXISTS (SELECT 1 FROM reference_values)").fetchone()[0]
+        if empty and seed_excel_file and os.path.exists(seed_excel_file):
+            if before_seed is not None:
+                before_seed()
+            import_from_excel(seed_excel_file)
+        _initialized_files.add(db_file)
+
+def get_connection():
+    """Thread'e ait bağlantıyı döndürür (sqlite3 bağlantıları thread'ler arasında paylaşılmaz)"""
+    conn = getattr(_local, "connection", None)
+    if conn is not None and getattr(_local, "db_file", None) == DB_FILE:
+        return conn
+    conn = sqlite3.connect(DB_FILE, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # WAL: okuyucular yazarları beklemez, yazma başına tam dosya senkronizasyonu gerekmez
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    _local.connection = conn
+    _local.db_file = DB_FILE
+    return conn
+
+# Referans listeleri (Vehicles, FuelLevels, Items, kontrol alanları)
+
+def load_list(sheet):
+    """Referans listesini ekleme sırasıyla döndürür"""
+    rows = get_connection().execute(
+        "SELECT value FROM reference_values WHERE sheet = ? ORDER BY id", (sheet,)
+    ).fetchall()
+    return [row["value"] for row in rows]
+
+def load_lists(sheets):
+    """Birden fazla referans listesini tek sorguyla okur, sheet adı -> liste döndürür"""
+    lists = {sheet: [] for sheet in sheets}
+    if not sheets:
+        return lists
+    placeholders = ",".join("?" for _ in sheets)
+    rows = get_connection().execute(
+        f"SELECT sheet, value FROM reference_values WHERE sheet IN ({placeholders}) ORDER BY id", list(sheets)
+    ).fetchall()
+    for row in rows:
+        lists[row["sheet"]].append(row["value"])
+    return lists
+
+def add_list_value(sheet, value):
+    """Listeye değer ekler, zaten varsa False döndürür"""
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute("INSERT OR IGNORE INTO reference_values (sheet, value) VALUES (?, ?)", (sheet, value))
+    return cursor.rowcount == 1
+
+def delete_list_value(sheet, value):
+    """Listeden değeri siler"""
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute("DELETE FROM reference_values WHERE sheet = ? AND value = ?", (sheet, value))
+    return cursor.rowcount > 0
+
+def update_list_value(sheet, old_value, new_value):
+    """Listedeki değeri (sırası korunarak) günceller"""
+    conn = get_connection()
+    try:
+        with conn:
+            cursor = conn.execute(
+                "UPDATE reference_values SET value = ? WHERE sheet = ? AND value = ?", (new_value, sheet, old_value)
+            )
+    except sqlite3.IntegrityError:
+        # Yeni isim listede zaten var
+        return False
+    return cursor.rowcount > 0
+
+def add_list_values(sheet, values):
+    """Listede olmayan değerleri tek transaction'da ekler, eklenen değerleri döndürür"""
+    conn = get_connection()
+    existing = set(load_list(sheet))
+    added = []
+    for value in values:
+        if value not in existing:
+            existing.add(value)
+            added.append(value)
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO reference_values (sheet, value) VALUES (?, ?)", [(sheet, value) for value in added])
+    return added
+
+def replace_list_values(sheet, values):
+    """Listeyi verilen değerlerle (bu sırayla) tek transaction'da değiştirir"""
+    values = list(dict.fromkeys(values))
+    if load_list(sheet) == values:
+        return False
+    conn = get_connection()
+    with conn:
+        conn.execute("DELETE FROM reference_values WHERE sheet = ?", (sheet,))
+        conn.executemany("INSERT INTO reference_values (sheet, value) VALUES (?, ?)", [(sheet, value) for value in values])
+    return True
+
+# Kullanıcılar
+
+def load_users():
+    """Kullanıcıları excel_handler.load_users ile aynı formatta döndürür"""
+    rows = get_connection().execute("SELECT username, password, full_name, email FROM users ORDER BY rowid").fetchall()
+    return {
+        row["username"]: {"password": row["password"], "full_name": row["full_name"], "email": row["email"] or ""}
+        for row in rows
+    }
+
+def load_user_rows():
+    """Kullanıcıları admin bayrağıyla birlikte (username, password, full_name, email, is_admin) satırları olarak döndürür"""
+    rows = get_connection().execute("SELECT username, password, full_name, email, is_admin FROM users ORDER BY rowid").fetchall()
+    return [(row["username"], row["password"], row["full_name"], row["email"] or "", bool(row["is_admin"])) for row in rows]
+
+def is_admin(username):
+    """Kullanıcının admin olup olmadığını döndürür"""
+    row = get_connection().execute("SELECT is_admin FROM users WHERE username = ?", (username,)).fetchone()
+    return bool(row and row["is_admin"])
+
+def add_user(username, password, full_name, email="", is_admin_user=False):
+    """Yeni kullanıcı ekler, kullanıcı adı varsa False döndürür"""
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO users (username, password, full_name, email, is_admin) VALUES (?, ?, ?, ?, ?)",
+            (username, password, full_name, email or "", 1 if is_admin_user else 0)
+        )
+    return cursor.rowcount == 1
+
+def delete_user(username):
+    """Kullanıcıyı siler"""
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute("DELETE FROM users WHERE username = ?", (username,))
+    return cursor.rowcount > 0
+
+def update_user(username, password=None, full_name=None, email=None, is_admin=None):
+    """Verilen alanları tek bir UPDATE ile günceller"""
+    changes = []
+    params = []
+    if password is not None:
+        changes.append("password = ?")
+        params.append(password)
+    if full_name is not None:
+        changes.append("full_name = ?")
+        params.append(full_name)
+    if email is not None:
+        changes.append("email = ?")
+        params.append(email)
+    if is_admin is not None:
+        changes.append("is_admin = ?")
+        params.append(1 if is_admin else 0)
+    conn = get_connection()
+    if not changes:
+        return conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone() is not None
+    params.append(username)
+    with conn:
+        cursor = conn.execute(f"UPDATE users SET {', '.join(changes)} WHERE username = ?", params)
+    return cursor.rowcount > 0
+
+# Form gönderimleri
+
+def save_submission(headers, row):
+    """Gönderim satırını kaydeder (başlık -> değer eşlemesi JSON olarak saklanır)"""
+    save_submissions([(headers, row)])
+
+def save_submissions(entries):
+    """(headers, row) listesini tek bir transaction'da kaydeder"""
+    params = []
+    for headers, row in entries:
+        data = dict(zip(headers, row))
+        params.append((
+            str(data.get("Timestamp", "")), str(data.get("Driver Name", "") or ""), str(data.get("Vehicle", "") or ""),
+            json.dumps(data, ensure_ascii=False, default=str)
+        ))
+    conn = get_connection()
+    with conn:
+        conn.executemany("INSERT INTO submissions (timestamp, driver, vehicle, data) VALUES (?, ?, ?, ?)", params)
+
+def load_submissions():
+    """Gönderimleri kayıt sırasıyla dict listesi olarak döndürür"""
+    rows = get_connection().execute("SELECT data FROM submissions ORDER BY id").fetchall()
+    return [json.loads(row["data"]) for row in rows]
+
+SUBMISSION_VALUE_COLUMNS = {"Driver Name": "driver", "Vehicle": "vehicle"}
+
+def query_submissions(driver=None, vehicle=None, date_from=None, date_to=None, newest_first=True, limit=None, offset=0):
+    """Filtrelenmiş gönderim sayfası ve filtreye uyan toplam kayıt sayısı: (satırlar, toplam)
+    date_from/date_to "YYYY-MM-DD" (dahil); filtreler timestamp/driver/vehicle indekslerini kullanır
+    """
+    where, params = _submission_filter(driver, vehicle, date_from, date_to)
+    conn = get_connection()
+    total = conn.execute(f"SELECT COUNT(*) FROM submissions{where}", params).fetchone()[0]
+    if limit is not None and limit <= 0:
+        return [], total
+    direction = "DESC" if newest_first else "ASC"
+    sql = f"SELECT data FROM submissions{where} ORDER BY timestamp {direction}, id {direction} LIMIT ? OFFSET ?"
+    rows = conn.execute(sql, params + [-1 if limit is None else limit, offset]).fetchall()
+    return [json.loads(row["data"]) for row in rows], total
+
+def iter_submissions(driver=None, vehicle=None, date_from=None, date_to=None):
+    """Filtreye uyan gönderimleri eskiden yeniye tek tek üretir (satırlar imleçten okunur, listeye alınmaz)"""
+    where, params = _submission_filter(driver, vehicle, date_from, date_to)
+    cursor = get_connection().execute(f"SELECT data FROM submissions{where} ORDER BY timestamp, id", params)
+    for row in cursor:
+        yield json.loads(row["data"])
+
+def _submission_filter(driver, vehicle, date_from, date_to):
+    """Gönderim filtreleri için WHERE ifadesi ve parametreleri"""
+    from datetime import date, timedelta
+    conditions = []
+    params = []
+    if driver is not None:
+        conditions.append("driver = ?")
+        params.append(driver)
+    if vehicle is not None:
+        conditions.append("vehicle = ?")
+        params.append(vehicle)
+    if date_from:
+        conditions.append("timestamp >= ?")
+        params.append(date_from)
+    if date_to:
+        # Gün sonuna kadar: ertesi günden küçük timestamp'ler
+        conditions.append("timestamp < ?")
+        params.append((date.fromisoformat(date_to) + timedelta(days=1)).isoformat())
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+def list_submission_values(column):
+    """Gönderimlerde sürücü veya araç kolonunun farklı değerleri (sıralı)"""
+    db_column = SUBMISSION_VALUE_COLUMNS.get(column)
+    if db_column is None:
+        return []
+    rows = get_connection().execute(
+        f"SELECT DISTINCT {db_column} FROM submissions WHERE {db_column} != '' ORDER BY {db_column}"
+    ).fetchall()
+    return [row[0] for row in rows]
+
+# Excel import/export (admin paneli için)
+
+def import_from_excel(source):
+    """form_data.xlsx formatındaki workbook'u veritabanına aktarır (mevcut veriler değiştirilir)
+    source: dosya yolu veya dosya benzeri nesne. Aktarılan kayıt sayılarını döndürür.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    counts = {}
+    conn = get_connection()
+    try:
+        with conn:
+            for sheet in REFERENCE_SHEETS:
+                if sheet not in wb.sheetnames:
+                    continue
+                conn.execute("DELETE FROM reference_values WHERE sheet = ?", (sheet,))
+                values = [(sheet, str(row[0])) for row in wb[sheet].iter_rows(min_row=2, values_only=True) if row and row[0]]
+                conn.executemany("INSERT OR IGNORE INTO reference_values (sheet, value) VALUES (?, ?)", values)
+                counts[sheet] = len(values)
+
+            if "Users" in wb.sheetnames:
+                rows = wb["Users"].iter_rows(values_only=True)
+                headers = list(next(rows, ()))
+                admin_idx = headers.index("Admin") if "Admin" in headers else None
+                email_idx = headers.index("Email") if "Email" in headers else 3
+                users = []
+                for row in rows:
+                    if not row or len(row) < 3 or not (row[0] and row[1] and row[2]):
+                        continue
+                    if admin_idx is not None and len(row) > admin_idx:
+                        admin = row[admin_idx] == "Yes" or row[admin_idx] is True
+                    else:
+                        admin = row[0] == "admin"
+                    email = row[email_idx] if len(row) > email_idx and row[email_idx] else ""
+                    users.append((str(row[0]), str(row[1]), str(row[2]), str(email), 1 if admin else 0))
+                conn.execute("DELETE FROM users")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO users (username, password, full_name, email, is_admin) VALUES (?, ?, ?, ?, ?)", users
+                )
+                counts["Users"] = len(users)
+
+            if "Submissions" in wb.sheetnames:
+                rows = wb["Submissions"].iter_rows(values_only=True)
+                headers = list(next(rows, ()))
+                conn.execute("DELETE FROM submissions")
+                count = 0
+                for row in rows:
+                    if not row or not row[0]:
+                        continue
+                    data = dict(zip(headers, row))
+                    conn.execute(
+                        "INSERT INTO submissions (timestamp, driver, vehicle, data) VALUES (?, ?, ?, ?)",
+                        (str(row[0]), str(data.get("Driver Name") or ""), str(data.get("Vehicle") or ""),
+                         json.dumps(data, ensure_ascii=False, default=str))
+                    )
+                    count += 1
+                counts["Submissions"] = count
+    finally:
+        wb.close()
+    return counts
+
+def export_to_excel(target):
+    """Veritabanını form_data.xlsx formatında yazar
+    target: dosya yolu veya dosya benzeri nesne (örn: BytesIO)
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    conn = get_connection()
+    lists = load_lists(list(REFERENCE_SHEETS))
+    for sheet, header in REFERENCE_SHEETS.items():
+        ws = wb.create_sheet(sheet)
+        ws.append([header])
+        for value in lists[sheet]:
+            ws.append([value])
+
+    ws = wb.create_sheet("Users")
+    ws.append(USER_HEADERS)
+    for row in conn.execute("SELECT username, password, full_name, email, is_admin FROM users ORDER BY rowid"):
+        ws.append([row["username"], row["password"], row["full_name"], row["email"], "Yes" if row["is_admin"] else "No"])
+
+    # Başlıklar ilk görüldükleri sırayla birleştirilir (kontrol alanları zamanla değişmiş olabilir)
+    headers = []
+    seen = set()
+    for row in conn.execute("SELECT data FROM submissions ORDER BY id"):
+        for header in json.loads(row["data"]):
+            if header not in seen:
+                seen.add(header)
+                headers.append(header)
+    ws = wb.create_sheet("Submissions")
+    if headers:
+        ws.append(headers)
+        for row in conn.execute("SELECT data FROM submissions ORDER BY id"):
+            data = json.loads(row["data"])
+            ws.append([data.get(header) for header in headers])
+    wb.save(target)